@@ -0,0 +1,52 @@
+"""
+Content-addressed cache for AI results
+
+Keys are SHA-256 hashes of everything that determines the output
+(model, prompt template version, inputs), so repeated judgments of the
+same content cost no LLM latency or quota. Entries live in the shared
+on-disk cache with a TTL and a size bound; lookups run in a thread so the
+SQLite I/O never blocks the event loop.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Any, Optional
+from app.cache import shared_cache
+from app.config import settings
+
+
+class AIResultCache:
+    """Persistent TTL + size-bounded cache keyed by content hash"""
+
+    # Trim to max_entries once every this many writes
+    TRIM_EVERY = 100
+
+    def __init__(self, namespace: str, ttl_seconds: int, max_entries: int):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._writes = 0
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """Stable hash of the inputs that determine a result"""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[Any]:
+        return await asyncio.to_thread(shared_cache.get, self.namespace, key)
+
+    async def set(self, key: str, value: Any):
+        await asyncio.to_thread(shared_cache.set, self.namespace, key, value, self.ttl_seconds)
+        self._writes += 1
+        if self._writes % self.TRIM_EVERY == 0:
+            await asyncio.to_thread(shared_cache.trim, self.namespace, self.max_entries)
+
+
+turn_analysis_cache = AIResultCache(
+    "ai_turn_analysis",
+    ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+    max_entries=settings.AI_CACHE_MAX_ENTRIES
+)
+
+__all__ = ["AIResultCache", "turn_analysis_cache"]
@@ -0,0 +1,143 @@
+"""
+Speculative drafts of the AI opponent's next argument
+
+When a human submits a turn in a training room, the AI's reply starts
+generating right away, in parallel with judging that turn. The ai_turn
+job then takes the draft if it was built from the same debate context
+(same fingerprint); otherwise the draft is cancelled and the reply is
+generated afresh.
+
+The drafting task runs in the process that received the submission, but
+its status and text are published to the host's shared cache, so a job
+running in another process (e.g. `python -m app.worker`) waits for and
+takes the finished draft, or cancels it by key.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from typing import Dict, Any, Awaitable, Callable, Optional, Tuple
+from app.cache import shared_cache
+
+# Drafts nobody claimed within this window are dropped
+DRAFT_MAX_AGE_SECONDS = 600
+# How long a job in another process waits for a running draft
+DRAFT_WAIT_SECONDS = 120
+DRAFT_POLL_SECONDS = 0.5
+SHARED_NAMESPACE = "ai_draft"
+
+
+class AIDraftStore:
+    """Registry of in-flight draft tasks keyed by turn slot, visible across processes"""
+
+    def __init__(self):
+        self._drafts: Dict[str, Tuple[str, asyncio.Task, float]] = {}
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Stable hash of everything the draft's prompt was built from"""
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def start(self, key: str, fingerprint: str, generate: Callable[[], Awaitable[str]]):
+        """Begin drafting for a turn slot, replacing any earlier draft"""
+        self._expire()
+        self.discard(key)
+        task = asyncio.create_task(self._draft(key, fingerprint, generate))
+        self._drafts[key] = (fingerprint, task, time.monotonic())
+        print(f"📝 Drafting AI reply {key}")
+
+    @staticmethod
+    async def _publish(key: str, fingerprint: str, status: str, text: Optional[str] = None):
+        await asyncio.to_thread(
+            shared_cache.set, SHARED_NAMESPACE, key,
+            {"fingerprint": fingerprint, "status": status, "text": text},
+            DRAFT_MAX_AGE_SECONDS)
+
+    @staticmethod
+    async def _shared(key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(shared_cache.get, SHARED_NAMESPACE, key)
+
+    async def _draft(self, key: str, fingerprint: str,
+                     generate: Callable[[], Awaitable[str]]) -> Optional[str]:
+        """Generate the draft, publishing its outcome and honouring remote cancels"""
+        await self._publish(key, fingerprint, "running")
+        task = asyncio.ensure_future(generate())
+        try:
+            while not task.done():
+                await asyncio.wait({task}, timeout=DRAFT_POLL_SECONDS)
+                entry = await self._shared(key) if not task.done() else None
+                if entry is not None and entry.get("status") == "cancelled":
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+                    print(f"🗑️  AI draft {key} cancelled by another worker")
+                    return None
+            text = task.result()
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        except Exception:
+            await self._publish(key, fingerprint, "failed")
+            raise
+        await self._publish(key, fingerprint, "ready", text)
+        return text
+
+    async def take(self, key: str, fingerprint: str) -> Optional[str]:
+        """
+        Wait for and return the draft if it matches `fingerprint`.
+        Returns None (cancelling the draft) when it is missing, stale or failed.
+        """
+        entry = self._drafts.pop(key, None)
+        if entry is None:
+            return await self._take_shared(key, fingerprint)
+        draft_fingerprint, task, _ = entry
+        if draft_fingerprint != fingerprint:
+            task.cancel()
+            print(f"🗑️  Discarded stale AI draft {key}")
+            return None
+        try:
+            return await task
+        except Exception as e:
+            print(f"⚠️  AI draft {key} failed: {e}")
+            return None
+
+    async def _take_shared(self, key: str, fingerprint: str) -> Optional[str]:
+        """Take a draft started by another process, waiting while it is still running"""
+        deadline = time.monotonic() + DRAFT_WAIT_SECONDS
+        while True:
+            entry = await self._shared(key)
+            if entry is None:
+                return None
+            if entry.get("fingerprint") != fingerprint:
+                await self._publish(key, entry.get("fingerprint"), "cancelled")
+                print(f"🗑️  Discarded stale AI draft {key}")
+                return None
+            if entry.get("status") == "ready":
+                await self._publish(key, fingerprint, "taken")
+                return entry.get("text")
+            if entry.get("status") != "running" or time.monotonic() >= deadline:
+                return None
+            await asyncio.sleep(DRAFT_POLL_SECONDS)
+
+    def discard(self, key: str):
+        """Cancel this process's draft for a turn slot"""
+        entry = self._drafts.pop(key, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    async def cancel(self, key: str):
+        """Cancel a draft, whichever process is generating it"""
+        self.discard(key)
+        entry = await self._shared(key)
+        if entry is not None and entry.get("status") == "running":
+            await self._publish(key, entry.get("fingerprint"), "cancelled")
+
+    def _expire(self):
+        cutoff = time.monotonic() - DRAFT_MAX_AGE_SECONDS
+        for key in [k for k, (_, _, started) in self._drafts.items() if started < cutoff]:
+            self.discard(key)
+
+
+ai_drafts = AIDraftStore()
+
+__all__ = ["AIDraftStore", "ai_drafts"]
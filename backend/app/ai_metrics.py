@@ -0,0 +1,80 @@
+"""
+In-process accounting for the AI layer
+
+Per task (analyze_turn, final_verdict, ...): provider call count, latency
+percentiles, token usage and estimated cost by model, plus counters such
+as structured-output parse failures. Exposed at /api/ai/metrics so model
+routing and prompt regressions can be checked against real traffic.
+"""
+import threading
+from collections import defaultdict, deque
+from typing import Dict, Any
+from app.config import settings
+
+# Latency samples kept per task for percentiles
+LATENCY_SAMPLES = 500
+
+
+class AIMetrics:
+    """Thread-safe per-task counters and call statistics"""
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=LATENCY_SAMPLES))
+        self._usage: Dict[str, Dict[str, Dict[str, float]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(float)))
+        self._lock = threading.Lock()
+
+    def increment(self, task: str, name: str, amount: int = 1):
+        with self._lock:
+            self._counters[task][name] += amount
+
+    def record_call(
+        self,
+        task: str,
+        model: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        output_tokens: int = 0
+    ):
+        """Record one completed provider call"""
+        input_price, output_price = settings.AI_MODEL_PRICES.get(model, [0.0, 0.0])
+        with self._lock:
+            self._latencies[task].append(latency)
+            usage = self._usage[task][model]
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["output_tokens"] += output_tokens
+            usage["cost_usd"] += (prompt_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            tasks = set(self._counters) | set(self._latencies)
+            result = {}
+            for task in sorted(tasks):
+                entry: Dict[str, Any] = dict(self._counters.get(task, {}))
+                samples = sorted(self._latencies.get(task, []))
+                if samples:
+                    entry["latency_ms"] = {
+                        "avg": round(sum(samples) / len(samples) * 1000),
+                        "p50": round(samples[len(samples) // 2] * 1000),
+                        "p95": round(samples[int(0.95 * (len(samples) - 1))] * 1000)
+                    }
+                models = self._usage.get(task, {})
+                if models:
+                    entry["models"] = {
+                        model: {
+                            "calls": int(usage["calls"]),
+                            "prompt_tokens": int(usage["prompt_tokens"]),
+                            "output_tokens": int(usage["output_tokens"]),
+                            "cost_usd": round(usage["cost_usd"], 6)
+                        }
+                        for model, usage in models.items()
+                    }
+                result[task] = entry
+            return result
+
+
+ai_metrics = AIMetrics()
+
+__all__ = ["AIMetrics", "ai_metrics"]
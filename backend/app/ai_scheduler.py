@@ -0,0 +1,116 @@
+"""
+Global AI job scheduler
+
+Every AI provider call goes through `ai_scheduler.slot(priority)`, which
+caps how many calls run at once and rate-limits call starts with a token
+bucket. Waiting calls are started in priority order, so live AI-opponent
+turns and transcription go ahead of background judging.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Dict, Any, List, Optional
+from app.config import settings
+
+
+class Priority(IntEnum):
+    """Lower value runs first"""
+    LIVE = 0         # AI opponent turns, audio transcription
+    INTERACTIVE = 1  # Requests a user is waiting on
+    BACKGROUND = 2   # Round judging, verdicts, trainer analysis
+
+
+class AIScheduler:
+    """Concurrency cap + token bucket + priority queue for AI calls"""
+
+    def __init__(self, max_concurrency: int, rate_per_minute: float, burst: int):
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_per_second = rate_per_minute / 60.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.active = 0
+        self._last_refill = time.monotonic()
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.started: Dict[str, int] = {p.name: 0 for p in Priority}
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate_per_second <= 0:  # Rate limiting disabled
+            self.tokens = float(self.burst)
+            self._last_refill = now
+            return
+        self.tokens = min(self.burst, self.tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def _dispatch(self):
+        """Start as many waiting calls as the cap and token bucket allow"""
+        self._wakeup = None
+        while self._waiters and self.active < self.max_concurrency:
+            _, _, priority, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            self._refill()
+            if self.tokens < 1:
+                if self._wakeup is None and self.rate_per_second > 0:
+                    delay = (1 - self.tokens) / self.rate_per_second
+                    self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self.tokens -= 1
+            self.active += 1
+            self.started[priority.name] += 1
+            future.set_result(None)
+
+    async def acquire(self, priority: Priority = Priority.BACKGROUND):
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), priority, future))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before cancellation: hand the slot back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        self.active = max(0, self.active - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.BACKGROUND):
+        """Hold one AI call slot for the duration of the block"""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        waiting: Dict[str, int] = {p.name: 0 for p in Priority}
+        for _, _, priority, future in self._waiters:
+            if not future.done():
+                waiting[priority.name] += 1
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "tokens": round(self.tokens, 2),
+            "waiting": waiting,
+            "started": dict(self.started)
+        }
+
+
+ai_scheduler = AIScheduler(
+    max_concurrency=settings.AI_MAX_CONCURRENCY,
+    rate_per_minute=settings.AI_RATE_LIMIT_PER_MINUTE,
+    burst=settings.AI_RATE_BURST
+)
+
+__all__ = ["AIScheduler", "Priority", "ai_scheduler"]
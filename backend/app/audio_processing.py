@@ -0,0 +1,111 @@
+"""
+Speech audio normalization with ffmpeg
+
+Browser recordings (.webm) and uploaded .wav files are converted to mono,
+resampled to AUDIO_SAMPLE_RATE and encoded as Opus at a speech bitrate,
+with leading/trailing silence trimmed. This is typically 5-20x smaller,
+which cuts storage, the bytes sent for transcription and transcription
+latency. ffmpeg runs in the shared process pool so encoding never stalls
+the event loop. When ffmpeg is not installed audio is stored unchanged.
+"""
+import os
+import re
+import shutil
+import subprocess
+from typing import Dict, Any, Optional
+from app.config import settings
+from app.process_pool import run_in_process
+
+FFMPEG_PATH = shutil.which("ffmpeg")
+FFMPEG_AVAILABLE = FFMPEG_PATH is not None
+if not FFMPEG_AVAILABLE:
+    print("⚠️  ffmpeg not found, audio will be stored without normalization")
+
+NORMALIZED_MIME_TYPE = "audio/ogg"
+
+DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+PROGRESS_TIME_RE = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def _seconds(match) -> float:
+    hours, minutes, seconds = match.groups()
+    return round(int(hours) * 3600 + int(minutes) * 60 + float(seconds), 2)
+
+
+def _encode(
+    ffmpeg: str,
+    src: str,
+    dst: str,
+    sample_rate: int,
+    bitrate: str,
+    trim_silence: bool,
+    timeout: float
+) -> Dict[str, Any]:
+    """Run ffmpeg (in a pool process) and report durations from its log"""
+    command = [ffmpeg, "-hide_banner", "-nostdin", "-y", "-i", src, "-vn", "-ac", "1", "-ar", str(sample_rate)]
+    if trim_silence:
+        # Drop leading and trailing silence only; pauses inside speech are kept.
+        # The tail is trimmed as the (reversed) start, since stop_periods=-1
+        # would cut every pause in the recording
+        command += ["-af", "silenceremove=start_periods=1:start_threshold=-50dB,"
+                           "areverse,silenceremove=start_periods=1:start_threshold=-50dB,areverse"]
+    command += ["-c:a", "libopus", "-b:a", bitrate, "-application", "voip", dst]
+
+    completed = subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    if completed.returncode != 0 or not os.path.exists(dst) or os.path.getsize(dst) == 0:
+        tail = completed.stderr.strip().splitlines()[-1:] or ["no output"]
+        raise RuntimeError(f"ffmpeg failed ({completed.returncode}): {tail[0]}")
+
+    source_duration = DURATION_RE.search(completed.stderr)
+    # Last progress line = length of the trimmed output
+    progress = list(PROGRESS_TIME_RE.finditer(completed.stderr))
+    return {
+        "duration_seconds": _seconds(progress[-1]) if progress else None,
+        "original_duration_seconds": _seconds(source_duration) if source_duration else None
+    }
+
+
+async def normalize_audio(path: str, remove_original: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Convert `path` to compact mono Opus next to the original
+    Returns: {path, mime_type, size, original_size, duration_seconds,
+    original_duration_seconds}, or None when normalization is disabled,
+    unavailable or fails (the original file is then left in place).
+    Pass remove_original=False when the new path must be saved first, then
+    call discard_original().
+    """
+    if not settings.AUDIO_NORMALIZE or not FFMPEG_AVAILABLE or not os.path.exists(path):
+        return None
+
+    dst = f"{os.path.splitext(path)[0]}.speech.ogg"
+    original_size = os.path.getsize(path)
+    try:
+        durations = await run_in_process(
+            _encode, FFMPEG_PATH, path, dst, settings.AUDIO_SAMPLE_RATE,
+            settings.AUDIO_BITRATE, settings.AUDIO_TRIM_SILENCE, settings.AUDIO_PROCESS_TIMEOUT_SECONDS)
+    except Exception as e:
+        print(f"⚠️  Audio normalization failed for {path}: {e}")
+        if os.path.exists(dst):
+            os.remove(dst)
+        return None
+
+    size = os.path.getsize(dst)
+    if remove_original:
+        discard_original(path)
+    print(f"🎚️  Normalized {path}: {original_size} → {size} bytes")
+    return {
+        "path": dst,
+        "mime_type": NORMALIZED_MIME_TYPE,
+        "size": size,
+        "original_size": original_size,
+        **durations
+    }
+
+
+def discard_original(path: str):
+    """Delete a recording replaced by its normalized copy, unless AUDIO_KEEP_ORIGINAL"""
+    if not settings.AUDIO_KEEP_ORIGINAL and os.path.exists(path):
+        os.remove(path)
+
+
+__all__ = ["normalize_audio", "discard_original", "FFMPEG_AVAILABLE", "NORMALIZED_MIME_TYPE"]
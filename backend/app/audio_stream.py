@@ -0,0 +1,270 @@
+"""
+Live audio turns over Socket.IO
+
+The speaker's client streams audio while they talk instead of posting a
+finished clip to /submit-audio:
+
+    audio_stream_start  {token, room_id, round_number, turn_number, content?, mime_type?}
+    audio_chunk         {data: <bytes>, segment_end?: bool}
+    audio_stream_end    {}
+
+Chunks accumulate into segments; the client marks each segment boundary
+(e.g. by restarting its recorder every few seconds) so every segment is a
+self-contained file. Each closed segment is recorded on the turn,
+normalized and transcribed right away, and broadcast to the room as
+`transcript_partial`, so spectators follow along and the turn is complete
+seconds after the speaker stops. The turn slot is reserved at stream start
+exactly like an audio upload (status `transcription_pending`).
+
+Finalizing goes through the durable `transcribe_turn` job, queued when the
+stream ends (or the connection drops), which transcribes any segment the
+live pass did not finish and assembles the content. A delayed watchdog job
+queued at stream start completes the turn from its recorded segments if
+the process handling the stream dies. A stream is finished after
+AUDIO_STREAM_MAX_SECONDS even if the client goes quiet, and chunks for a
+turn that is no longer pending are rejected.
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+import aiofiles
+from fastapi import HTTPException
+from app.config import settings
+from app.replit_db import DB, Collections
+from app.replit_auth import ReplitAuth
+from app.cache import room_cache
+from app.user_stats import UserStats
+from app.job_queue import job_queue
+from app.audio_processing import discard_original
+from app.socketio_app import sio, broadcast_to_room, on_disconnect
+from app.routers.debate import (
+    _open_room_for_submission, _validate_turn_slot, _room_lock, _debater_count,
+    transcribe_segment
+)
+
+
+class LiveAudioStream:
+    """One speaker's in-progress audio turn"""
+
+    def __init__(self, turn: Dict[str, Any], mime_type: str):
+        self.turn = turn
+        self.mime_type = mime_type
+        self.buffer = bytearray()
+        self.total_bytes = 0
+        self.segments: List[Dict[str, Any]] = []
+        self.tasks: List[asyncio.Task] = []
+        self.finished = False
+        self.started = time.monotonic()
+        self.timer: Optional[asyncio.Task] = None
+
+    @property
+    def extension(self) -> str:
+        return (self.mime_type.split("/")[-1].split(";")[0] or "webm").strip()
+
+    async def close_segment(self):
+        """Write the buffered audio as the next segment and start transcribing it"""
+        if not self.buffer:
+            return
+        index = len(self.segments)
+        turn = self.turn
+        data, self.buffer = bytes(self.buffer), bytearray()
+        os.makedirs("uploads/audio", exist_ok=True)
+        path = f"uploads/audio/{turn['room_id']}_{turn['speaker_id']}_{turn['turn_number']}_seg{index}.{self.extension}"
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(data)
+        segment = {"index": index, "audio_url": path, "mime_type": self.mime_type, "text": None}
+        self.segments.append(segment)
+        self._save_segment(segment)
+        self.tasks.append(asyncio.create_task(self._transcribe(segment)))
+
+    def _save_segment(self, segment: Dict[str, Any]):
+        """Record a segment on the turn so the transcription job can finish it"""
+        def change(turn: Dict[str, Any]) -> Dict[str, Any]:
+            segments = list(turn.get("audio_segments") or [])
+            if segment["index"] < len(segments):
+                segments[segment["index"]] = dict(segment)
+            else:
+                segments.append(dict(segment))
+            return {"audio_segments": segments}
+
+        DB.modify(Collections.TURNS, str(self.turn["id"]), change)
+
+    async def _transcribe(self, segment: Dict[str, Any]):
+        original = await transcribe_segment(segment)
+        self._save_segment(segment)
+        if original:
+            discard_original(original)
+        try:
+            await broadcast_to_room(self.turn["room_id"], "transcript_partial", {
+                "turn_id": self.turn["id"],
+                "speaker_id": self.turn["speaker_id"],
+                "round_number": self.turn["round_number"],
+                "turn_number": self.turn["turn_number"],
+                "segment_index": segment["index"],
+                "text": segment["text"] or ""
+            }, log=False)
+        except Exception as ws_error:
+            print(f"⚠️  Socket.IO partial broadcast failed: {ws_error}")
+
+    def stop_timer(self):
+        """Cancel the max-duration timer (unless it is the caller)"""
+        if self.timer is not None and self.timer is not asyncio.current_task():
+            self.timer.cancel()
+
+    async def finish(self) -> Dict[str, Any]:
+        """Close the last segment and queue the job that completes the turn"""
+        self.finished = True
+        self.stop_timer()
+        await self.close_segment()
+        # Live transcriptions still running are saved if they finish first;
+        # the job transcribes whatever is left
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+        turn = DB.get(Collections.TURNS, str(self.turn["id"])) or self.turn
+        job_queue.enqueue(
+            "transcribe_turn",
+            {"turn_id": turn["id"]},
+            key=f"transcribe_turn:{turn['id']}",
+            room_id=turn["room_id"]
+        )
+        return turn
+
+
+# Socket.IO sid -> live stream
+_streams: Dict[str, LiveAudioStream] = {}
+
+
+async def _emit_error(sid: str, detail: str):
+    await sio.emit("audio_stream_error", {"detail": detail}, room=sid)
+
+
+async def _expire(sid: str):
+    """Finish a stream at AUDIO_STREAM_MAX_SECONDS even if the client goes quiet"""
+    await asyncio.sleep(settings.AUDIO_STREAM_MAX_SECONDS)
+    if sid in _streams:
+        await _emit_error(sid, "Audio stream too long, finishing turn")
+        await audio_stream_end(sid, {})
+
+
+@sio.event
+async def audio_stream_start(sid, data):
+    """Authenticate the speaker and reserve their turn slot"""
+    data = data or {}
+    if sid in _streams:
+        return await _emit_error(sid, "An audio stream is already open on this connection")
+
+    user = ReplitAuth.get_user_from_token(data.get("token") or "")
+    if not user:
+        return await _emit_error(sid, "Invalid or expired token")
+
+    try:
+        room_id = str(data.get("room_id"))
+        round_number = int(data.get("round_number", 1))
+        turn_number = int(data.get("turn_number", 1))
+        room, participant = _open_room_for_submission(room_id, round_number, user)
+        debater_count = _debater_count(room)
+
+        async with _room_lock(room["id"]):
+            _validate_turn_slot(room, participant, round_number, debater_count)
+            turn = DB.insert(Collections.TURNS, {
+                "room_id": room["id"],
+                "speaker_id": participant["id"],
+                "content": (data.get("content") or "").strip(),
+                "audio_url": None,
+                "round_number": round_number,
+                "turn_number": turn_number,
+                "ai_feedback": None,  # Will be analyzed in batch after round completion
+                "audio_segments": [],
+                "streaming": True,
+                "status": "transcription_pending",
+                "timestamp": datetime.utcnow().isoformat()
+            })
+            UserStats.record_turn(participant["id"])
+    except HTTPException as e:
+        return await _emit_error(sid, e.detail)
+    except (TypeError, ValueError):
+        return await _emit_error(sid, "Invalid round or turn number")
+
+    # Completes the turn from its recorded segments if this process dies mid-stream
+    job_queue.enqueue(
+        "transcribe_turn",
+        {"turn_id": turn["id"]},
+        key=f"transcribe_turn_watchdog:{turn['id']}",
+        room_id=room["id"],
+        delay_seconds=settings.AUDIO_STREAM_MAX_SECONDS + settings.JOB_LEASE_SECONDS
+    )
+
+    stream = LiveAudioStream(turn, data.get("mime_type") or "audio/webm")
+    stream.timer = asyncio.create_task(_expire(sid))
+    _streams[sid] = stream
+    room_cache.delete(f"debate_status_{room['id']}")
+    room_cache.delete(f"transcript_{room['id']}")
+
+    await broadcast_to_room(room["id"], "new_turn", {
+        "turn": turn,
+        "speaker_id": participant["id"],
+        "speaker_name": user.get("username", "Anonymous"),
+        "timestamp": turn.get("timestamp")
+    })
+    await sio.emit("audio_stream_started", {"turn_id": turn["id"]}, room=sid)
+    print(f"🎙️  Live audio stream started for turn {turn['id']}")
+
+
+@sio.event
+async def audio_chunk(sid, data):
+    """Buffer audio; `segment_end` closes the current segment for transcription"""
+    stream = _streams.get(sid)
+    if stream is None or stream.finished:
+        return await _emit_error(sid, "No audio stream open")
+
+    data = data or {}
+    chunk = data.get("data") or b""
+    if not isinstance(chunk, (bytes, bytearray)):
+        return await _emit_error(sid, "Audio chunks must be binary")
+
+    # The watchdog job may already have completed the turn
+    turn = DB.get(Collections.TURNS, str(stream.turn["id"]))
+    if not turn or turn.get("status") != "transcription_pending":
+        _streams.pop(sid, None)
+        stream.finished = True
+        stream.stop_timer()
+        return await _emit_error(sid, "This turn has already been completed")
+
+    stream.total_bytes += len(chunk)
+    if stream.total_bytes > settings.AUDIO_STREAM_MAX_BYTES:
+        await _emit_error(sid, "Audio stream too large, finishing turn")
+        return await audio_stream_end(sid, {})
+    if time.monotonic() - stream.started > settings.AUDIO_STREAM_MAX_SECONDS:
+        await _emit_error(sid, "Audio stream too long, finishing turn")
+        return await audio_stream_end(sid, {})
+
+    stream.buffer.extend(chunk)
+    if data.get("segment_end"):
+        if len(stream.segments) >= settings.AUDIO_STREAM_MAX_SEGMENTS:
+            await _emit_error(sid, "Too many audio segments, finishing turn")
+            return await audio_stream_end(sid, {})
+        await stream.close_segment()
+
+
+@sio.event
+async def audio_stream_end(sid, data):
+    """Queue the turn's completion once the last segment is written"""
+    stream = _streams.pop(sid, None)
+    if stream is None:
+        return
+    turn = await stream.finish()
+    await sio.emit("audio_stream_done", {"turn": turn}, room=sid)
+    print(f"✅ Live audio turn {turn['id']} ended ({len(stream.segments)} segments)")
+
+
+@on_disconnect
+async def _finish_abandoned_stream(sid):
+    """A dropped connection still completes the turn with what was received"""
+    stream = _streams.pop(sid, None)
+    if stream is not None:
+        await stream.finish()
+
+
+__all__ = ["LiveAudioStream"]
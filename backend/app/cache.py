@@ -1,45 +1,423 @@
 """
-Simple in-memory cache for frequently accessed data
+Two-tier cache for frequently accessed data
+
+L1 is a small in-process dict with TTL and LRU eviction.
+L2 is a SQLite file shared by every worker process on the host, which also
+carries invalidation messages so a delete in one worker evicts the L1 copy
+in all the others. Workers poll the log at most every
+CACHE_SYNC_INTERVAL_SECONDS (room_cache on every read, so room and turn
+data are never served stale after another worker's write); a worker that
+fell behind the pruned part of the log flushes everything (listeners see a
+None key, i.e. "clear"). A value is only cached if its key was not
+invalidated since the miss that loaded it, so a read that raced a write
+cannot repopulate either tier with the old value.
 """
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable, List
+from app.config import settings
 
 
 class SimpleCache:
-    """Thread-safe simple cache with TTL"""
-    
-    def __init__(self, ttl_seconds: int = 60):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    """Thread-safe simple cache with TTL and optional LRU size bound"""
+
+    def __init__(self, ttl_seconds: int = 60, max_entries: Optional[int] = None):
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.ttl_seconds = ttl_seconds
-    
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache if not expired"""
-        if key in self.cache:
-            entry = self.cache[key]
+        with self._lock:
+            entry = self.cache.get(key)
+            if entry is None:
+                return None
             if datetime.utcnow() < entry['expires']:
+                self.cache.move_to_end(key)
                 return entry['value']
-            else:
-                del self.cache[key]
+            del self.cache[key]
         return None
-    
+
     def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
         """Set value in cache with TTL"""
         ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
-        self.cache[key] = {
-            'value': value,
-            'expires': datetime.utcnow() + timedelta(seconds=ttl)
-        }
-    
+        with self._lock:
+            self.cache[key] = {
+                'value': value,
+                'expires': datetime.utcnow() + timedelta(seconds=ttl)
+            }
+            self.cache.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+
     def delete(self, key: str):
         """Delete value from cache"""
-        if key in self.cache:
-            del self.cache[key]
-    
+        with self._lock:
+            self.cache.pop(key, None)
+
     def clear(self):
         """Clear all cache"""
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+
+
+class SharedCache:
+    """
+    SQLite-backed cache shared by all worker processes on this host.
+    Also stores an append-only invalidation log that workers poll to
+    evict their own L1 copies.
+    """
+
+    # Invalidation messages older than this are pruned
+    LOG_RETENTION_SECONDS = 600
+
+    def __init__(self, path: str):
+        self.path = path
+        self.available = True
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Open (or re-open after fork) the per-process connection"""
+        if not self.available:
+            return None
+        if self._conn is not None and self._pid == os.getpid():
+            return self._conn
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, timeout=5, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, PRIMARY KEY (namespace, key))")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_invalidations ("
+                "seq INTEGER PRIMARY KEY AUTOINCREMENT, namespace TEXT NOT NULL, "
+                "key TEXT, created_at REAL NOT NULL)")
+            self._conn = conn
+            self._pid = os.getpid()
+            return conn
+        except sqlite3.Error as e:
+            print(f"⚠️  Shared cache unavailable ({e}), using in-process cache only - "
+                  "invalidations will NOT propagate between worker processes")
+            self.available = False
+            return None
+
+    def get(self, namespace: str, key: str) -> Optional[Any]:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (namespace, key)).fetchone()
+            except sqlite3.Error as e:
+                print(f"⚠️  Shared cache read failed: {e}")
+                return None
+        if row is None or row[1] < time.time():
+            return None
+        return json.loads(row[0])
+
+    def set(
+        self,
+        namespace: str,
+        key: str,
+        value: Any,
+        ttl_seconds: int,
+        since_seq: Optional[int] = None
+    ) -> bool:
+        """
+        Store a value. With `since_seq`, only if the key (or namespace) was
+        not invalidated after that log position. Returns False if skipped.
+        """
+        payload = json.dumps(value, default=str)
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return True
+            try:
+                if since_seq is None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (namespace, key, payload, time.time() + ttl_seconds))
+                    stored = True
+                else:
+                    # One statement, so the check and the write are atomic;
+                    # a log pruned past since_seq counts as invalidated
+                    stored = conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) "
+                        "SELECT ?, ?, ?, ? WHERE NOT EXISTS ("
+                        "SELECT 1 FROM cache_invalidations WHERE seq > ? AND namespace = ? "
+                        "AND (key = ? OR key IS NULL)) "
+                        "AND (SELECT COALESCE(MIN(seq), 0) FROM cache_invalidations) <= ?",
+                        (namespace, key, payload, time.time() + ttl_seconds,
+                         since_seq, namespace, key, since_seq + 1)).rowcount > 0
+                self._writes += 1
+                if self._writes % 500 == 0:
+                    self._purge(conn)
+                return stored
+            except sqlite3.Error as e:
+                print(f"⚠️  Shared cache write failed: {e}")
+                return False
+
+    def invalidate(self, namespace: str, key: Optional[str]):
+        """Remove an entry (or the whole namespace when key is None) and publish the invalidation"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                # Log first: a conditional set() either sees the message or
+                # lands before the delete below
+                conn.execute(
+                    "INSERT INTO cache_invalidations (namespace, key, created_at) VALUES (?, ?, ?)",
+                    (namespace, key, time.time()))
+                if key is None:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+                else:
+                    conn.execute(
+                        "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                        (namespace, key))
+            except sqlite3.Error as e:
+                print(f"⚠️  Shared cache invalidation failed: {e}")
+
+    def invalidations_since(self, namespace: str, seq: int) -> List[tuple]:
+        """Return (seq, key) messages newer than seq for a namespace"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return []
+            try:
+                return conn.execute(
+                    "SELECT seq, key FROM cache_invalidations WHERE seq > ? AND namespace = ? "
+                    "ORDER BY seq", (seq, namespace)).fetchall()
+            except sqlite3.Error:
+                return []
+
+    def seq_bounds(self) -> tuple:
+        """(oldest, latest) invalidation seq still in the log, (0, 0) when empty"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0, 0
+            try:
+                row = conn.execute(
+                    "SELECT MIN(seq), MAX(seq) FROM cache_invalidations").fetchone()
+            except sqlite3.Error:
+                return 0, 0
+        return row[0] or 0, row[1] or 0
+
+    def latest_seq(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return 0
+            try:
+                row = conn.execute(
+                    "SELECT MAX(seq) FROM cache_invalidations").fetchone()
+            except sqlite3.Error:
+                return 0
+        return row[0] or 0
+
+    def trim(self, namespace: str, max_entries: int):
+        """Evict the oldest entries of a namespace beyond max_entries"""
+        with self._lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache_entries WHERE namespace = ? "
+                    "ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                    (namespace, namespace, max_entries))
+            except sqlite3.Error as e:
+                print(f"⚠️  Shared cache trim failed: {e}")
+
+    def _purge(self, conn: sqlite3.Connection):
+        """Drop expired entries and old invalidation messages"""
+        now = time.time()
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (now,))
+        conn.execute(
+            "DELETE FROM cache_invalidations WHERE created_at < ? "
+            "AND seq < (SELECT MAX(seq) FROM cache_invalidations)",
+            (now - self.LOG_RETENTION_SECONDS,))
+
+
+class TwoTierCache:
+    """
+    L1 in-process cache backed by the shared L2 cache.
+    Same get/set/delete/clear API as SimpleCache.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        shared: SharedCache,
+        ttl_seconds: int = 60,
+        l1_max_entries: int = 256,
+        sync_interval_seconds: Optional[float] = None
+    ):
+        self.namespace = namespace
+        self.shared = shared
+        self.ttl_seconds = ttl_seconds
+        self.sync_interval_seconds = (
+            sync_interval_seconds if sync_interval_seconds is not None
+            else settings.CACHE_SYNC_INTERVAL_SECONDS)
+        self.l1 = SimpleCache(ttl_seconds=ttl_seconds, max_entries=l1_max_entries)
+        # Log position at each recent miss, checked when the loaded value is set
+        self._miss_seq = SimpleCache(ttl_seconds=ttl_seconds, max_entries=l1_max_entries)
+        self._last_seq: Optional[int] = None
+        self._last_sync = 0.0
+        self._shared_available = True
+        self._listeners: List[Callable[[Optional[str]], None]] = []
+
+    def add_listener(self, callback: Callable[[Optional[str]], None]):
+        """Call `callback(key)` for every invalidation seen by this process (key is None on clear)"""
+        self._listeners.append(callback)
+
+    def _apply(self, key: Optional[str]):
+        if key is None:
+            self.l1.clear()
+        else:
+            self.l1.delete(key)
+        for listener in self._listeners:
+            try:
+                listener(key)
+            except Exception as e:
+                print(f"⚠️  Cache listener failed: {e}")
+
+    def sync(self, force: bool = False):
+        """
+        Apply invalidation messages published by any worker since the last sync
+        Polls at most every `sync_interval_seconds` unless `force` is set.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_sync < self.sync_interval_seconds:
+            return
+        self._last_sync = now
+
+        if self._shared_available and not self.shared.available:
+            # Lost the shared log: whatever we held may already be stale
+            self._shared_available = False
+            print(f"⚠️  Cache '{self.namespace}': shared log unavailable, flushing L1")
+            self._apply(None)
+            return
+
+        if self._last_seq is None:
+            # Start from the current end of the log; nothing is in L1 yet
+            self._last_seq = self.shared.latest_seq()
+            return
+
+        oldest, latest = self.shared.seq_bounds()
+        if oldest > self._last_seq + 1:
+            # Messages we never read were pruned: anything may be stale
+            print(f"⚠️  Cache '{self.namespace}': invalidation log gap, flushing L1")
+            self._last_seq = latest
+            self._apply(None)
+            return
+
+        if latest <= self._last_seq:
+            return  # Nothing new (the common case for a sync on every read)
+        for seq, key in self.shared.invalidations_since(self.namespace, self._last_seq):
+            self._last_seq = seq
+            self._apply(key)
+        # Other namespaces' messages up to `latest` were seen too; this keeps
+        # a quiet namespace from looking like it fell behind the pruned log
+        self._last_seq = max(self._last_seq, latest)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from L1, falling back to the shared L2"""
+        self.sync()
+        value = self.l1.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(self.namespace, key)
+        if value is not None:
+            self.l1.set(key, value)
+        elif self._last_seq is not None:
+            self._miss_seq.set(key, self._last_seq)
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[int] = None):
+        """
+        Set value in both tiers, unless the key was invalidated since the
+        get() miss that preceded it (the value may predate that write)
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        self.sync(force=True)
+        since = self._miss_seq.get(key)
+        self._miss_seq.delete(key)
+        if since is None:
+            since = self._last_seq
+        if self._shared_available and not self.shared.set(
+                self.namespace, key, value, ttl, since_seq=since):
+            return
+        self.l1.set(key, value, ttl_seconds=ttl)
+
+    def delete(self, key: str):
+        """Delete value from every worker's cache"""
+        self.l1.delete(key)
+        self.shared.invalidate(self.namespace, key)
+        self.sync(force=True)
+
+    def clear(self):
+        """Clear all cache in every worker"""
+        self.l1.clear()
+        self.shared.invalidate(self.namespace, None)
+        self.sync(force=True)
+
+
+class BloomFilter:
+    """
+    Probabilistic set membership: `in` may return false positives but
+    never false negatives, so a miss is a definite "not present".
+    """
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str):
+        with self._lock:
+            for pos in self._positions(item):
+                self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
 
+shared_cache = SharedCache(settings.CACHE_DB_PATH)
 
 # Global cache instances
-user_cache = SimpleCache(ttl_seconds=300)  # 5 minutes for user data
-room_cache = SimpleCache(ttl_seconds=30)   # 30 seconds for room data (increased for better performance)
+user_cache = TwoTierCache("user", shared_cache, ttl_seconds=300)  # 5 minutes for user data
+# Room and turn data are read straight after writes by other workers: sync on every read
+room_cache = TwoTierCache("room", shared_cache, ttl_seconds=30, sync_interval_seconds=0)
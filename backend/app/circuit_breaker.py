@@ -0,0 +1,226 @@
+"""
+Per-provider circuit breakers for the AI layer
+
+Each provider call is wrapped in `breaker.run(...)`, which enforces a
+request timeout and records the outcome and latency in a sliding window.
+The breaker opens when recent calls fail (or are slow) too often, so
+callers skip a degraded provider immediately and fall through to the next
+one instead of waiting on timeouts. While open, a background probe checks
+the provider (half-open) and closes the breaker once it answers again.
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Dict, Any, Awaitable, Callable, Optional
+from app.config import settings
+
+
+class BreakerState:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is attempted while the breaker is open"""
+
+
+class CircuitBreaker:
+    """Error-rate and slow-call-rate breaker with background half-open probes"""
+
+    def __init__(
+        self,
+        name: str,
+        timeout_seconds: float,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        consecutive_failures: int = 3,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate_threshold: float = 0.8,
+        open_seconds: float = 30.0,
+        max_open_seconds: float = 300.0
+    ):
+        self.name = name
+        self.timeout_seconds = timeout_seconds
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.consecutive_failures = consecutive_failures
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.base_open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self.state = BreakerState.CLOSED
+        self.open_seconds = open_seconds
+        self.opened_at: Optional[float] = None
+        self.probe: Optional[Callable[[], Awaitable[Any]]] = None
+        self._window: deque = deque(maxlen=window_size)  # (ok, slow, latency)
+        self._failure_streak = 0
+        self._trial_in_flight = False
+        self._probe_task: Optional[asyncio.Task] = None
+        self.rejected = 0
+
+    def set_probe(self, probe: Callable[[], Awaitable[Any]]):
+        """Register a cheap health-check call used while the breaker is open"""
+        self.probe = probe
+
+    def _trial_available(self) -> bool:
+        """No background probe: one real call may go through as the half-open trial"""
+        if self.probe is not None or self._trial_in_flight:
+            return False
+        if self.state == BreakerState.OPEN:
+            return time.monotonic() - (self.opened_at or 0) >= self.open_seconds
+        return self.state == BreakerState.HALF_OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Whether a real call may go to the provider right now. Only a hint:
+        the trial slot itself is taken in run(), so callers that give up
+        before reaching it (e.g. while queued for a scheduler slot) cannot
+        leave the breaker stuck half-open.
+        """
+        if self.state == BreakerState.CLOSED or self._trial_available():
+            return True
+        self.rejected += 1
+        return False
+
+    async def run(
+        self,
+        awaitable: Awaitable[Any],
+        timeout: Optional[float] = None,
+        slow_call_seconds: Optional[float] = None
+    ) -> Any:
+        """Await a provider call under the breaker's timeout, recording the outcome"""
+        trial = False
+        if self.state != BreakerState.CLOSED:
+            if not self._trial_available():
+                if hasattr(awaitable, "close"):
+                    awaitable.close()  # Never awaited
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open")
+            self.state = BreakerState.HALF_OPEN
+            self._trial_in_flight = trial = True
+
+        start = time.monotonic()
+        try:
+            result = await asyncio.wait_for(awaitable, timeout=timeout or self.timeout_seconds)
+        except Exception:
+            self._record(False, time.monotonic() - start, slow_call_seconds, trial)
+            raise
+        finally:
+            if trial and self.state == BreakerState.HALF_OPEN and self._trial_in_flight:
+                self._trial_in_flight = False  # Cancelled: free the slot for the next caller
+        self._record(True, time.monotonic() - start, slow_call_seconds, trial)
+        return result
+
+    def _record(
+        self,
+        ok: bool,
+        latency: float,
+        slow_call_seconds: Optional[float] = None,
+        trial: bool = False
+    ):
+        slow = latency >= (slow_call_seconds or self.slow_call_seconds)
+        if trial:
+            self._trial_in_flight = False
+            if ok and not slow:
+                self._close()
+            else:
+                self._open()
+            return
+        if self.state != BreakerState.CLOSED:
+            return  # Calls started before the breaker opened do not count
+
+        self._window.append((ok, slow, latency))
+        self._failure_streak = 0 if ok else self._failure_streak + 1
+
+        if self._failure_streak >= self.consecutive_failures:
+            self._open()
+            return
+        calls = len(self._window)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for o, _, _ in self._window if not o)
+        slow_calls = sum(1 for _, s, _ in self._window if s)
+        if failures / calls >= self.failure_rate_threshold or \
+                slow_calls / calls >= self.slow_call_rate_threshold:
+            self._open()
+
+    def _open(self):
+        if self.state == BreakerState.CLOSED:
+            self.open_seconds = self.base_open_seconds
+        else:
+            # Failed trial: back off further before probing again
+            self.open_seconds = min(self.max_open_seconds, self.open_seconds * 2)
+        self.state = BreakerState.OPEN
+        self.opened_at = time.monotonic()
+        print(f"⚡ {self.name} circuit OPEN for {self.open_seconds:.0f}s")
+        self._schedule_probe()
+
+    def _close(self):
+        self.state = BreakerState.CLOSED
+        self.opened_at = None
+        self.open_seconds = self.base_open_seconds
+        self._window.clear()
+        self._failure_streak = 0
+        print(f"✅ {self.name} circuit CLOSED")
+
+    def _schedule_probe(self):
+        if self.probe is None or (self._probe_task and not self._probe_task.done()):
+            return
+        try:
+            self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+        except RuntimeError:
+            pass  # No running loop; allow_request() will not trial without one
+
+    async def _probe_loop(self):
+        while self.state == BreakerState.OPEN:
+            await asyncio.sleep(self.open_seconds)
+            self.state = BreakerState.HALF_OPEN
+            start = time.monotonic()
+            try:
+                await asyncio.wait_for(self.probe(), timeout=self.timeout_seconds)
+                ok = True
+            except Exception as e:
+                print(f"⚠️  {self.name} probe failed: {e}")
+                ok = False
+            self._record(ok, time.monotonic() - start, trial=True)
+
+    def stats(self) -> Dict[str, Any]:
+        calls = len(self._window)
+        latencies = sorted(latency for _, _, latency in self._window)
+        return {
+            "state": self.state,
+            "window_calls": calls,
+            "failure_rate": round(sum(1 for o, _, _ in self._window if not o) / calls, 2) if calls else 0,
+            "p95_latency_ms": round(latencies[int(0.95 * (calls - 1))] * 1000) if calls else None,
+            "rejected": self.rejected,
+            "open_seconds": self.open_seconds if self.state != BreakerState.CLOSED else None
+        }
+
+
+def _provider_breaker(name: str) -> CircuitBreaker:
+    return CircuitBreaker(
+        name,
+        timeout_seconds=settings.AI_REQUEST_TIMEOUT_SECONDS,
+        window_size=settings.AI_BREAKER_WINDOW,
+        min_calls=settings.AI_BREAKER_MIN_CALLS,
+        failure_rate_threshold=settings.AI_BREAKER_FAILURE_RATE,
+        consecutive_failures=settings.AI_BREAKER_CONSECUTIVE_FAILURES,
+        slow_call_seconds=settings.AI_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate_threshold=settings.AI_BREAKER_SLOW_CALL_RATE,
+        open_seconds=settings.AI_BREAKER_OPEN_SECONDS
+    )
+
+
+gemini_breaker = _provider_breaker("gemini")
+replit_ai_breaker = _provider_breaker("replit_ai")
+
+
+def circuit_stats() -> Dict[str, Any]:
+    return {b.name: b.stats() for b in (gemini_breaker, replit_ai_breaker)}
+
+
+__all__ = ["CircuitBreaker", "BreakerState", "CircuitOpenError",
+           "gemini_breaker", "replit_ai_breaker", "circuit_stats"]
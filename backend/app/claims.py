@@ -0,0 +1,157 @@
+"""
+Claim extraction and batch fact-checking for debate rounds
+
+After a round completes, checkable claims (sentences carrying figures,
+sources or factual comparisons) are pulled out of each turn locally and
+fact-checked concurrently through the pooled HTTP client. Checks run under
+a concurrency limit and a per-room budget; the results go into the judge's
+prompt as evidence and are stored on the turn's `ai_feedback`. Each claim
+also carries the room reference passages (indexed PDFs) that best match it.
+"""
+import asyncio
+import re
+from typing import Dict, Any, List, Optional
+from app.config import settings
+from app.replit_db import DB, Collections
+from app.gemini_ai import GeminiAI
+from app.heuristic_judge import EVIDENCE_MARKERS
+from app.reference_index import reference_passages, format_passages
+
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+NUMBER_RE = re.compile(r"\d")
+
+FACTUAL_MARKERS = [
+    "more than", "less than", "fewer than", "increase", "decrease", "doubled",
+    "percent", "million", "billion", "majority", "most ", "average", "rate",
+    "since", "in 19", "in 20", "founded", "caused", "leads to", "reduces"
+]
+# Sentences phrased as opinion, questions or appeals are not checkable
+OPINION_MARKERS = [
+    "i think", "i believe", "i feel", "in my opinion", "we should", "we must",
+    "should ", "imagine", "let us", "let's"
+]
+MIN_CLAIM_WORDS = 6
+MAX_CLAIM_CHARS = 300
+# Reference passages attached to each checked claim
+CLAIM_REFERENCE_PASSAGES = 2
+
+
+def _claim_score(sentence: str) -> int:
+    text = sentence.lower()
+    if sentence.endswith("?") or any(marker in text for marker in OPINION_MARKERS):
+        return 0
+    score = 2 * len(NUMBER_RE.findall(sentence)[:3])
+    score += 2 * sum(1 for marker in EVIDENCE_MARKERS if marker in text)
+    score += sum(1 for marker in FACTUAL_MARKERS if marker in text)
+    # Named people, places and organisations (capitalized past the first word)
+    score += min(2, sum(1 for word in sentence.split()[1:] if word[:1].isupper()))
+    return score
+
+
+def extract_claims(text: str, max_claims: int = None) -> List[str]:
+    """Most checkable factual sentences of a turn, in their original order"""
+    max_claims = max_claims if max_claims is not None else settings.FACT_CHECK_CLAIMS_PER_TURN
+    sentences = [s.strip() for s in SENTENCE_SPLIT_RE.split(text or "") if s.strip()]
+    scored = []
+    for index, sentence in enumerate(sentences):
+        if len(sentence.split()) < MIN_CLAIM_WORDS:
+            continue
+        score = _claim_score(sentence)
+        if score >= 2:
+            scored.append((score, index, sentence[:MAX_CLAIM_CHARS]))
+    best = sorted(scored, key=lambda s: (-s[0], s[1]))[:max_claims]
+    return [sentence for _, _, sentence in sorted(best, key=lambda s: s[1])]
+
+
+def _reserve_budget(room_id: str, wanted: Dict[str, int]) -> Dict[str, int]:
+    """
+    Take checks from the room's fact-check budget, per turn ID. A turn keeps
+    its first grant, so a retried job does not spend the budget again.
+    """
+    grants: Dict[str, int] = {}
+
+    def change(room: Dict[str, Any]) -> Dict[str, Any]:
+        reserved = dict(room.get("fact_check_reservations") or {})
+        used = room.get("fact_checks_used", 0)
+        for turn_id, count in wanted.items():
+            if turn_id not in reserved:
+                reserved[turn_id] = max(0, min(count, settings.FACT_CHECK_ROOM_BUDGET - used))
+                used += reserved[turn_id]
+            grants[turn_id] = reserved[turn_id]
+        return {"fact_checks_used": used, "fact_check_reservations": reserved}
+
+    DB.modify(Collections.ROOMS, str(room_id), change)
+    return grants
+
+
+async def fact_check_turns(room: Dict[str, Any], turns: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Extract and fact-check claims for several turns concurrently
+    Returns: {turn_id: [{claim, verified, confidence, sources, snippets, summary, references}]}
+    Turns whose claims did not fit in the budget get an empty list.
+    """
+    results: Dict[str, List[Dict[str, Any]]] = {str(t["id"]): [] for t in turns}
+    if not settings.AUTO_FACT_CHECK or not settings.SERPER_API_KEY:
+        return results
+
+    turn_claims = {str(t["id"]): extract_claims(t.get("content", "")) for t in turns}
+    wanted = {turn_id: len(found) for turn_id, found in turn_claims.items() if found}
+    grants = _reserve_budget(room["id"], wanted) if wanted else {}
+    claims = [(turn_id, claim) for turn_id, found in turn_claims.items()
+              for claim in found[:grants.get(turn_id, 0)]]
+    if len(claims) < sum(wanted.values()):
+        print(f"⚠️  Fact-check budget for room {room['id']}: checking {len(claims)}/{sum(wanted.values())} claims")
+    if not claims:
+        return results
+
+    semaphore = asyncio.Semaphore(settings.FACT_CHECK_CONCURRENCY)
+
+    async def check(claim: str) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await GeminiAI.fact_check(claim, context=room.get("topic"))
+            except Exception as e:
+                print(f"⚠️  Fact-check failed: {e}")
+                return {"verified": False, "confidence": 0, "sources": [], "snippets": [],
+                        "summary": "Unable to verify"}
+
+    checks = await asyncio.gather(*[check(claim) for _, claim in claims])
+    for (turn_id, claim), check_result in zip(claims, checks):
+        references = [{"file_name": p["file_name"], "page": p["page"]}
+                      for p in reference_passages(room["id"], claim, CLAIM_REFERENCE_PASSAGES)]
+        results[turn_id].append({"claim": claim, **check_result, "references": references})
+    print(f"🔎 Fact-checked {len(claims)} claim(s) across {len(turns)} turn(s)")
+    return results
+
+
+def format_evidence(fact_checks: List[Dict[str, Any]]) -> str:
+    """
+    Fact-check results as judge-prompt context. `verified` only means the
+    search succeeded, so the judge gets the snippets to weigh, not a verdict.
+    """
+    lines = []
+    for check in fact_checks:
+        status = "search results found" if check.get("verified") else "could not be checked"
+        sources = ", ".join(s for s in check.get("sources", []) if s)
+        line = f'- "{check["claim"]}": {status}. {check.get("summary", "")}'
+        line = f"{line} (sources: {sources})" if sources else line
+        snippets = [s for s in check.get("snippets", []) if s]
+        if snippets:
+            line += "".join(f'\n    > {snippet}' for snippet in snippets)
+        references = "; ".join(f'{r["file_name"]} p. {r["page"]}' for r in check.get("references", []))
+        lines.append(f"{line} (room material: {references})" if references else line)
+    return "\n".join(lines)
+
+
+def turn_evidence(room: Dict[str, Any], turn: Dict[str, Any], fact_checks: List[Dict[str, Any]]) -> Optional[str]:
+    """Fact-check results plus the room reference passages most relevant to a turn"""
+    sections = []
+    if fact_checks:
+        sections.append(f"Fact-checks:\n{format_evidence(fact_checks)}")
+    passages = reference_passages(room["id"], turn.get("content", ""))
+    if passages:
+        sections.append(f"Room reference material:\n{format_passages(passages)}")
+    return "\n".join(sections) or None
+
+
+__all__ = ["extract_claims", "fact_check_turns", "format_evidence", "turn_evidence"]
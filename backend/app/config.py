@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List, Optional
 
 
 class Settings(BaseSettings):
@@ -18,15 +18,103 @@ class Settings(BaseSettings):
     # Use Gemini AI exclusively
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     GEMINI_MODEL: str = "gemini-2.5-pro"
+    # Model tiers: AI_TASK_TIERS maps each AI task to "fast" or "strong" (GEMINI_MODEL)
+    GEMINI_FAST_MODEL: str = "gemini-2.5-flash"
+    GEMINI_FAST_THINKING_BUDGET: Optional[int] = 0  # 0 = no thinking (low latency), None = model default
+    AI_TASK_TIERS: Dict[str, str] = {
+        "analyze_turn": "fast",
+        "analyze_round": "fast",
+        "trainer_challenge": "fast",
+        "debate_argument": "fast",
+        "transcription": "fast",
+        "final_verdict": "strong",
+        "chat": "strong",
+    }
+    # USD per 1M tokens [input, output], used for per-task cost estimates
+    AI_MODEL_PRICES: Dict[str, List[float]] = {
+        "gemini-2.5-flash": [0.30, 2.50],
+        "gemini-2.5-pro": [1.25, 10.00],
+    }
     GEMINI_TEMPERATURE: float = 0.7
+    # Threads for AI provider calls that have no async API (Replit AI fallback)
+    AI_THREAD_POOL_SIZE: int = 4
+    # Content-addressed cache of AI judgments (identical inputs reuse the result)
+    AI_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    AI_CACHE_MAX_ENTRIES: int = 20000
+    # Judge all turns of a round in one LLM request (falls back to per-turn)
+    AI_BATCH_JUDGING: bool = True
+    # Model output limit; larger rounds are split into several batch requests
+    AI_MAX_OUTPUT_TOKENS: int = 8192
+    # Re-asks when a structured (JSON schema) response fails validation
+    AI_STRUCTURED_RETRIES: int = 2
+    # Global AI call scheduler (concurrency cap + token bucket, 0 = no rate limit)
+    AI_MAX_CONCURRENCY: int = 4
+    AI_RATE_LIMIT_PER_MINUTE: int = 60
+    AI_RATE_BURST: int = 10
+    # Per-provider circuit breakers (see app/circuit_breaker.py)
+    AI_REQUEST_TIMEOUT_SECONDS: float = 45.0
+    AI_TRANSCRIPTION_TIMEOUT_SECONDS: float = 180.0
+    # Audio up to this size is sent inline with the request; larger files use the file API
+    AI_INLINE_AUDIO_MAX_BYTES: int = 15 * 1024 * 1024
+    # Poll interval while an uploaded audio file is PROCESSING (file API path only)
+    AI_FILE_POLL_SECONDS: float = 0.5
+    # Audio normalization (mono Opus, silence trimmed) when ffmpeg is installed
+    AUDIO_NORMALIZE: bool = True
+    AUDIO_SAMPLE_RATE: int = 16000
+    AUDIO_BITRATE: str = "24k"
+    AUDIO_TRIM_SILENCE: bool = True
+    AUDIO_KEEP_ORIGINAL: bool = False
+    AUDIO_PROCESS_TIMEOUT_SECONDS: float = 120.0
+    # Worker processes for audio encoding and PDF text extraction
+    PROCESS_POOL_WORKERS: int = 2
+    # Live audio turns streamed over Socket.IO (app/audio_stream.py)
+    AUDIO_STREAM_MAX_BYTES: int = 25 * 1024 * 1024
+    AUDIO_STREAM_MAX_SEGMENTS: int = 120
+    AUDIO_STREAM_MAX_SECONDS: int = 900
+    AI_BREAKER_WINDOW: int = 20
+    AI_BREAKER_MIN_CALLS: int = 5
+    AI_BREAKER_FAILURE_RATE: float = 0.5
+    AI_BREAKER_CONSECUTIVE_FAILURES: int = 3
+    AI_BREAKER_SLOW_CALL_SECONDS: float = 30.0
+    AI_BREAKER_SLOW_CALL_RATE: float = 0.8
+    AI_BREAKER_OPEN_SECONDS: float = 30.0
 
     # Fact-Checking (Serper is free tier friendly)
     SERPER_API_KEY: str = os.getenv("SERPER_API_KEY", "")
     TAVILY_API_KEY: str = os.getenv("TAVILY_API_KEY", "")
+    # Normalized-claim result cache (in-process, TTL + LRU)
+    FACT_CHECK_CACHE_TTL_SECONDS: int = 6 * 3600
+    FACT_CHECK_CACHE_MAX_ENTRIES: int = 5000
+    FACT_CHECK_TIMEOUT_SECONDS: float = 10.0
+    # Automatic per-round fact-checking of claims extracted from turns
+    AUTO_FACT_CHECK: bool = True
+    FACT_CHECK_CLAIMS_PER_TURN: int = 3
+    FACT_CHECK_CONCURRENCY: int = 4
+    FACT_CHECK_ROOM_BUDGET: int = 60
+
+    # Shared outbound HTTP client (keep-alive pool; HTTP/2 when h2 is installed)
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+
+    # Background jobs (round analysis, AI turns, results)
+    # Set JOB_WORKERS_IN_API=false when running `python -m app.worker` separately
+    JOB_WORKERS_IN_API: bool = True
+    JOB_WORKERS: int = 2
+    JOB_MAX_ATTEMPTS: int = 5
+    JOB_LEASE_SECONDS: int = 300
+    JOB_POLL_SECONDS: float = 2.0
+    JOB_RETRY_BASE_SECONDS: float = 5.0
+    JOB_RETRY_MAX_SECONDS: float = 300.0
+    # Finished jobs (and their idempotency keys) are deleted after this long
+    JOB_RETENTION_SECONDS: int = 24 * 3600
+    JOB_PRUNE_INTERVAL_SECONDS: float = 600.0
 
     # WebSocket
     WS_HOST: str = "0.0.0.0"
     WS_PORT: int = 8000
+    # Message queue URL (e.g. redis://...) so separate worker processes can emit events
+    SOCKETIO_MESSAGE_QUEUE: str = os.getenv("SOCKETIO_MESSAGE_QUEUE", "")
 
     # CORS - Auto-detect Replit URL
     REPLIT_URL: str = os.getenv("REPLIT_DEV_DOMAIN", "")
@@ -43,8 +131,33 @@ class Settings(BaseSettings):
 
     # File Upload - Use Replit Object Storage
     MAX_FILE_SIZE_MB: int = 50
+    # Uploads are streamed to disk in chunks of this size
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    # Serving recorded audio and uploads (range requests, revalidation)
+    FILE_SERVE_CHUNK_SIZE: int = 256 * 1024
+    MEDIA_CACHE_MAX_AGE_SECONDS: int = 3600
+    # Room reference PDFs: passage chunking and retrieval for judging/fact-checks
+    REFERENCE_CHUNK_WORDS: int = 180
+    REFERENCE_CHUNK_OVERLAP_WORDS: int = 40
+    REFERENCE_PASSAGES_PER_TURN: int = 3
+    REFERENCE_PASSAGE_MAX_CHARS: int = 700
+    # Per-worker BM25 indexes kept in memory (LRU); invalidations keep them fresh
+    REFERENCE_INDEX_CACHE_ROOMS: int = 200
+    REFERENCE_INDEX_CACHE_TTL_SECONDS: int = 3600
     ALLOWED_FILE_EXTENSIONS: List[str] = ["pdf", "mp3", "wav", "ogg"]
 
+    # Cache - L2 store shared by all worker processes on the host
+    CACHE_DB_PATH: str = os.getenv("CACHE_DB_PATH", ".cache/shared_cache.sqlite3")
+    # Lock file serializing atomic DB updates (counters, job claims) between workers
+    DB_LOCK_PATH: str = os.getenv("DB_LOCK_PATH", ".cache/db.lock")
+    # How often each worker polls the shared invalidation log
+    CACHE_SYNC_INTERVAL_SECONDS: float = 0.5
+    NEGATIVE_CACHE_TTL_SECONDS: int = 30
+    EXISTENCE_FILTER_CAPACITY: int = 200_000
+
+    # Leaderboard - number of entries kept in the materialized top-K list
+    LEADERBOARD_SIZE: int = 100
+
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE: int = 60
 
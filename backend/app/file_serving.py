@@ -0,0 +1,130 @@
+"""
+Efficient local file serving for recorded audio and uploads
+
+Responses support single byte ranges (206 / 416) so browsers can seek in
+long recordings without downloading them, and validators (ETag,
+Last-Modified) so replays by many spectators are answered with 304. File
+bodies are never read into memory: when the server offers the ASGI
+`http.response.pathsend` extension a full response is handed to it (the
+server can sendfile it), otherwise the requested bytes are streamed in
+FILE_SERVE_CHUNK_SIZE reads.
+"""
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+import aiofiles
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from app.config import settings
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) for a single `bytes=` range, or None to send the
+    whole file (no header, multiple ranges or a unit we do not serve).
+    Raises 416 for a range that lies outside the file.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None
+    first, last = match.groups()
+    if first == "":
+        # Suffix range: the last N bytes
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Requested range not satisfiable",
+                            headers={"Content-Range": f"bytes */{size}"})
+    return start, end
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class FileRangeResponse(Response):
+    """Sends `length` bytes of `path` from `offset` without buffering the file"""
+
+    def __init__(self, path: str, offset: int, length: int, status_code: int, headers: dict, media_type: str):
+        super().__init__(status_code=status_code, headers=headers, media_type=media_type)
+        self.path = path
+        self.offset = offset
+        self.length = length
+        self.headers["content-length"] = str(length)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope.get("method") == "HEAD":
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.pathsend" in extensions and self.offset == 0 and self.length == os.path.getsize(self.path):
+            await send({"type": "http.response.pathsend", "path": os.path.abspath(self.path)})
+            return
+
+        remaining = self.length
+        async with aiofiles.open(self.path, "rb") as f:
+            await f.seek(self.offset)
+            while remaining > 0:
+                chunk = await f.read(min(settings.FILE_SERVE_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # File shrank under us; close the body so the client does not hang
+            await send({"type": "http.response.body", "body": b""})
+
+
+def serve_file(request: Request, path: Optional[str], media_type: Optional[str] = None) -> Response:
+    """Conditional, range-aware response for a local file (404 if it is missing)"""
+    if not path or not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"public, max-age={settings.MEDIA_CACHE_MAX_AGE_SECONDS}"
+    }
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = media_type or mimetypes.guess_type(path)[0] or "application/octet-stream"
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    # A stale If-Range validator means the client's partial copy is outdated: send it all
+    if not if_range or if_range == etag or if_range == headers["Last-Modified"]:
+        byte_range = parse_range(request.headers.get("range"), size)
+
+    if byte_range is None:
+        return FileRangeResponse(path, 0, size, 200, headers, media_type)
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return FileRangeResponse(path, start, end - start + 1, 206, headers, media_type)
+
+
+__all__ = ["serve_file", "parse_range", "FileRangeResponse"]
@@ -0,0 +1,201 @@
+"""
+Upload storage helpers
+
+Uploads are streamed to disk in fixed-size chunks through aiofiles, so
+peak memory per upload stays at one chunk regardless of file size, and the
+SHA-256 digest is computed on the fly.
+
+Starlette spools a multipart body to a temporary file before the endpoint
+runs, so an oversized upload is stopped earlier by UploadSizeLimitMiddleware:
+413 straight away when Content-Length is over the limit, or as soon as the
+received body passes it. save_upload() re-checks the file part itself.
+
+Uploaded files are kept in a content-addressed blob store
+(`uploads/blobs/ab/<sha256>`): identical content is stored once however
+many rooms reference it, and each blob's reference count lives in the
+`blobs` collection. Deleting an upload record releases its reference;
+the file is removed with the last one. Blobs are keyed by the hash of the
+uploaded bytes even when a transformed file is stored (normalized audio),
+because re-encoding is not deterministic.
+"""
+import hashlib
+import os
+import secrets
+from typing import Dict, Any, Optional, Tuple
+import aiofiles
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.replit_db import DB, Collections
+
+BLOB_DIR = "uploads/blobs"
+# Allowance for multipart boundaries and small form fields next to the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Max size: {round(max_bytes / (1024 * 1024), 1):g}MB")
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware rejecting multipart bodies over MAX_FILE_SIZE_MB before they are spooled"""
+
+    def __init__(self, app, max_bytes: Optional[int] = None):
+        self.app = app
+        self.max_bytes = max_bytes if max_bytes is not None else settings.MAX_FILE_SIZE_MB * 1024 * 1024
+
+    async def __call__(self, scope, receive, send):
+        headers = dict(scope.get("headers") or []) if scope["type"] == "http" else {}
+        if not headers.get(b"content-type", b"").startswith(b"multipart/"):
+            return await self.app(scope, receive, send)
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD_BYTES
+        try:
+            declared = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > limit:
+            error = _too_large(self.max_bytes)
+            response = JSONResponse({"detail": error.detail}, status_code=error.status_code,
+                                    headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Surfaces as a 413 from the request's form parsing
+                    raise _too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def save_upload(
+    upload: UploadFile,
+    dest_path: str,
+    max_bytes: Optional[int] = None
+) -> Tuple[int, str]:
+    """
+    Stream `upload` to `dest_path`
+    Returns: (size in bytes, sha256 hex digest)
+    The file only appears at `dest_path` once it is complete.
+    """
+    max_bytes = max_bytes if max_bytes is not None else settings.MAX_FILE_SIZE_MB * 1024 * 1024
+    directory = os.path.dirname(dest_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    partial_path = f"{dest_path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with aiofiles.open(partial_path, "wb") as f:
+            while True:
+                chunk = await upload.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                await f.write(chunk)
+        os.replace(partial_path, dest_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+
+    return size, digest.hexdigest()
+
+
+def blob_path(sha256: str) -> str:
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}"
+
+
+def temp_upload_path() -> str:
+    """Scratch path inside the blob store (same filesystem, so moves are renames)"""
+    return f"{BLOB_DIR}/tmp/{secrets.token_hex(8)}"
+
+
+def _commit_blob(local_path: str, sha256: str, size: int, **metadata: Any) -> Dict[str, Any]:
+    """
+    Move a local file into the store under `sha256` (or drop it as a
+    duplicate) and add a reference. `metadata` is kept on a new blob record.
+    """
+    path = blob_path(sha256)
+    with DB.atomic():
+        blob = DB.get(Collections.BLOBS, sha256)
+        if blob and os.path.exists(path):
+            os.remove(local_path)
+            return DB.update(Collections.BLOBS, sha256, {"ref_count": blob.get("ref_count", 0) + 1})
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(local_path, path)
+        return DB.insert(Collections.BLOBS, {
+            "id": sha256, "path": path, "size": size,
+            "ref_count": (blob or {}).get("ref_count", 0) + 1, **metadata
+        })
+
+
+def reuse_blob(sha256: str) -> Optional[Dict[str, Any]]:
+    """Add a reference to an existing blob, or return None if there is none"""
+    with DB.atomic():
+        blob = DB.get(Collections.BLOBS, sha256)
+        if not blob or not os.path.exists(blob["path"]):
+            return None
+        return DB.update(Collections.BLOBS, sha256, {"ref_count": blob.get("ref_count", 0) + 1})
+
+
+async def store_upload(upload: UploadFile, max_bytes: Optional[int] = None) -> Dict[str, Any]:
+    """Stream an upload into the blob store; returns the blob record {id (sha256), path, size, ref_count}"""
+    local_path = temp_upload_path()
+    size, sha256 = await save_upload(upload, local_path, max_bytes)
+    return _commit_blob(local_path, sha256, size)
+
+
+async def store_file(local_path: str, sha256: Optional[str] = None, **metadata: Any) -> Dict[str, Any]:
+    """
+    Move an existing local file into the blob store. The key is `sha256`
+    (e.g. the hash of the upload it was derived from), else the file's own
+    hash, computed in chunks.
+    """
+    if sha256 is None:
+        digest = hashlib.sha256()
+        async with aiofiles.open(local_path, "rb") as f:
+            while True:
+                chunk = await f.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+    return _commit_blob(local_path, sha256, os.path.getsize(local_path), **metadata)
+
+
+def release_blob(sha256: str) -> bool:
+    """
+    Drop one reference; the file is deleted when none remain
+    Returns False if no such blob exists.
+    """
+    with DB.atomic():
+        blob = DB.get(Collections.BLOBS, sha256)
+        if not blob:
+            return False
+        remaining = blob.get("ref_count", 1) - 1
+        if remaining > 0:
+            DB.update(Collections.BLOBS, sha256, {"ref_count": remaining})
+            return True
+        if os.path.exists(blob["path"]):
+            os.remove(blob["path"])
+        DB.delete(Collections.BLOBS, sha256)
+    print(f"🗑️  Removed unreferenced blob {sha256[:12]}")
+    return True
+
+
+__all__ = ["UploadSizeLimitMiddleware", "save_upload", "store_upload", "store_file", "reuse_blob", "release_blob", "blob_path", "temp_upload_path"]
@@ -2,10 +2,53 @@
 Gemini AI integration for Oratio
 Uses Google Gemini AI exclusively for debate judging and analysis
 """
-import httpx
+import aiofiles
+import asyncio
 import json
-from typing import Optional, Dict, Any, List
+import mimetypes
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Type, AsyncIterator
+from pydantic import BaseModel, ValidationError
 from app.config import settings
+from app.schemas import TurnAnalysis, RoundAnalysis, FinalVerdict
+from app.ai_metrics import ai_metrics
+from app.ai_cache import turn_analysis_cache
+from app.cache import SimpleCache
+from app.http_client import get_http_client
+from app.ai_scheduler import ai_scheduler, Priority
+from app.circuit_breaker import gemini_breaker, replit_ai_breaker, CircuitOpenError
+from app.heuristic_judge import heuristic_lcr_analysis
+
+# Bump when the LCR judging prompt changes so cached judgments are not reused
+LCR_PROMPT_VERSION = "lcr-v3"
+# Output tokens budgeted per turn in a batched judgment
+BATCH_TOKENS_PER_TURN = 1500
+
+# Static judgment returned when no provider is reachable; _parse_structured
+# recognizes it by value, so no marker field has to leak into payloads
+FALLBACK_JUDGMENT = """
+            {
+                "logic": 7,
+                "credibility": 7,
+                "rhetoric": 7,
+                "feedback": "Good argument structure. Consider adding more evidence.",
+                "strengths": ["Clear presentation"],
+                "weaknesses": ["Needs more supporting evidence"]
+            }
+            """
+
+# Fact-check results by normalized claim; identical claims in flight share one request
+fact_check_cache = SimpleCache(
+    ttl_seconds=settings.FACT_CHECK_CACHE_TTL_SECONDS,
+    max_entries=settings.FACT_CHECK_CACHE_MAX_ENTRIES
+)
+_fact_checks_in_flight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+# AI opponent argument used when no model output is available
+DEFAULT_ARGUMENT = "I argue that this is an important topic that deserves careful consideration. We must weigh both the benefits and drawbacks to reach a well-reasoned conclusion."
 
 # Import Gemini (Primary AI)
 try:
@@ -31,6 +74,59 @@ except ImportError:
     REPLIT_AI_AVAILABLE = False
     print("⚠️  Replit AI not available")
 
+# Bounded pool for provider SDK calls that are only available synchronously
+# (Gemini itself goes through the SDK's native async client `gemini_client.aio`)
+_blocking_executor = ThreadPoolExecutor(
+    max_workers=settings.AI_THREAD_POOL_SIZE, thread_name_prefix="ai-blocking")
+
+
+async def _run_blocking(func, *args):
+    """Run a blocking provider call without stalling the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_blocking_executor, func, *args)
+
+
+def model_for_task(task: str) -> str:
+    """Gemini model for an AI task, per the AI_TASK_TIERS routing table"""
+    if settings.AI_TASK_TIERS.get(task, "strong") == "fast":
+        return settings.GEMINI_FAST_MODEL
+    return settings.GEMINI_MODEL
+
+
+def _apply_tier_config(model: str, config):
+    """Tier-specific generation options (no thinking on the fast tier)"""
+    if model == settings.GEMINI_FAST_MODEL and settings.GEMINI_FAST_THINKING_BUDGET is not None:
+        from google.genai import types
+        config.thinking_config = types.ThinkingConfig(
+            thinking_budget=settings.GEMINI_FAST_THINKING_BUDGET)
+
+
+def _record_usage(task: str, model: str, started: float, response):
+    """Per-task latency and token accounting for a completed Gemini call"""
+    usage = getattr(response, "usage_metadata", None)
+    ai_metrics.record_call(
+        task, model, time.monotonic() - started,
+        prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+        # Thinking tokens are billed as output
+        output_tokens=(getattr(usage, "candidates_token_count", None) or 0) +
+                      (getattr(usage, "thoughts_token_count", None) or 0)
+    )
+
+
+async def _gemini_probe():
+    """Minimal request used to test Gemini while its circuit is open"""
+    from google.genai import types
+    async with ai_scheduler.slot(Priority.INTERACTIVE):
+        await gemini_client.aio.models.generate_content(
+            model=settings.GEMINI_FAST_MODEL,
+            contents="Reply with OK.",
+            config=types.GenerateContentConfig(max_output_tokens=5)
+        )
+
+
+if GEMINI_AVAILABLE and gemini_client:
+    gemini_breaker.set_probe(_gemini_probe)
+
 
 class GeminiAI:
     """Wrapper for Gemini AI API"""
@@ -38,21 +134,29 @@ class GeminiAI:
     @staticmethod
     async def chat_completion(
         messages: List[Dict[str, str]],
-        model: str = "gemini-2.5-pro",
+        model: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        priority: Priority = Priority.BACKGROUND,
+        response_schema: Optional[Type[BaseModel]] = None,
+        task: str = "chat"
     ) -> str:
         """
         Generate chat completion using Gemini AI
+        The model comes from the task's tier unless given explicitly.
+        Provider calls wait for a slot in the global AI scheduler. While
+        Gemini's circuit is open, calls go straight to the fallbacks.
+        With `response_schema`, Gemini is constrained to JSON matching it.
         """
+        model = model or model_for_task(task)
 
         if not GEMINI_AVAILABLE or not gemini_client:
             print("⚠️  Gemini AI unavailable, trying Replit AI fallback")
-            if REPLIT_AI_AVAILABLE:
-                return await GeminiAI._replit_ai_fallback(messages, temperature, max_tokens)
-            else:
-                print("⚠️  Replit AI also unavailable, using static fallback")
-                return GeminiAI._fallback_response(messages[-1]["content"])
+            return await GeminiAI._replit_ai_fallback(messages, temperature, max_tokens, priority)
+
+        if not gemini_breaker.allow_request():
+            print("⚡ Gemini circuit open, trying Replit AI fallback")
+            return await GeminiAI._replit_ai_fallback(messages, temperature, max_tokens, priority)
 
         try:
             # Convert messages to Gemini format
@@ -83,11 +187,19 @@ class GeminiAI:
             if system_instruction:
                 config.system_instruction = system_instruction
 
-            response = gemini_client.models.generate_content(
-                model=model,
-                contents=combined_content,
-                config=config
-            )
+            if response_schema is not None:
+                config.response_mime_type = "application/json"
+                config.response_schema = response_schema
+            _apply_tier_config(model, config)
+
+            async with ai_scheduler.slot(priority):
+                started = time.monotonic()
+                response = await gemini_breaker.run(gemini_client.aio.models.generate_content(
+                    model=model,
+                    contents=combined_content,
+                    config=config
+                ))
+                _record_usage(task, model, started, response)
 
             # Better error handling for Gemini responses
             if not response:
@@ -116,38 +228,92 @@ class GeminiAI:
             return result
 
         except Exception as e:
-            print(f"⚠️  Gemini AI failed: {e}")
-            print("⚠️  Using static fallback...")
-            return GeminiAI._fallback_response(messages[-1]["content"])
+            print(f"⚠️  Gemini AI failed: {e!r}")
+            ai_metrics.increment(task, "provider_errors")
+            return await GeminiAI._replit_ai_fallback(messages, temperature, max_tokens, priority)
 
     @staticmethod
     def _fallback_response(prompt: str) -> str:
         """Simple fallback when Gemini AI is unavailable"""
         if "judge" in prompt.lower() or "score" in prompt.lower():
-            return """
-            {
-                "logic": 7,
-                "credibility": 7,
-                "rhetoric": 7,
-                "feedback": "Good argument structure. Consider adding more evidence.",
-                "strengths": ["Clear presentation"],
-                "weaknesses": ["Needs more supporting evidence"]
-            }
-            """
+            return FALLBACK_JUDGMENT
         elif "fact" in prompt.lower():
             return "Unable to verify this claim without AI connection."
         else:
             return "AI analysis temporarily unavailable. Running in demo mode."
 
+    @staticmethod
+    def _parse_structured(response: str, schema: Type[BaseModel]) -> Optional[BaseModel]:
+        """
+        Validate a JSON response against `schema`
+        Returns None for the static fallback; raises ValueError on invalid output.
+        """
+        if response == FALLBACK_JUDGMENT:
+            return None
+        text = response.strip()
+        if not text.startswith("{"):
+            # Providers without a JSON mode may wrap the object in prose or fences
+            start = text.find('{')
+            end = text.rfind('}') + 1
+            if start != -1 and end > start:
+                text = text[start:end]
+        return schema.model_validate(json.loads(text))
+
+    @staticmethod
+    async def structured_completion(
+        messages: List[Dict[str, str]],
+        schema: Type[BaseModel],
+        task: str,
+        model: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: int = 2000,
+        priority: Priority = Priority.BACKGROUND
+    ) -> Optional[BaseModel]:
+        """
+        Chat completion constrained to `schema`, validated with pydantic
+        Invalid output is retried up to AI_STRUCTURED_RETRIES times and counted
+        in ai_metrics. Returns None when no provider produced a valid result.
+        """
+        attempt_messages = list(messages)
+        for attempt in range(settings.AI_STRUCTURED_RETRIES + 1):
+            response = await GeminiAI.chat_completion(
+                attempt_messages, model=model, temperature=temperature,
+                max_tokens=max_tokens, priority=priority, response_schema=schema, task=task)
+            try:
+                result = GeminiAI._parse_structured(response, schema)
+            except (ValueError, ValidationError) as e:
+                ai_metrics.increment(task, "parse_failures")
+                print(f"⚠️  Invalid structured output for {task} (attempt {attempt + 1}): {str(e)[:200]}")
+                attempt_messages = list(messages) + [{
+                    "role": "user",
+                    "content": f"Your previous reply was not valid JSON for the required schema ({str(e)[:300]}). Reply again with only the JSON object."
+                }]
+                continue
+
+            if result is None:
+                ai_metrics.increment(task, "provider_unavailable")
+            else:
+                ai_metrics.increment(task, "ok")
+            return result
+
+        ai_metrics.increment(task, "abandoned")
+        return None
+
     @staticmethod
     async def _replit_ai_fallback(
         messages: List[Dict[str, str]],
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        priority: Priority = Priority.BACKGROUND
     ) -> str:
         """
         Fallback to Replit AI when Gemini is unavailable
+        Uses the static fallback when Replit AI is missing or its circuit is open
         """
+        if not REPLIT_AI_AVAILABLE or not replit_ai_breaker.allow_request():
+            print("⚠️  Replit AI unavailable, using static fallback")
+            return GeminiAI._fallback_response(messages[-1]["content"])
+
         try:
             from replit.ai.modelfarm import ChatModel, ChatSession
 
@@ -167,8 +333,9 @@ class GeminiAI:
             # Create prompt
             full_prompt = system_prompt + user_prompt if system_prompt else user_prompt
 
-            # Generate response
-            response = model.chat(full_prompt)
+            # Generate response (blocking SDK call, run off the event loop)
+            async with ai_scheduler.slot(priority):
+                response = await replit_ai_breaker.run(_run_blocking(model.chat, full_prompt))
 
             return response if response else "Replit AI returned empty response"
 
@@ -176,46 +343,146 @@ class GeminiAI:
             print(f"⚠️  Replit AI fallback failed: {e}")
             return GeminiAI._fallback_response(messages[-1]["content"])
 
+    @staticmethod
+    async def stream_debate_argument(prompt: str) -> AsyncIterator[str]:
+        """
+        Stream a debate argument for the AI opponent as text chunks
+        Yields DEFAULT_ARGUMENT in one piece if Gemini produced nothing.
+        """
+        produced = False
+        if GEMINI_AVAILABLE and gemini_client and gemini_breaker.allow_request():
+            try:
+                from google.genai import types
+                model = model_for_task("debate_argument")
+                config = types.GenerateContentConfig(
+                    temperature=0.8,
+                    max_output_tokens=800,
+                )
+                _apply_tier_config(model, config)
+
+                async with ai_scheduler.slot(Priority.LIVE):
+                    started = time.monotonic()
+                    # The breaker times the wait for the stream to open
+                    stream = await gemini_breaker.run(gemini_client.aio.models.generate_content_stream(
+                        model=model,
+                        contents=prompt,
+                        config=config
+                    ))
+                    chunks = stream.__aiter__()
+                    last_chunk = None
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(
+                                chunks.__anext__(), timeout=settings.AI_REQUEST_TIMEOUT_SECONDS)
+                        except StopAsyncIteration:
+                            break
+                        last_chunk = chunk
+                        text = getattr(chunk, "text", None)
+                        if text:
+                            produced = True
+                            yield text
+                    if last_chunk is not None:
+                        _record_usage("debate_argument", model, started, last_chunk)
+            except Exception as e:
+                print(f"⚠️  AI argument streaming failed: {e!r}")
+                ai_metrics.increment("debate_argument", "provider_errors")
+
+        if not produced:
+            yield DEFAULT_ARGUMENT
+
     @staticmethod
     async def generate_debate_argument(prompt: str) -> str:
         """
         Generate a debate argument for AI opponent
         """
-        try:
-            if not GEMINI_AVAILABLE or not gemini_client:
-                return "I argue that this is an important topic that deserves careful consideration. We must weigh both the benefits and drawbacks to reach a well-reasoned conclusion."
-            
-            from google.genai import types
-            config = types.GenerateContentConfig(
-                temperature=0.8,
-                max_output_tokens=800,
-            )
-            
-            response = gemini_client.models.generate_content(
-                model="gemini-2.0-flash-exp",
-                contents=prompt,
-                config=config
-            )
-            
-            if response and response.text:
-                return response.text.strip()
-            else:
-                return "I argue that this is an important topic that deserves careful consideration. We must weigh both the benefits and drawbacks to reach a well-reasoned conclusion."
-        except Exception as e:
-            print(f"⚠️  AI argument generation failed: {e}")
-            return "I argue that this is an important topic that deserves careful consideration. We must weigh both the benefits and drawbacks to reach a well-reasoned conclusion."
+        chunks = [chunk async for chunk in GeminiAI.stream_debate_argument(prompt)]
+        return "".join(chunks).strip() or DEFAULT_ARGUMENT
+
+    @staticmethod
+    def _turn_cache_key(turn_content: str, context: Optional[str], evidence: Optional[str], model: str) -> str:
+        """
+        Cache key for one turn's LCR judgment by `model`, shared by batched
+        and per-turn judging so either can reuse the other's results
+        """
+        return turn_analysis_cache.make_key(
+            model, LCR_PROMPT_VERSION, turn_content, context, *([evidence] if evidence else []))
+
+    @staticmethod
+    async def _judge_batch(
+        pending: List[tuple],
+        context: Optional[str],
+        evidence: Dict[str, str],
+        model: str
+    ) -> Dict[str, Dict[str, Any]]:
+        """One batched LCR request for (turn, cache_key) pairs; returns {turn_id: analysis}"""
+        arguments = "\n\n".join(
+            f'Turn ID: {turn["id"]}\nArgument: "{turn["content"]}"'
+            + (f'\nEvidence:\n{evidence[str(turn["id"])]}' if evidence.get(str(turn["id"])) else "")
+            for turn, _ in pending)
+        prompt = f"""
+You are an expert debate judge. Analyze each argument below independently using the LCR model:
+
+**Logic (40%)**: Reasoning, coherence, argument structure
+**Credibility (35%)**: Evidence, facts, reliability
+**Rhetoric (25%)**: Persuasiveness, delivery, clarity
+
+Context: {context or "None"}
+
+Where evidence (fact-checks, room reference material) is given for a turn, weigh it in its Credibility score.
+
+{arguments}
+
+Provide scores (0-10) and brief feedback for every turn in JSON format, one entry per Turn ID:
+{{
+    "turns": [
+        {{
+            "turn_id": "<turn id>",
+            "logic": score,
+            "credibility": score,
+            "rhetoric": score,
+            "feedback": "brief analysis",
+            "strengths": ["point1", "point2"],
+            "weaknesses": ["point1", "point2"]
+        }}
+    ]
+}}
+"""
+        messages = [
+            {"role": "system", "content": "You are a professional debate judge using the LCR evaluation model. Always respond with valid JSON."},
+            {"role": "user", "content": prompt}
+        ]
+        parsed = await GeminiAI.structured_completion(
+            messages, RoundAnalysis, task="analyze_round", model=model,
+            temperature=0.3, max_tokens=min(BATCH_TOKENS_PER_TURN * len(pending), settings.AI_MAX_OUTPUT_TOKENS))
+        if parsed is None:
+            return {}
+        return {entry.turn_id: entry.model_dump(exclude={"turn_id"}) for entry in parsed.turns}
 
     @staticmethod
     async def analyze_debate_turn(
         turn_content: str,
         context: Optional[str] = None,
-        previous_turns: Optional[List[str]] = None
+        previous_turns: Optional[List[str]] = None,
+        priority: Priority = Priority.BACKGROUND,
+        task: str = "analyze_turn",
+        evidence: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze a single debate turn using LCR model
         Returns: {logic, credibility, rhetoric, feedback}
+        `evidence` is fact-check context for the turn's claims.
+        Identical inputs are served from the content-addressed cache.
         """
-
+        model = model_for_task(task)
+        cache_key = GeminiAI._turn_cache_key(turn_content, context, evidence, model)
+        cached = await turn_analysis_cache.get(cache_key)
+        if cached is not None:
+            print("✅ Turn analysis served from cache")
+            return cached
+
+        evidence_block = (
+            f"\nEvidence for this argument - fact-checks of its claims and room reference material (weigh it in Credibility):\n{evidence}\n"
+            if evidence else "")
         prompt = f"""
 You are an expert debate judge. Analyze this argument using the LCR model:
 
@@ -226,7 +493,7 @@ You are an expert debate judge. Analyze this argument using the LCR model:
 Argument: "{turn_content}"
 
 Context: {context or "None"}
-
+{evidence_block}
 Provide scores (0-10) and brief feedback in JSON format:
 {{
     "logic": score,
@@ -243,27 +510,74 @@ Provide scores (0-10) and brief feedback in JSON format:
             {"role": "user", "content": prompt}
         ]
 
-        response = await GeminiAI.chat_completion(messages, temperature=0.3, max_tokens=2000)
+        parsed = await GeminiAI.structured_completion(
+            messages, TurnAnalysis, task=task, model=model,
+            temperature=0.3, max_tokens=2000, priority=priority)
 
-        try:
-            # Try to parse JSON response
-            # Extract JSON from response
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response[start:end])
-        except:
-            pass
+        if parsed is None:
+            # No provider produced a valid judgment: estimate scores locally
+            # (never cached, so a later call can replace it with a real one)
+            return heuristic_lcr_analysis(turn_content)
 
-        # Fallback response
-        return {
-            "logic": 7,
-            "credibility": 7,
-            "rhetoric": 7,
-            "feedback": "Analysis in progress...",
-            "strengths": ["Clear argument"],
-            "weaknesses": ["Needs more evidence"]
-        }
+        analysis = parsed.model_dump()
+        await turn_analysis_cache.set(cache_key, analysis)
+        return analysis
+
+    @staticmethod
+    async def analyze_debate_round(
+        turns: List[Dict[str, Any]],
+        context: Optional[str] = None,
+        evidence: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Judge several turns with one LCR prompt
+        Returns: {turn_id: {logic, credibility, rhetoric, feedback, ...}}
+        `evidence` maps turn IDs to fact-check context for their claims.
+        Cached turns are skipped; turns missing from (or unparseable in) the
+        batched response fall back to individual analyze_debate_turn calls.
+        """
+        model = model_for_task("analyze_round")
+        evidence = evidence or {}
+        analyses: Dict[str, Dict[str, Any]] = {}
+        pending = []
+        for turn in turns:
+            cache_key = GeminiAI._turn_cache_key(turn["content"], context, evidence.get(str(turn["id"])), model)
+            cached = await turn_analysis_cache.get(cache_key)
+            if cached is not None:
+                analyses[str(turn["id"])] = cached
+            else:
+                pending.append((turn, cache_key))
+
+        if len(pending) > 1:
+            # Stay under the model's output limit: one request per chunk of turns
+            per_request = max(2, settings.AI_MAX_OUTPUT_TOKENS // BATCH_TOKENS_PER_TURN)
+            chunks = [pending[i:i + per_request] for i in range(0, len(pending), per_request)]
+            batches = await asyncio.gather(*[
+                GeminiAI._judge_batch(chunk, context, evidence, model) for chunk in chunks])
+            judged = {turn_id: analysis for batch in batches for turn_id, analysis in batch.items()}
+
+            remaining = []
+            for turn, cache_key in pending:
+                analysis = judged.get(str(turn["id"]))
+                if analysis is not None:
+                    await turn_analysis_cache.set(cache_key, analysis)
+                    analyses[str(turn["id"])] = analysis
+                else:
+                    remaining.append((turn, cache_key))
+            if remaining:
+                print(f"⚠️  Batched judging missed {len(remaining)} turn(s), falling back to per-turn calls")
+            pending = remaining
+
+        # Per-turn fallback (also used when only one turn needs judging)
+        results = await asyncio.gather(*[
+            GeminiAI.analyze_debate_turn(
+                turn_content=turn["content"], context=context, evidence=evidence.get(str(turn["id"])))
+            for turn, _ in pending
+        ])
+        for (turn, _), analysis in zip(pending, results):
+            analyses[str(turn["id"])] = analysis
+
+        return analyses
 
     @staticmethod
     async def generate_final_verdict(
@@ -273,24 +587,24 @@ Provide scores (0-10) and brief feedback in JSON format:
     ) -> Dict[str, Any]:
         """
         Generate final debate verdict and winner
+        Returns: {winner_id, summary, feedback: {participant_id: text}, key_moments}
         """
 
         prompt = f"""
 You are a debate judge. Based on the following scores, determine the winner and provide feedback.
 
-**Participants Scores:**
+**Participants Scores (keyed by participant ID):**
 {participant_scores}
 
 **Debate Topic:** {room_data.get('topic', 'Unknown')}
 
-Provide a final verdict in JSON:
+Provide a final verdict in JSON, with one feedback entry per participant ID:
 {{
-    "winner_id": participant_id,
+    "winner_id": "participant id",
     "summary": "Overall debate summary",
-    "feedback": {{
-        "participant_1": "personalized feedback",
-        "participant_2": "personalized feedback"
-    }},
+    "feedback": [
+        {{"participant_id": "participant id", "feedback": "personalized feedback"}}
+    ],
     "key_moments": ["moment1", "moment2"]
 }}
 """
@@ -300,78 +614,131 @@ Provide a final verdict in JSON:
             {"role": "user", "content": prompt}
         ]
 
-        response = await GeminiAI.chat_completion(messages, temperature=0.5, max_tokens=3000)
+        verdict = await GeminiAI.structured_completion(
+            messages, FinalVerdict, task="final_verdict",
+            temperature=0.5, max_tokens=3000)
 
-        try:
-            start = response.find('{')
-            end = response.rfind('}') + 1
-            if start != -1 and end > start:
-                return json.loads(response[start:end])
-        except:
-            pass
+        # Map string IDs from the model back onto the caller's participant keys
+        keys_by_str = {str(pid): pid for pid in participant_scores}
+
+        def weighted(score: Dict[str, float]) -> float:
+            return score.get("weighted_total", (
+                score.get("logic", 0) * 0.4 +
+                score.get("credibility", 0) * 0.35 +
+                score.get("rhetoric", 0) * 0.25
+            ))
+
+        top_scorer = max(participant_scores, key=lambda pid: weighted(participant_scores[pid] or {})) \
+            if participant_scores else None
+
+        if verdict is None:
+            return {
+                "winner_id": top_scorer,
+                "summary": "Debate completed. Check individual scores for details.",
+                "feedback": {},
+                "key_moments": []
+            }
 
-        # Fallback
         return {
-            "winner_id": list(participant_scores.keys())[0] if participant_scores else None,
-            "summary": "Debate completed. Check individual scores for details.",
-            "feedback": {},
-            "key_moments": []
+            "winner_id": keys_by_str.get(str(verdict.winner_id), top_scorer),
+            "summary": verdict.summary,
+            "feedback": {
+                keys_by_str[entry.participant_id]: entry.feedback
+                for entry in verdict.feedback if entry.participant_id in keys_by_str
+            },
+            "key_moments": verdict.key_moments
         }
 
     @staticmethod
-    async def transcribe_audio(audio_path: str) -> str:
+    async def transcribe_audio(audio_path: str, mime_type: Optional[str] = None) -> str:
         """
         Transcribe audio file using Gemini AI
+        Clips up to AI_INLINE_AUDIO_MAX_BYTES are sent inline with the request;
+        larger recordings go through the file API (upload, poll, delete).
         Returns: Transcribed text
         """
         if not GEMINI_AVAILABLE or not gemini_client:
             print("⚠️  Gemini AI unavailable, cannot transcribe audio")
             return "[Audio transcription unavailable]"
 
-        try:
+        if not gemini_breaker.allow_request():
+            print("⚡ Gemini circuit open, cannot transcribe audio")
+            return "[Audio transcription unavailable]"
+
+        model = model_for_task("transcription")
+        # Containers like .webm/.mp4 guess as video/*; the upload is audio-only
+        mime_type = (mime_type or mimetypes.guess_type(audio_path)[0] or "audio/webm").replace("video/", "audio/")
+        prompt = "Please transcribe this audio file accurately. Provide only the transcription without any additional commentary."
+
+        async def generate(audio_part):
+            from google.genai import types
+            config = types.GenerateContentConfig()
+            _apply_tier_config(model, config)
+            started = time.monotonic()
+            response = await gemini_client.aio.models.generate_content(
+                model=model,
+                contents=[audio_part, prompt],
+                config=config
+            )
+            _record_usage("transcription", model, started, response)
+            return response
+
+        async def transcribe_inline():
+            from google.genai import types
+            async with aiofiles.open(audio_path, "rb") as f:
+                audio_bytes = await f.read()
+            return await generate(types.Part.from_bytes(data=audio_bytes, mime_type=mime_type))
+
+        async def upload_and_transcribe():
             import pathlib
-            import asyncio
 
             # Upload the audio file
-            audio_file = gemini_client.files.upload(
+            audio_file = await gemini_client.aio.files.upload(
                 file=pathlib.Path(audio_path))
 
             if not audio_file or not hasattr(audio_file, 'name'):
                 raise ValueError("File upload failed")
 
-            # Wait for file to be ready (non-blocking)
-            while hasattr(audio_file, 'state') and audio_file.state == "PROCESSING":
-                await asyncio.sleep(1)
-                audio_file = gemini_client.files.get(name=audio_file.name)
-
-            if hasattr(audio_file, 'state') and audio_file.state == "FAILED":
-                raise ValueError("Audio file processing failed")
-
-            # Generate transcription
-            prompt = "Please transcribe this audio file accurately. Provide only the transcription without any additional commentary."
-
-            # Build contents manually to avoid type issues
-            file_uri = getattr(audio_file, 'uri', None)
-            mime_type = getattr(audio_file, 'mime_type', None)
-
-            if not file_uri:
-                raise ValueError("No file URI available")
-
-            from google.genai import types
-            file_part = types.Part.from_uri(
-                file_uri=file_uri, mime_type=mime_type or "audio/webm")
+            try:
+                # Wait for file to be ready (non-blocking)
+                while hasattr(audio_file, 'state') and audio_file.state == "PROCESSING":
+                    await asyncio.sleep(settings.AI_FILE_POLL_SECONDS)
+                    audio_file = await gemini_client.aio.files.get(name=audio_file.name)
+
+                if hasattr(audio_file, 'state') and audio_file.state == "FAILED":
+                    raise ValueError("Audio file processing failed")
+
+                # Build contents manually to avoid type issues
+                file_uri = getattr(audio_file, 'uri', None)
+                if not file_uri:
+                    raise ValueError("No file URI available")
+
+                from google.genai import types
+                file_part = types.Part.from_uri(
+                    file_uri=file_uri,
+                    mime_type=getattr(audio_file, 'mime_type', None) or mime_type)
+                return await generate(file_part)
+            finally:
+                # Clean up the uploaded file
+                if hasattr(audio_file, 'name') and audio_file.name:
+                    try:
+                        await gemini_client.aio.files.delete(name=audio_file.name)
+                    except Exception:
+                        pass  # Ignore cleanup errors
 
-            response = gemini_client.models.generate_content(
-                model="gemini-2.5-pro",
-                contents=[file_part, prompt]
-            )
+        try:
+            inline = os.path.getsize(audio_path) <= settings.AI_INLINE_AUDIO_MAX_BYTES
+        except OSError:
+            inline = False  # Let the upload path report the missing file
+        ai_metrics.increment("transcription", "inline" if inline else "file_api")
 
-            # Clean up the uploaded file
-            if hasattr(audio_file, 'name') and audio_file.name:
-                try:
-                    gemini_client.files.delete(name=audio_file.name)
-                except:
-                    pass  # Ignore cleanup errors
+        try:
+            async with ai_scheduler.slot(Priority.LIVE):
+                response = await gemini_breaker.run(
+                    transcribe_inline() if inline else upload_and_transcribe(),
+                    timeout=settings.AI_TRANSCRIPTION_TIMEOUT_SECONDS,
+                    slow_call_seconds=settings.AI_TRANSCRIPTION_TIMEOUT_SECONDS
+                )
 
             # Extract transcription
             transcription = getattr(response, 'text', None)
@@ -389,10 +756,17 @@ Provide a final verdict in JSON:
             traceback.print_exc()
             return "[Audio transcription failed - please try again]"
 
+    @staticmethod
+    def normalize_claim(statement: str) -> str:
+        """Canonical form of a claim for caching: case, spacing and end punctuation ignored"""
+        return re.sub(r"\s+", " ", statement or "").strip().strip(".!?;:,").lower()
+
     @staticmethod
     async def fact_check(statement: str, context: Optional[str] = None) -> Dict[str, Any]:
         """
         Fact-check a statement (requires external API like Serper)
+        Results are cached by normalized claim, and concurrent checks of the
+        same claim share a single upstream request.
         """
 
         if not settings.SERPER_API_KEY:
@@ -403,28 +777,63 @@ Provide a final verdict in JSON:
                 "summary": "Fact-checking unavailable (no API key)"
             }
 
-        # Use Serper API for web search
+        claim = GeminiAI.normalize_claim(statement)
+        cached = fact_check_cache.get(claim)
+        if cached is not None:
+            ai_metrics.increment("fact_check", "cache_hits")
+            return dict(cached)
+
+        in_flight = _fact_checks_in_flight.get(claim)
+        if in_flight is not None:
+            ai_metrics.increment("fact_check", "deduplicated")
+            return dict(await asyncio.shield(in_flight))
+
+        future = asyncio.get_running_loop().create_future()
+        _fact_checks_in_flight[claim] = future
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "https://google.serper.dev/search",
-                    headers={
-                        "X-API-KEY": settings.SERPER_API_KEY,
-                        "Content-Type": "application/json"
-                    },
-                    json={"q": statement},
-                    timeout=10.0
-                )
+            result, cacheable = await GeminiAI._serper_search(statement)
+            if cacheable:
+                fact_check_cache.set(claim, result)
+            future.set_result(result)
+            return dict(result)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else is waiting
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            _fact_checks_in_flight.pop(claim, None)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    # Process search results
-                    return {
-                        "verified": True,
-                        "confidence": 0.7,
-                        "sources": [r.get("link") for r in data.get("organic", [])[:3]],
-                        "summary": data.get("answerBox", {}).get("answer", "No direct answer found")
-                    }
+    @staticmethod
+    async def _serper_search(statement: str):
+        """One Serper request over the shared client; returns (result, cacheable)"""
+        started = time.monotonic()
+        try:
+            client = get_http_client()
+            response = await client.post(
+                "https://google.serper.dev/search",
+                headers={
+                    "X-API-KEY": settings.SERPER_API_KEY,
+                    "Content-Type": "application/json"
+                },
+                json={"q": statement},
+                timeout=settings.FACT_CHECK_TIMEOUT_SECONDS
+            )
+            ai_metrics.record_call("fact_check", "serper", time.monotonic() - started)
+
+            if response.status_code == 200:
+                data = response.json()
+                # Process search results
+                return {
+                    "verified": True,
+                    "confidence": 0.7,
+                    "sources": [r.get("link") for r in data.get("organic", [])[:3]],
+                    "snippets": [r.get("snippet") for r in data.get("organic", [])[:3]],
+                    "summary": data.get("answerBox", {}).get("answer", "No direct answer found")
+                }, True
+            print(f"Fact-check error: HTTP {response.status_code}")
         except Exception as e:
             print(f"Fact-check error: {e}")
 
@@ -432,9 +841,10 @@ Provide a final verdict in JSON:
             "verified": False,
             "confidence": 0,
             "sources": [],
+            "snippets": [],
             "summary": "Unable to verify"
-        }
+        }, False
 
 
 # Export
-__all__ = ["GeminiAI", "GEMINI_AVAILABLE"]
+__all__ = ["GeminiAI", "GEMINI_AVAILABLE", "model_for_task"]
@@ -0,0 +1,87 @@
+"""
+Local heuristic LCR scorer
+
+Used when no AI provider can judge a turn (circuits open or providers
+unavailable). Scores are estimated from surface features of the text:
+reasoning connectives for Logic, evidence markers for Credibility and
+audience-directed devices for Rhetoric. They are rough, but they track
+the argument instead of returning the same score for every turn.
+"""
+import re
+from typing import Dict, Any, List
+
+WORD_RE = re.compile(r"[A-Za-z']+|\d+(?:\.\d+)?%?")
+SENTENCE_RE = re.compile(r"[.!?]+")
+
+REASONING_MARKERS = [
+    "because", "therefore", "thus", "hence", "since", "consequently",
+    "as a result", "which means", "it follows", "if ", "however",
+    "although", "first", "second", "finally", "for example", "for instance"
+]
+EVIDENCE_MARKERS = [
+    "according to", "study", "studies", "research", "data", "survey",
+    "report", "evidence", "statistics", "percent", "experts", "published",
+    "university", "journal"
+]
+RHETORIC_MARKERS = [
+    "imagine", "consider", "picture", "we ", "our ", "you ", "together",
+    "must", "clearly", "undeniably"
+]
+
+
+def _count(text: str, markers: List[str]) -> int:
+    return sum(text.count(marker) for marker in markers)
+
+
+def _clamp(score: float) -> float:
+    return round(max(0.0, min(10.0, score)), 1)
+
+
+def heuristic_lcr_analysis(content: str) -> Dict[str, Any]:
+    """Estimate LCR scores for one turn without calling an AI provider"""
+    text = f" {(content or '').lower()} "
+    words = WORD_RE.findall(text)
+    word_count = len(words)
+    sentences = [s for s in SENTENCE_RE.split(content or "") if s.strip()]
+    numbers = sum(1 for w in words if w[0].isdigit())
+
+    reasoning = _count(text, REASONING_MARKERS)
+    evidence = _count(text, EVIDENCE_MARKERS) + numbers
+    rhetoric = _count(text, RHETORIC_MARKERS) + (content or "").count("?")
+
+    # Very short turns cannot develop an argument, whatever their wording
+    development = min(1.0, word_count / 80)
+
+    logic = 3 + development * (2 + min(4, reasoning) + (1 if len(sentences) >= 3 else 0))
+    credibility = 3 + development * (1 + min(5, evidence * 1.5))
+    avg_sentence = word_count / len(sentences) if sentences else word_count
+    rhetoric_score = 3.5 + development * (1.5 + min(3, rhetoric) + (1 if 8 <= avg_sentence <= 25 else 0))
+
+    strengths, weaknesses = [], []
+    if reasoning >= 2:
+        strengths.append("Uses explicit reasoning to connect points")
+    else:
+        weaknesses.append("Make the reasoning between claims more explicit")
+    if evidence >= 2:
+        strengths.append("References evidence or figures")
+    else:
+        weaknesses.append("Needs more supporting evidence")
+    if rhetoric >= 2:
+        strengths.append("Engages the audience directly")
+    if word_count < 40:
+        weaknesses.append("Develop the argument in more depth")
+    if not strengths:
+        strengths.append("Clear position stated")
+
+    return {
+        "logic": _clamp(logic),
+        "credibility": _clamp(credibility),
+        "rhetoric": _clamp(rhetoric_score),
+        "feedback": "Estimated locally while the AI judge is unavailable; scores are approximate.",
+        "strengths": strengths,
+        "weaknesses": weaknesses,
+        "scorer": "heuristic"
+    }
+
+
+__all__ = ["heuristic_lcr_analysis"]
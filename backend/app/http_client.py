@@ -0,0 +1,58 @@
+"""
+Process-wide pooled HTTP client for outbound API calls
+
+One httpx.AsyncClient per process keeps connections to external APIs
+(Serper, ...) alive between requests instead of paying a TCP/TLS
+handshake per call. HTTP/2 is used when the `h2` package is installed.
+The client is opened at startup and closed at shutdown; code running
+outside the app lifecycle (scripts, the job worker) gets one lazily.
+"""
+from typing import Optional
+import httpx
+from app.config import settings
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_AVAILABLE,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+        ),
+        timeout=httpx.Timeout(10.0, connect=5.0)
+    )
+
+
+def start_http_client():
+    """Open the shared client (call on startup)"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+        print(f"🌐 HTTP client pool ready ({'HTTP/2' if HTTP2_AVAILABLE else 'HTTP/1.1'})")
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Shared client, created on first use if startup did not open it"""
+    if _client is None or _client.is_closed:
+        start_http_client()
+    return _client
+
+
+async def close_http_client():
+    """Close pooled connections (call on shutdown)"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+__all__ = ["get_http_client", "start_http_client", "close_http_client", "HTTP2_AVAILABLE"]
@@ -0,0 +1,321 @@
+"""
+Durable background job queue stored in the database
+
+Jobs are documents in the `jobs` collection, so round analysis, AI
+opponent turns and result generation survive restarts and crashes.
+Worker coroutines claim due jobs with a lease, retry failures with
+exponential backoff and mark them done or failed. A job's ID is its
+idempotency key (e.g. `analyze_round:{room_id}:{round}`), so enqueueing
+the same work twice is a no-op while it is pending, running or done
+(finished jobs are pruned after JOB_RETENTION_SECONDS).
+
+Claims are compare-and-set under the DB host lock and hand out a fresh
+`claim_token`; a heartbeat extends the lease while the handler runs, and
+results are only written while the token still matches. Due job ids are
+kept in a small index document so polling never scans the collection.
+
+Workers run inside the API process by default (JOB_WORKERS_IN_API) or in
+a separate process via `python -m app.worker`.
+"""
+import asyncio
+import os
+import secrets
+import time
+import traceback
+from typing import Dict, Any, Callable, Awaitable, List, Optional
+from app.replit_db import DB, Collections
+from app.config import settings
+
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class JobQueue:
+    """Persistent job queue with leased claims, retries and idempotency keys"""
+
+    DUE_INDEX = "due"  # {job_id: run_at (pending) or lease_until (running)}
+    FINISHED_INDEX = "finished"  # {job_id: finished_at}
+
+    def __init__(self):
+        self.handlers: Dict[str, JobHandler] = {}
+        self.worker_id = f"{os.getpid()}-{secrets.token_hex(3)}"
+        self._workers: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._last_prune = 0.0
+
+    def handler(self, job_type: str):
+        """Decorator registering the coroutine that runs `job_type` jobs"""
+        def register(func: JobHandler) -> JobHandler:
+            self.handlers[job_type] = func
+            return func
+        return register
+
+    def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        key: Optional[str] = None,
+        room_id: Optional[str] = None,
+        delay_seconds: float = 0,
+        max_attempts: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Persist a job. `key` is the idempotency key: an existing job with
+        the same key is returned unchanged unless it previously failed.
+        """
+        job_id = key or f"{job_type}:{secrets.token_hex(8)}"
+        with DB.atomic():
+            existing = DB.get(Collections.JOBS, job_id)
+            if existing and existing.get("status") != JobStatus.FAILED:
+                return existing
+
+            job = {
+                "id": job_id,
+                "type": job_type,
+                "room_id": str(room_id) if room_id is not None else None,
+                "payload": payload,
+                "status": JobStatus.PENDING,
+                "attempts": 0,
+                "max_attempts": max_attempts or settings.JOB_MAX_ATTEMPTS,
+                "run_at": time.time() + delay_seconds,
+                "lease_until": None,
+                "worker_id": None,
+                "claim_token": None,
+                "last_error": None
+            }
+            if existing:
+                job = DB.update(Collections.JOBS, job_id, job)
+            else:
+                job = DB.insert(Collections.JOBS, job)
+            self._index_set(self.FINISHED_INDEX, job_id, None)
+            self._index_set(self.DUE_INDEX, job_id, job["run_at"])
+        print(f"📥 Enqueued job {job_id}")
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return DB.get(Collections.JOBS, job_id)
+
+    def list_for_room(self, room_id: str) -> List[Dict[str, Any]]:
+        jobs = DB.find(Collections.JOBS, {"room_id": str(room_id)}, limit=10_000_000)
+        return sorted(jobs, key=lambda j: j.get("created_at", ""))
+
+    @staticmethod
+    def _index_set(index_id: str, job_id: str, value: Optional[float]):
+        """Add, move or (value None) remove a job id in an index document; call under DB.atomic()"""
+        index = DB.get(Collections.JOB_INDEX, index_id)
+        jobs = index.get("jobs", {}) if index else {}
+        if value is None:
+            if job_id not in jobs:
+                return
+            jobs.pop(job_id)
+        else:
+            jobs[job_id] = value
+        if index:
+            DB.update(Collections.JOB_INDEX, index_id, {"jobs": jobs})
+        else:
+            DB.insert(Collections.JOB_INDEX, {"id": index_id, "jobs": jobs})
+
+    def rebuild_index(self):
+        """Rebuild the due/finished indexes with one collection scan (startup, migrations)"""
+        due, finished = {}, {}
+        with DB.atomic():
+            for job in DB.find(Collections.JOBS, limit=10_000_000):
+                status = job.get("status")
+                if status == JobStatus.PENDING:
+                    due[job["id"]] = job.get("run_at", 0)
+                elif status == JobStatus.RUNNING:
+                    due[job["id"]] = job.get("lease_until") or 0
+                else:
+                    finished[job["id"]] = job.get("finished_at") or 0
+            DB.insert(Collections.JOB_INDEX, {"id": self.DUE_INDEX, "jobs": due})
+            DB.insert(Collections.JOB_INDEX, {"id": self.FINISHED_INDEX, "jobs": finished})
+        print(f"🗂️  Job index rebuilt ({len(due)} due, {len(finished)} finished)")
+
+    def _claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest due job (pending, or running with an expired lease)"""
+        now = time.time()
+        with DB.atomic():
+            index = DB.get(Collections.JOB_INDEX, self.DUE_INDEX)
+            due = [(at, job_id) for job_id, at in (index or {}).get("jobs", {}).items()
+                   if at <= now]
+            for _, job_id in sorted(due):
+                job = DB.get(Collections.JOBS, job_id)
+                status = job.get("status") if job else None
+                if status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                    self._index_set(self.DUE_INDEX, job_id, None)  # Stale entry
+                    continue
+                # Compare-and-set: re-check the document now that we hold the lock
+                if status == JobStatus.PENDING and job.get("run_at", 0) > now:
+                    continue
+                if status == JobStatus.RUNNING and (job.get("lease_until") or 0) >= now:
+                    continue  # Lease still held (expired leases mean a crashed worker)
+
+                lease_until = now + settings.JOB_LEASE_SECONDS
+                claimed = DB.update(Collections.JOBS, job_id, {
+                    "status": JobStatus.RUNNING,
+                    "worker_id": self.worker_id,
+                    "claim_token": secrets.token_hex(8),
+                    "lease_until": lease_until,
+                    "attempts": job.get("attempts", 0) + 1
+                })
+                self._index_set(self.DUE_INDEX, job_id, lease_until)
+                return claimed
+        return None
+
+    def _finish(self, job: Dict[str, Any], updates: Dict[str, Any]) -> bool:
+        """Write a job's outcome if this worker still holds its claim"""
+        with DB.atomic():
+            current = DB.get(Collections.JOBS, job["id"])
+            if not current or current.get("claim_token") != job.get("claim_token"):
+                print(f"⚠️  Job {job['id']} was re-claimed elsewhere; dropping this result")
+                return False
+            DB.update(Collections.JOBS, job["id"], {**updates, "lease_until": None, "claim_token": None})
+            if updates["status"] == JobStatus.PENDING:
+                self._index_set(self.DUE_INDEX, job["id"], updates["run_at"])
+            else:
+                self._index_set(self.DUE_INDEX, job["id"], None)
+                self._index_set(self.FINISHED_INDEX, job["id"], updates["finished_at"])
+        return True
+
+    def _renew_lease(self, job: Dict[str, Any]) -> bool:
+        """Push the lease forward; False if the claim was lost"""
+        with DB.atomic():
+            current = DB.get(Collections.JOBS, job["id"])
+            if not current or current.get("claim_token") != job.get("claim_token"):
+                return False
+            lease_until = time.time() + settings.JOB_LEASE_SECONDS
+            DB.update(Collections.JOBS, job["id"], {"lease_until": lease_until})
+            self._index_set(self.DUE_INDEX, job["id"], lease_until)
+        return True
+
+    async def _heartbeat(self, job: Dict[str, Any], task: asyncio.Future) -> bool:
+        """Renew the lease while the handler runs; cancel it (and return True) if the claim is lost"""
+        while True:
+            await asyncio.sleep(settings.JOB_LEASE_SECONDS / 3)
+            try:
+                held = self._renew_lease(job)
+            except Exception as e:
+                print(f"⚠️  Lease renewal failed for job {job['id']}: {e}")
+                continue
+            if not held:
+                print(f"⚠️  Lost lease on job {job['id']}; cancelling")
+                task.cancel()
+                return True
+
+    def _prune(self):
+        """Delete finished jobs older than JOB_RETENTION_SECONDS"""
+        now = time.time()
+        if now - self._last_prune < settings.JOB_PRUNE_INTERVAL_SECONDS:
+            return
+        self._last_prune = now
+        cutoff = now - settings.JOB_RETENTION_SECONDS
+        with DB.atomic():
+            index = DB.get(Collections.JOB_INDEX, self.FINISHED_INDEX)
+            finished = (index or {}).get("jobs", {})
+            expired = [job_id for job_id, at in finished.items() if at < cutoff]
+            if not expired:
+                return
+            for job_id in expired:
+                job = DB.get(Collections.JOBS, job_id)
+                if job and job.get("status") in (JobStatus.DONE, JobStatus.FAILED):
+                    DB.delete(Collections.JOBS, job_id)
+                finished.pop(job_id)
+            DB.update(Collections.JOB_INDEX, self.FINISHED_INDEX, {"jobs": finished})
+        print(f"🧹 Pruned {len(expired)} finished job(s)")
+
+    async def _run(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["type"])
+        heartbeat = None
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job type '{job['type']}'")
+            task = asyncio.ensure_future(handler(job.get("payload") or {}))
+            heartbeat = asyncio.create_task(self._heartbeat(job, task))
+            try:
+                result = await task
+            finally:
+                heartbeat.cancel()
+            if self._finish(job, {
+                "status": JobStatus.DONE,
+                "last_error": None,
+                "result": result if isinstance(result, (dict, list, str, int, float, bool)) else None,
+                "finished_at": time.time()
+            }):
+                print(f"✅ Job {job['id']} done")
+        except asyncio.CancelledError:
+            lost = heartbeat is not None and heartbeat.done() and not heartbeat.cancelled()
+            if not lost or heartbeat.result() is not True:
+                raise
+            # Cancelled by the heartbeat: another worker owns the job now
+        except Exception as e:
+            traceback.print_exc()
+            attempts = job.get("attempts", 1)
+            if attempts >= job.get("max_attempts", settings.JOB_MAX_ATTEMPTS):
+                if self._finish(job, {
+                    "status": JobStatus.FAILED,
+                    "last_error": str(e),
+                    "finished_at": time.time()
+                }):
+                    print(f"❌ Job {job['id']} failed after {attempts} attempts: {e}")
+            else:
+                backoff = min(settings.JOB_RETRY_MAX_SECONDS,
+                              settings.JOB_RETRY_BASE_SECONDS * (2 ** (attempts - 1)))
+                if self._finish(job, {
+                    "status": JobStatus.PENDING,
+                    "last_error": str(e),
+                    "run_at": time.time() + backoff
+                }):
+                    print(f"🔁 Job {job['id']} retrying in {backoff:.0f}s: {e}")
+
+    async def _worker(self):
+        while not self._stopping:
+            try:
+                self._prune()
+                job = self._claim()
+            except Exception as e:
+                print(f"⚠️  Job claim failed: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    def start(self, workers: Optional[int] = None):
+        """Start worker coroutines on the running event loop"""
+        if self._workers:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self.rebuild_index()
+        count = workers or settings.JOB_WORKERS
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(count)]
+        print(f"👷 Started {count} job worker(s) ({self.worker_id})")
+
+    async def stop(self):
+        """Stop workers; interrupted jobs are re-claimed after their lease expires"""
+        self._stopping = True
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+job_queue = JobQueue()
+
+__all__ = ["JobQueue", "JobStatus", "job_queue"]
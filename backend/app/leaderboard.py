@@ -0,0 +1,254 @@
+"""
+Materialized global leaderboard
+
+Per-user aggregates live in the `leaderboard_entries` collection and the
+top-K entries are kept pre-sorted in a single `leaderboard:global`
+document. Both are updated incrementally when results are written and
+when a user's XP, username or badges change, so reading the leaderboard
+is O(limit). Every update reads and writes both documents under
+DB.atomic(), so concurrent job workers neither count a result twice nor
+overwrite each other's top-K changes. The one-off bootstrap rebuild runs
+at startup in a background thread, never on the request path.
+"""
+import bisect
+import threading
+from typing import Dict, Any, List, Optional, Callable
+from app.replit_db import DB, Collections
+from app.config import settings
+
+TOP_DOC_ID = "global"
+
+
+def weighted_score(score: Optional[Dict[str, Any]]) -> Optional[float]:
+    """LCR weighted score (Logic 40%, Credibility 35%, Rhetoric 25%)"""
+    if not score:
+        return None
+    return (
+        score.get("logic", 0) * 0.4 +
+        score.get("credibility", 0) * 0.35 +
+        score.get("rhetoric", 0) * 0.25
+    )
+
+
+def _sort_key(entry: Dict[str, Any]):
+    return (-entry.get("xp", 0), -entry.get("debates_won", 0), str(entry["user_id"]))
+
+
+def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape an entry like LeaderboardEntry"""
+    count = entry.get("score_count", 0)
+    return {
+        "user_id": entry["user_id"],
+        "username": entry.get("username", "Unknown"),
+        "xp": entry.get("xp", 0),
+        "badges": entry.get("badges", []),
+        "debates_won": entry.get("debates_won", 0),
+        "avg_score": round(entry.get("score_total", 0) / count, 2) if count > 0 else 0
+    }
+
+
+class Leaderboard:
+    """Incrementally maintained top-K leaderboard"""
+
+    @staticmethod
+    def _new_entry(user: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": str(user["id"]),
+            "user_id": user["id"],
+            "username": user.get("username", "Unknown"),
+            "xp": user.get("xp", 0),
+            "badges": user.get("badges", []),
+            "debates_won": 0,
+            "score_total": 0.0,
+            "score_count": 0
+        }
+
+    @staticmethod
+    def _get_entry(user_id: str) -> Optional[Dict[str, Any]]:
+        entry = DB.get(Collections.LEADERBOARD_ENTRIES, str(user_id))
+        if entry:
+            return entry
+        user = DB.get(Collections.USERS, str(user_id))
+        if not user:
+            return None
+        return Leaderboard._new_entry(user)
+
+    @staticmethod
+    def _save_entry(entry: Dict[str, Any]):
+        """Write an entry and its top-K position; call under DB.atomic()"""
+        if DB.get(Collections.LEADERBOARD_ENTRIES, entry["id"]):
+            DB.update(Collections.LEADERBOARD_ENTRIES, entry["id"], entry)
+        else:
+            DB.insert(Collections.LEADERBOARD_ENTRIES, entry)
+        Leaderboard._apply_to_top(entry)
+
+    @staticmethod
+    def _update_entry(user_id: Any, change: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]):
+        """
+        Atomic read-modify-write of one entry: `change(entry)` returns the
+        fields to update, or None to leave it alone. No-op until bootstrapped.
+        """
+        with DB.atomic():
+            if Leaderboard._load_top() is None:
+                return  # Bootstrap rebuild picks the change up
+            entry = Leaderboard._get_entry(str(user_id))
+            if entry is None:
+                return  # AI opponent or deleted user
+            updates = change(entry)
+            if updates is None:
+                return
+            entry.update(updates)
+            Leaderboard._save_entry(entry)
+
+    @staticmethod
+    def _load_top() -> Optional[Dict[str, Any]]:
+        return DB.get(Collections.LEADERBOARD, TOP_DOC_ID)
+
+    @staticmethod
+    def _store_top(entries: List[Dict[str, Any]]):
+        if DB.get(Collections.LEADERBOARD, TOP_DOC_ID):
+            DB.update(Collections.LEADERBOARD, TOP_DOC_ID, {"entries": entries})
+        else:
+            DB.insert(Collections.LEADERBOARD, {"id": TOP_DOC_ID, "entries": entries})
+
+    @staticmethod
+    def _apply_to_top(entry: Dict[str, Any]):
+        """Move one changed entry to its sorted position in the top-K list"""
+        top_doc = Leaderboard._load_top()
+        if top_doc is None:
+            return  # Bootstrap rebuild picks the change up
+
+        size = settings.LEADERBOARD_SIZE
+        entries = top_doc.get("entries", [])
+        previous_index = next(
+            (i for i, e in enumerate(entries) if str(e["user_id"]) == str(entry["user_id"])), None)
+        was_full = len(entries) >= size
+        if previous_index is not None:
+            entries.pop(previous_index)
+
+        keys = [_sort_key(e) for e in entries]
+        position = bisect.bisect_left(keys, _sort_key(entry))
+
+        # A member that dropped to the bottom of a full list may now rank
+        # below someone outside it; recompute from the entries collection.
+        if previous_index is not None and was_full and position >= len(entries):
+            Leaderboard._refill_top()
+            return
+
+        if position < size:
+            entries.insert(position, entry)
+            del entries[size:]
+            Leaderboard._store_top(entries)
+
+    @staticmethod
+    def _refill_top():
+        entries = DB.find(Collections.LEADERBOARD_ENTRIES, limit=10_000_000)
+        entries.sort(key=_sort_key)
+        Leaderboard._store_top(entries[:settings.LEADERBOARD_SIZE])
+
+    @staticmethod
+    def rebuild():
+        """
+        Recompute every entry from users, participants and results.
+        One pass over each collection; only used to bootstrap or repair.
+        """
+        users = DB.find(Collections.USERS, limit=10_000_000)
+        participants = DB.find(Collections.PARTICIPANTS, {"role": "debater"}, limit=10_000_000)
+        results = DB.find(Collections.RESULTS, limit=10_000_000)
+
+        entries = {str(u["id"]): Leaderboard._new_entry(u) for u in users}
+        winners = {}
+        for result in results:
+            winners.setdefault(str(result.get("room_id")), result.get("winner_id"))
+
+        # Only debates with a result count, matching record_result()
+        for participant in participants:
+            room_id = str(participant.get("room_id"))
+            entry = entries.get(str(participant.get("user_id")))
+            if entry is None or room_id not in winners:
+                continue
+            score = weighted_score(participant.get("score"))
+            if score is not None:
+                entry["score_total"] += score
+                entry["score_count"] += 1
+            if str(winners[room_id]) == str(participant["id"]):
+                entry["debates_won"] += 1
+
+        for entry in entries.values():
+            if DB.get(Collections.LEADERBOARD_ENTRIES, entry["id"]):
+                DB.update(Collections.LEADERBOARD_ENTRIES, entry["id"], entry)
+            else:
+                DB.insert(Collections.LEADERBOARD_ENTRIES, entry)
+        for room_id in winners:
+            DB.update(Collections.ROOMS, room_id, {"leaderboard_counted": True})
+
+        ranked = sorted(entries.values(), key=_sort_key)
+        Leaderboard._store_top(ranked[:settings.LEADERBOARD_SIZE])
+
+    @staticmethod
+    def bootstrap():
+        """Build the leaderboard once if it was never materialized"""
+        # Held for the whole rebuild so no result is counted both by the
+        # rebuild and by a concurrent record_result()
+        with DB.atomic():
+            if Leaderboard._load_top() is not None:
+                return
+            Leaderboard.rebuild()
+        print("✅ Leaderboard materialized")
+
+    @staticmethod
+    def start_bootstrap():
+        """Run bootstrap() in a background thread (call on startup)"""
+        threading.Thread(target=Leaderboard.bootstrap, name="leaderboard-bootstrap", daemon=True).start()
+
+    @staticmethod
+    def top(limit: int = 10) -> List[Dict[str, Any]]:
+        """Return the first `limit` leaderboard rows (empty until bootstrapped)"""
+        top_doc = Leaderboard._load_top() or {}
+        return [_public(e) for e in top_doc.get("entries", [])[:max(0, limit)]]
+
+    @staticmethod
+    def add_user(user: Dict[str, Any]):
+        """Register a new user with an empty entry"""
+        with DB.atomic():
+            if Leaderboard._load_top() is None:
+                return  # Picked up by the bootstrap rebuild
+            Leaderboard._save_entry(Leaderboard._new_entry(user))
+
+    @staticmethod
+    def record_xp(user_id: Any, xp: int):
+        """Called whenever a user's XP is written"""
+        Leaderboard._update_entry(user_id, lambda entry: {"xp": xp})
+
+    @staticmethod
+    def record_profile(user: Dict[str, Any]):
+        """Called whenever a user's username or badges are written"""
+        username = user.get("username", "Unknown")
+        badges = user.get("badges", [])
+        Leaderboard._update_entry(user["id"], lambda entry: (
+            None if entry.get("username") == username and entry.get("badges") == badges
+            else {"username": username, "badges": badges}))
+
+    @staticmethod
+    def record_result(room_id: Any, winner_id: Any, debaters: List[Dict[str, Any]]):
+        """
+        Called when a result document is written.
+        `debaters` are the room's debater participants with their final scores.
+        """
+        with DB.atomic():
+            room = DB.modify(Collections.ROOMS, str(room_id), lambda room: (
+                None if room.get("leaderboard_counted") else {"leaderboard_counted": True}))
+            if not room:
+                return
+
+            for participant in debaters:
+                score = weighted_score(participant.get("score"))
+                won = winner_id is not None and str(winner_id) == str(participant["id"])
+                Leaderboard._update_entry(participant.get("user_id"), lambda entry: {
+                    "score_total": entry.get("score_total", 0) + (score or 0),
+                    "score_count": entry.get("score_count", 0) + (1 if score is not None else 0),
+                    "debates_won": entry.get("debates_won", 0) + (1 if won else 0)
+                })
+
+
+__all__ = ["Leaderboard", "weighted_score"]
@@ -0,0 +1,172 @@
+"""
+Cached lookups for rooms and users with negative caching
+
+Misses (bots, mistyped links) are answered from a short-lived negative
+cache entry without touching storage; room codes and IDs also go through
+a Bloom filter, so an unknown code never costs a collection scan and an
+unknown ID never costs a storage read. Inserting a room
+or user clears its negative entries in every worker through the shared
+cache invalidation log.
+
+The filter must never answer "absent" for a room that exists, so it is
+only trusted while this worker is provably up to date: it is built in the
+background at startup, rebuilt whenever the invalidation log reports a
+gap (or the shared log is lost), and unknown codes and IDs are confirmed
+with a forced log sync before being reported missing.
+"""
+import threading
+from typing import Dict, Any, Optional
+from app.replit_db import DB, Collections
+from app.cache import BloomFilter, room_cache, user_cache
+from app.config import settings
+
+# Value stored for "known missing" entries
+_MISSING = {"__missing__": True}
+
+_room_filter = BloomFilter(capacity=settings.EXISTENCE_FILTER_CAPACITY)
+_room_filter_ready = False
+# Filter being built by a rebuild; rooms registered meanwhile go into both
+_building: Optional[BloomFilter] = None
+_room_filter_lock = threading.Lock()
+_rebuild_lock = threading.Lock()
+_rebuild_requested = False
+
+
+def _remember(item: str):
+    with _room_filter_lock:
+        _room_filter.add(item)
+        if _building is not None:
+            _building.add(item)
+
+
+def _on_room_invalidated(key: Optional[str]):
+    """Keep this worker's filter in sync with rooms created by any worker"""
+    global _room_filter_ready
+    if key is None:
+        # Log gap or lost shared log: registrations may have been missed
+        _room_filter_ready = False
+        start_room_filter()
+    elif key.startswith("missing_room_code_"):
+        _remember(f"code:{key[len('missing_room_code_'):]}")
+    elif key.startswith("missing_room_"):
+        _remember(f"id:{key[len('missing_room_'):]}")
+
+
+room_cache.add_listener(_on_room_invalidated)
+
+
+def _build_room_filter():
+    global _room_filter, _building, _room_filter_ready, _rebuild_requested
+    while True:
+        with _rebuild_lock:
+            if not _rebuild_requested:
+                return
+            _rebuild_requested = False
+            fresh = BloomFilter(capacity=settings.EXISTENCE_FILTER_CAPACITY)
+            with _room_filter_lock:
+                _building = fresh
+            for room in DB.find(Collections.ROOMS, limit=10_000_000):
+                fresh.add(f"id:{room['id']}")
+                if room.get("room_code"):
+                    fresh.add(f"code:{room['room_code'].upper()}")
+            with _room_filter_lock:
+                _room_filter, _building = fresh, None
+                _room_filter_ready = True
+            print("✅ Room filter built")
+
+
+def start_room_filter():
+    """Build (or rebuild) the room code and ID filter in a background thread"""
+    global _rebuild_requested
+    # Subscribe to invalidations before scanning so no insert is missed
+    room_cache.sync()
+    _rebuild_requested = True
+    threading.Thread(target=_build_room_filter, name="room-filter", daemon=True).start()
+
+
+def register_room(room: Dict[str, Any]):
+    """Record a newly inserted room and clear any negative entries for it"""
+    _remember(f"id:{room['id']}")
+    room_cache.delete(f"missing_room_{room['id']}")
+    if room.get("room_code"):
+        code = room["room_code"].upper()
+        _remember(f"code:{code}")
+        room_cache.delete(f"missing_room_code_{code}")
+
+
+def _may_exist(item: str) -> bool:
+    if not _room_filter_ready or item in _room_filter:
+        return True
+    # Apply registrations other workers published since the last poll
+    room_cache.sync(force=True)
+    return not _room_filter_ready or item in _room_filter
+
+
+def room_code_may_exist(room_code: str) -> bool:
+    """False means the code is definitely unused"""
+    return _may_exist(f"code:{room_code.upper()}")
+
+
+def room_id_may_exist(room_id: Any) -> bool:
+    """False means no room has this ID"""
+    return _may_exist(f"id:{room_id}")
+
+
+def get_room(room_id: str) -> Optional[Dict[str, Any]]:
+    """Get a room by ID, answering recent misses without a storage read"""
+    missing_key = f"missing_room_{room_id}"
+    if room_cache.get(missing_key) is not None:
+        return None
+    if not room_id_may_exist(room_id):
+        room_cache.set(missing_key, _MISSING,
+                       ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS)
+        return None
+
+    room = DB.get(Collections.ROOMS, room_id)
+    if not room:
+        room_cache.set(missing_key, _MISSING,
+                       ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS)
+    return room
+
+
+def get_room_by_code(room_code: str) -> Optional[Dict[str, Any]]:
+    """Get a room by code, answering known misses without a collection scan"""
+    code = room_code.upper()
+    missing_key = f"missing_room_code_{code}"
+    if room_cache.get(missing_key) is not None:
+        return None
+    if not room_code_may_exist(code):
+        room_cache.set(missing_key, _MISSING,
+                       ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS)
+        return None
+
+    room = DB.find_one(Collections.ROOMS, {"room_code": code})
+    if not room:
+        room_cache.set(missing_key, _MISSING,
+                       ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS)
+    return room
+
+
+def get_user(user_id: Any) -> Optional[Dict[str, Any]]:
+    """Get a user by ID through user_cache, including cached misses"""
+    cache_key = f"user_{user_id}"
+    user = user_cache.get(cache_key)
+    if user is not None:
+        return None if user.get("__missing__") else user
+
+    user = DB.get(Collections.USERS, str(user_id))
+    if user:
+        user_cache.set(cache_key, user)
+    else:
+        user_cache.set(cache_key, _MISSING,
+                       ttl_seconds=settings.NEGATIVE_CACHE_TTL_SECONDS)
+    return user
+
+
+def register_user(user: Dict[str, Any]):
+    """Clear any negative entry for a newly inserted user"""
+    user_cache.delete(f"user_{user['id']}")
+
+
+__all__ = ["get_room", "get_room_by_code", "get_user", "register_room",
+           "register_user", "room_code_may_exist", "room_id_may_exist", "start_room_filter"]
@@ -8,11 +8,20 @@ from app.config import settings
 from app.replit_db import REPLIT_DB_AVAILABLE
 from app.gemini_ai import GEMINI_AVAILABLE, REPLIT_AI_AVAILABLE
 from app.replit_auth import REPLIT_AUTH_AVAILABLE
+from app.ai_scheduler import ai_scheduler
+from app.circuit_breaker import circuit_stats
+from app.http_client import start_http_client, close_http_client
+from app.process_pool import shutdown_process_pool
+from app.file_storage import UploadSizeLimitMiddleware
+from app.job_queue import job_queue
+from app.lookups import start_room_filter
+from app.leaderboard import Leaderboard
 import os
 from pathlib import Path
 
 from app.routers import auth, rooms, participants, spectators, debate, ai, trainer, uploads, utils, user
 from app.socketio_app import sio
+from app import audio_stream  # noqa: F401 - registers live audio Socket.IO events
 import socketio
 
 # Create FastAPI app with orjson for 3-5x faster JSON serialization
@@ -30,6 +39,9 @@ socket_app = socketio.ASGIApp(sio, app)
 # GZIP Compression - reduces payload size by 60-80% for responses >500 bytes
 app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=6)
 
+# Reject oversized uploads before the multipart body is spooled to disk
+app.add_middleware(UploadSizeLimitMiddleware)
+
 # CORS Middleware - Production & Development origins
 allowed_origins = [
     "https://orat-io.replit.app",  # Production frontend
@@ -94,6 +106,17 @@ async def startup():
     for feature, status in features.items():
         print(f"   {feature}: {status}")
 
+    # Pooled keep-alive client for outbound APIs (fact-checking)
+    start_http_client()
+
+    # Room code existence filter and leaderboard, built off the request path
+    start_room_filter()
+    Leaderboard.start_bootstrap()
+
+    # Background job workers (unclaimed or lease-expired jobs resume here)
+    if settings.JOB_WORKERS_IN_API:
+        job_queue.start()
+
     print("\n" + "=" * 60)
     print(f"✅ Oratio API ready at http://0.0.0.0:{settings.WS_PORT}")
     print("=" * 60 + "\n")
@@ -103,6 +126,9 @@ async def startup():
 async def shutdown():
     """Run on application shutdown"""
     print("👋 Shutting down Oratio API...")
+    await job_queue.stop()
+    await close_http_client()
+    shutdown_process_pool()
 
 
 # Health check endpoint
@@ -118,6 +144,8 @@ async def health():
             "gemini_ai": GEMINI_AVAILABLE,
             "auth": REPLIT_AUTH_AVAILABLE
         },
+        "ai_scheduler": ai_scheduler.stats(),
+        "ai_circuits": circuit_stats(),
         "repl_info": {
             "id": settings.REPL_ID,
             "slug": settings.REPL_SLUG,
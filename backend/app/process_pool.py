@@ -0,0 +1,41 @@
+"""
+Shared process pool for CPU-bound or subprocess-heavy work
+
+Audio encoding and PDF text extraction run here so they never stall the
+event loop. The pool uses the spawn start method (forking a process that
+runs an event loop and threads is unsafe) and is created on first use;
+work functions must be importable module-level callables.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from app.config import settings
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PROCESS_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+async def run_in_process(func: Callable[..., Any], *args) -> Any:
+    """Run `func(*args)` in the pool and await its result"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_pool(), func, *args)
+
+
+def shutdown_process_pool():
+    """Stop pool processes (call on shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+__all__ = ["run_in_process", "shutdown_process_pool"]
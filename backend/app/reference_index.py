@@ -0,0 +1,225 @@
+"""
+Room reference material: PDF text extraction and passage retrieval
+
+Uploaded room PDFs are indexed by a background job: text is extracted page
+by page in the shared process pool (PyMuPDF) and split into overlapping
+word windows, stored per file in `reference_docs`; `reference_lookup`
+lists each room's doc ids and maps file hashes to an extracted doc, so
+neither lookup scans the collection. Each worker keeps a bounded LRU of
+in-process BM25 indexes per room over those passages, so the judge and
+fact-checker get the few most relevant passages for a turn or claim
+without sending whole documents to the LLM. Indexing or deleting a file
+publishes a `reference_index_{room_id}` invalidation through room_cache.
+"""
+import heapq
+import math
+from typing import Dict, Any, List, Optional
+from app.config import settings
+from app.replit_db import DB, Collections
+from app.cache import room_cache, SimpleCache
+from app.job_queue import job_queue
+from app.process_pool import run_in_process
+from app.search_index import tokenize, K1, B
+
+try:
+    import fitz  # PyMuPDF
+    PYMUPDF_AVAILABLE = True
+except ImportError:
+    PYMUPDF_AVAILABLE = False
+    print("⚠️  PyMuPDF not installed, room PDFs will not be indexed")
+
+# Common words carry no signal when a whole turn is the query
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "for", "from", "has",
+    "have", "in", "is", "it", "its", "of", "on", "or", "that", "the", "their",
+    "this", "to", "was", "we", "were", "which", "will", "with", "you", "not"
+}
+
+
+def _extract_pdf_text(path: str) -> List[str]:
+    """Text of each page (runs in a pool process)"""
+    with fitz.open(path) as document:
+        return [page.get_text("text") for page in document]
+
+
+def chunk_pages(pages: List[str], words: int = None, overlap: int = None) -> List[Dict[str, Any]]:
+    """Split page texts into overlapping word windows tagged with their start page"""
+    words = words or settings.REFERENCE_CHUNK_WORDS
+    overlap = overlap if overlap is not None else settings.REFERENCE_CHUNK_OVERLAP_WORDS
+    step = max(1, words - overlap)
+    stream = [(page_number, word)
+              for page_number, text in enumerate(pages, start=1)
+              for word in text.split()]
+    chunks = []
+    for start in range(0, len(stream), step):
+        window = stream[start:start + words]
+        chunks.append({"page": window[0][0], "text": " ".join(word for _, word in window)})
+        if start + words >= len(stream):
+            break
+    return chunks
+
+
+def _terms(text: str) -> Dict[str, int]:
+    terms: Dict[str, int] = {}
+    for token in tokenize(text):
+        if token not in STOPWORDS and len(token) > 1:
+            terms[token] = terms.get(token, 0) + 1
+    return terms
+
+
+class PassageIndex:
+    """BM25 index over one room's reference passages"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.passages: List[Dict[str, Any]] = []
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: List[int] = []
+        for doc in docs:
+            for chunk in doc.get("chunks", []):
+                index = len(self.passages)
+                self.passages.append({"file_name": doc.get("file_name"), **chunk})
+                terms = _terms(chunk["text"])
+                for term, tf in terms.items():
+                    self.postings.setdefault(term, {})[index] = tf
+                self.lengths.append(sum(terms.values()))
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 1.0
+
+    def search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """Passages matching any query term, best first"""
+        count = len(self.passages)
+        scores: Dict[int, float] = {}
+        for term in _terms(query):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5))
+            for index, tf in posting.items():
+                norm = K1 * (1 - B + B * self.lengths[index] / self.avg_length)
+                scores[index] = scores.get(index, 0.0) + idf * tf * (K1 + 1) / (tf + norm)
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [{**self.passages[index], "score": round(score, 3)} for index, score in top]
+
+
+_indexes = SimpleCache(
+    ttl_seconds=settings.REFERENCE_INDEX_CACHE_TTL_SECONDS,
+    max_entries=settings.REFERENCE_INDEX_CACHE_ROOMS
+)
+
+
+def _on_reference_invalidated(key: Optional[str]):
+    """Drop a room's passage index after any worker re-indexed its files"""
+    if key is None:
+        _indexes.clear()
+    elif key.startswith("reference_index_"):
+        _indexes.delete(key[len("reference_index_"):])
+
+
+room_cache.add_listener(_on_reference_invalidated)
+
+
+def _room_doc_ids(room_id: str) -> List[str]:
+    lookup = DB.get(Collections.REFERENCE_LOOKUP, f"room_{room_id}")
+    return lookup.get("docs", []) if lookup else []
+
+
+def _set_lookup(lookup_id: str, fields: Optional[Dict[str, Any]]):
+    """Write (or with None, delete) a lookup document; call under DB.atomic()"""
+    if fields is None:
+        DB.delete(Collections.REFERENCE_LOOKUP, lookup_id)
+    elif DB.get(Collections.REFERENCE_LOOKUP, lookup_id):
+        DB.update(Collections.REFERENCE_LOOKUP, lookup_id, fields)
+    else:
+        DB.insert(Collections.REFERENCE_LOOKUP, {"id": lookup_id, **fields})
+
+
+def _room_index(room_id: str) -> PassageIndex:
+    room_cache.sync()
+    index = _indexes.get(room_id)
+    if index is None:
+        docs = [DB.get(Collections.REFERENCE_DOCS, doc_id) for doc_id in _room_doc_ids(room_id)]
+        index = PassageIndex([doc for doc in docs if doc])
+        _indexes.set(room_id, index)
+    return index
+
+
+def reference_passages(room_id: Any, query: str, limit: int = None) -> List[Dict[str, Any]]:
+    """
+    Most relevant reference passages in a room for `query`
+    Returns: [{file_name, page, text, score}], empty when the room has no indexed PDFs.
+    """
+    limit = limit if limit is not None else settings.REFERENCE_PASSAGES_PER_TURN
+    if not query or limit <= 0:
+        return []
+    passages = _room_index(str(room_id)).search(query, limit)
+    max_chars = settings.REFERENCE_PASSAGE_MAX_CHARS
+    for passage in passages:
+        if len(passage["text"]) > max_chars:
+            passage["text"] = passage["text"][:max_chars].rsplit(" ", 1)[0] + " ..."
+    return passages
+
+
+def format_passages(passages: List[Dict[str, Any]]) -> str:
+    """Reference passages as judge-prompt context"""
+    return "\n".join(
+        f'- [{p.get("file_name") or "reference"}, p. {p["page"]}] "{p["text"]}"' for p in passages)
+
+
+def remove_reference_doc(file_id: Any):
+    """Forget a deleted file's passages"""
+    doc_id = str(file_id)
+    with DB.atomic():
+        doc = DB.get(Collections.REFERENCE_DOCS, doc_id)
+        if not doc:
+            return
+        DB.delete(Collections.REFERENCE_DOCS, doc_id)
+        remaining = [i for i in _room_doc_ids(doc["room_id"]) if i != doc_id]
+        _set_lookup(f"room_{doc['room_id']}", {"docs": remaining} if remaining else None)
+        if doc.get("sha256"):
+            lookup = DB.get(Collections.REFERENCE_LOOKUP, f"sha256_{doc['sha256']}")
+            if lookup and lookup.get("doc_id") == doc_id:
+                _set_lookup(f"sha256_{doc['sha256']}", None)
+    room_cache.delete(f"reference_index_{doc['room_id']}")
+
+
+@job_queue.handler("index_pdf")
+async def run_index_pdf_job(payload: Dict[str, Any]):
+    """Job: extract and chunk a room PDF for passage retrieval"""
+    file_record = DB.get(Collections.UPLOADED_FILES, str(payload["file_id"]))
+    if not file_record or not file_record.get("room_id"):
+        return {"skipped": "file not found"}
+    if not PYMUPDF_AVAILABLE:
+        return {"skipped": "PyMuPDF not installed"}
+
+    # The same document uploaded to another room was already extracted
+    sha256 = file_record.get("sha256")
+    lookup = sha256 and DB.get(Collections.REFERENCE_LOOKUP, f"sha256_{sha256}")
+    existing = lookup and DB.get(Collections.REFERENCE_DOCS, lookup["doc_id"])
+    if existing:
+        pages, chunks = existing["pages"], existing["chunks"]
+    else:
+        page_texts = await run_in_process(_extract_pdf_text, file_record["file_path"])
+        pages, chunks = len(page_texts), chunk_pages(page_texts)
+
+    room_id = str(file_record["room_id"])
+    doc_id = str(file_record["id"])
+    with DB.atomic():
+        DB.insert(Collections.REFERENCE_DOCS, {
+            "id": doc_id,
+            "room_id": room_id,
+            "file_name": file_record.get("file_name"),
+            "sha256": sha256,
+            "pages": pages,
+            "chunks": chunks
+        })
+        doc_ids = _room_doc_ids(room_id)
+        if doc_id not in doc_ids:
+            _set_lookup(f"room_{room_id}", {"docs": doc_ids + [doc_id]})
+        if sha256 and not existing:
+            _set_lookup(f"sha256_{sha256}", {"doc_id": doc_id})
+    room_cache.delete(f"reference_index_{room_id}")
+    print(f"📚 Indexed {file_record.get('file_name')}: {pages} pages, {len(chunks)} passages")
+    return {"pages": pages, "chunks": len(chunks)}
+
+
+__all__ = ["PassageIndex", "chunk_pages", "reference_passages", "format_passages",
+           "remove_reference_doc", "PYMUPDF_AVAILABLE"]
@@ -18,6 +18,8 @@ except ImportError:
     print("⚠️  Replit Auth not available, using simple token auth")
 
 from app.replit_db import DB, Collections
+from app.lookups import register_user
+from app.leaderboard import Leaderboard
 
 security = HTTPBearer(auto_error=False)
 
@@ -74,7 +76,10 @@ class ReplitAuth:
             "bio": None
         }
 
-        return DB.insert(Collections.USERS, new_user)
+        user = DB.insert(Collections.USERS, new_user)
+        register_user(user)
+        Leaderboard.add_user(user)
+        return user
 
     @staticmethod
     def create_session(user_id: str) -> str:
@@ -139,6 +144,8 @@ class ReplitAuth:
             if not user or "id" not in user:
                 print(f"❌ Registration failed: user insert returned {user}")
                 raise Exception("Failed to create user")
+            register_user(user)
+            Leaderboard.add_user(user)
 
             print(f"✅ User registered: {user['username']} (id: {user['id']})")
             token = ReplitAuth.create_session(str(user["id"]))
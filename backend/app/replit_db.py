@@ -3,9 +3,18 @@ Replit Database wrapper for Oratio
 Uses Replit's built-in key-value database instead of SQL
 """
 import json
-from typing import Optional, List, Dict, Any
+import threading
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Callable
 from datetime import datetime
 import os
+from app.config import settings
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: atomic updates are only safe within one process
+    FCNTL_AVAILABLE = False
 
 # Try to import Replit DB, fallback to dict for local development
 try:
@@ -28,6 +37,36 @@ except ImportError:
     print("⚠️  Replit DB not available, using in-memory storage (data will not persist)")
 
 
+_modify_lock = threading.RLock()
+_lock_depth = threading.local()
+
+
+@contextmanager
+def _host_lock():
+    """
+    Serialize read-modify-write cycles across threads and worker processes
+    on this host (reentrant within a thread)
+    """
+    with _modify_lock:
+        depth = getattr(_lock_depth, "value", 0)
+        _lock_depth.value = depth + 1
+        try:
+            if depth or not FCNTL_AVAILABLE:
+                yield
+                return
+            directory = os.path.dirname(settings.DB_LOCK_PATH)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(settings.DB_LOCK_PATH, "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            _lock_depth.value = depth
+
+
 class ReplitDB:
     """
     Wrapper around Replit Database for structured data storage.
@@ -82,6 +121,31 @@ class ReplitDB:
         _db[key] = json.dumps(existing)
         return existing
 
+    @staticmethod
+    def atomic():
+        """Context manager: DB reads and writes inside run as one atomic unit on this host"""
+        return _host_lock()
+
+    @staticmethod
+    def modify(
+        collection: str,
+        id: str,
+        change: Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Atomic read-modify-write: `change(current)` returns the fields to
+        update, or None to leave the document alone (compare-and-set).
+        Returns the updated document, or None if missing or unchanged.
+        """
+        with _host_lock():
+            existing = ReplitDB.get(collection, id)
+            if not existing:
+                return None
+            updates = change(existing)
+            if updates is None:
+                return None
+            return ReplitDB.update(collection, id, updates)
+
     @staticmethod
     def delete(collection: str, id: str) -> bool:
         """Delete document"""
@@ -158,6 +222,14 @@ class Collections:
     UPLOADED_FILES = "uploaded_files"
     SESSIONS = "sessions"  # For auth sessions
     FEEDBACK = "feedback"  # For user feedback
+    LEADERBOARD = "leaderboard"  # Materialized top-K document
+    LEADERBOARD_ENTRIES = "leaderboard_entries"  # Per-user leaderboard aggregates
+    USER_STATS = "user_stats"  # Precomputed per-user statistics
+    JOBS = "jobs"  # Durable background job queue
+    JOB_INDEX = "job_index"  # Due and finished job ids (avoids scanning all jobs)
+    BLOBS = "blobs"  # Content-addressed upload storage (reference counts)
+    REFERENCE_DOCS = "reference_docs"  # Extracted, chunked text of room PDFs
+    REFERENCE_LOOKUP = "reference_lookup"  # Per-room doc ids and sha256 -> doc id (avoids scans)
 
 
 # Initialize database
@@ -3,6 +3,9 @@ from typing import Dict, Any
 from app.schemas import AIAnalyzeTurn, AIFactCheck, AIFinalScore
 from app.replit_db import DB, Collections
 from app.gemini_ai import GeminiAI
+from app.ai_scheduler import Priority
+from app.user_stats import UserStats
+from app.ai_metrics import ai_metrics
 
 router = APIRouter(prefix="/api/ai", tags=["AI Judging"])
 
@@ -29,10 +32,13 @@ async def analyze_turn(data: AIAnalyzeTurn):
     analysis = await GeminiAI.analyze_debate_turn(
         turn_content=turn["content"],
         context=room.get("topic"),
-        previous_turns=[t["content"] for t in previous_turns]
+        previous_turns=[t["content"] for t in previous_turns],
+        priority=Priority.INTERACTIVE
     )
 
     DB.update(Collections.TURNS, str(data.turn_id), {"ai_feedback": analysis})
+    UserStats.record_turn_scored(
+        turn["speaker_id"], analysis, old_feedback=turn.get("ai_feedback"))
 
     return {"analysis": analysis, "turn_id": data.turn_id}
 
@@ -167,3 +173,11 @@ async def get_detailed_report(room_id: str):
         "participants": participant_details,
         "total_turns": len(turns)
     }
+
+
+@router.get("/metrics")
+async def get_ai_metrics():
+    """
+    Get per-task AI accounting: latency, tokens, estimated cost, parse failures
+    """
+    return {"tasks": ai_metrics.snapshot()}
@@ -3,6 +3,8 @@ from typing import Dict, Any
 from app.schemas import UserCreate, UserLogin, UserResponse, UserUpdate, Token
 from app.replit_auth import ReplitAuth, get_current_user, REPLIT_AUTH_AVAILABLE
 from app.replit_db import DB, Collections
+from app.cache import user_cache
+from app.leaderboard import Leaderboard
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
@@ -67,6 +69,11 @@ async def update_user(
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    # Invalidate cached user in every worker so host names stay fresh
+    user_cache.delete(f"user_{user_id}")
+    # Leaderboard rows carry a copy of the username and badges
+    Leaderboard.record_profile(updated_user)
+
     return updated_user
 
 
@@ -1,12 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from typing import Dict, Any, List
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
+from typing import Dict, Any, List, Optional
 import asyncio
+import mimetypes
+import os
+import secrets
 from app.schemas import TurnSubmit, TurnResponse
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.gemini_ai import GeminiAI
 from app.models import DebateStatus
-from app.cache import user_cache, room_cache
+from app.config import settings
+from app.cache import room_cache
+from app.lookups import get_user
+from app.leaderboard import Leaderboard
+from app.user_stats import UserStats
+from app.job_queue import job_queue
+from app.ai_drafts import ai_drafts
+from app.ai_scheduler import Priority
+from app.claims import fact_check_turns, turn_evidence
+from app.audio_processing import normalize_audio, discard_original
+from app.file_storage import save_upload
+from app.file_serving import serve_file
 from app.socketio_app import broadcast_to_room
 
 router = APIRouter(prefix="/api/debate", tags=["Debate"])
@@ -165,33 +179,83 @@ async def generate_debate_results(room_id: str):
     # Save result to database
     DB.insert(Collections.RESULTS, result)
 
+    # Fold the result into the materialized leaderboard (re-read final scores)
+    final_debaters = [DB.get(Collections.PARTICIPANTS, str(p["id"])) or p for p in debaters]
+    Leaderboard.record_result(room_id, winner_id, final_debaters)
+    UserStats.record_result(room_id, winner_id)
+
     return result
 
 
-async def _generate_ai_turn(room: Dict[str, Any], ai_participant: Dict[str, Any], round_number: int, turn_number: int, previous_turns: List[Dict]):
+def _ai_turn_prompt(room: Dict[str, Any], previous_turns: List[Dict]) -> str:
+    """Prompt for the AI opponent's next argument"""
+    # Get context from previous turns
+    context = f"Topic: {room.get('topic')}\n\n"
+    if previous_turns:
+        context += "Previous arguments:\n"
+        for t in previous_turns[-3:]:  # Last 3 turns for context
+            context += f"- {t.get('content', '')}\n"
+
+    return f"""You are debating on: {room.get('topic')}
+
+{context}
+
+Generate a compelling debate argument (2-3 paragraphs). Be persuasive, use logic and evidence, and respond to previous points if any."""
+
+
+def _ai_turn_fingerprint(room: Dict[str, Any], round_number: int, turn_number: int, previous_turns: List[Dict]) -> str:
+    """Identifies the debate context an AI reply was drafted from"""
+    return ai_drafts.fingerprint(
+        room.get("topic"), round_number, turn_number,
+        [(t.get("id"), t.get("content")) for t in previous_turns[-3:]])
+
+
+def _ordered_turns(turns: List[Dict]) -> List[Dict]:
+    return sorted(turns, key=lambda t: (t.get("round_number", 0), t.get("turn_number", 0), t.get("timestamp", "")))
+
+
+async def _generate_ai_turn(
+    room: Dict[str, Any],
+    ai_participant: Dict[str, Any],
+    round_number: int,
+    turn_number: int,
+    previous_turns: List[Dict],
+    draft: str = None
+):
     """
     Generate an AI opponent's turn using Gemini AI
+    A pre-generated `draft` is published as is; otherwise text is streamed to
+    the room as `ai_turn_delta` events. The turn is then persisted and
+    announced with `new_turn`.
     """
     try:
         from datetime import datetime
-        
-        # Get context from previous turns
-        context = f"Topic: {room.get('topic')}\n\n"
-        if previous_turns:
-            context += "Previous arguments:\n"
-            for t in previous_turns[-3:]:  # Last 3 turns for context
-                context += f"- {t.get('content', '')}\n"
-        
-        # Generate AI argument
-        prompt = f"""You are debating on: {room.get('topic')}
 
-{context}
-
-Generate a compelling debate argument (2-3 paragraphs). Be persuasive, use logic and evidence, and respond to previous points if any."""
-        
-        ai_content = await GeminiAI.generate_debate_argument(prompt)
+        if draft:
+            ai_content = draft.strip()
+        else:
+            prompt = _ai_turn_prompt(room, previous_turns)
+
+            # Stream the argument to the room as it is generated, then persist it
+            stream_id = f"{room['id']}:{round_number}:{turn_number}"
+            chunks = []
+            async for delta in GeminiAI.stream_debate_argument(prompt):
+                chunks.append(delta)
+                try:
+                    await broadcast_to_room(room["id"], "ai_turn_delta", {
+                        "stream_id": stream_id,
+                        "speaker_id": ai_participant["id"],
+                        "round_number": round_number,
+                        "turn_number": turn_number,
+                        "index": len(chunks) - 1,
+                        "delta": delta
+                    }, log=False)
+                except Exception as ws_error:
+                    print(f"⚠️  Socket.IO delta broadcast failed: {ws_error}")
+            ai_content = "".join(chunks).strip()
         
         # Create AI turn
+        now = datetime.utcnow().isoformat()
         ai_turn = {
             "room_id": room["id"],
             "speaker_id": ai_participant["id"],
@@ -200,12 +264,17 @@ Generate a compelling debate argument (2-3 paragraphs). Be persuasive, use logic
             "turn_number": turn_number,
             "content": ai_content,
             "audio_url": None,
-            "submitted_at": datetime.utcnow().isoformat(),
+            "ai_feedback": None,  # Judged with the rest of the round
+            "timestamp": now,  # Used by consecutive-turn enforcement
+            "submitted_at": now,
             "is_ai": True
         }
         
         new_turn = DB.insert(Collections.TURNS, ai_turn)
         print(f"🤖 AI Opponent submitted turn {turn_number} in round {round_number}")
+
+        room_cache.delete(f"debate_status_{room['id']}")
+        room_cache.delete(f"transcript_{room['id']}")
         
         # Broadcast Socket.IO notification
         await broadcast_to_room(room["id"], "new_turn", {
@@ -217,49 +286,74 @@ Generate a compelling debate argument (2-3 paragraphs). Be persuasive, use logic
         
     except Exception as e:
         print(f"⚠️  AI turn generation failed: {e}")
+        raise  # Let the job queue retry
+
+
+def _save_turn_analysis(turn: Dict[str, Any], ai_feedback: Dict[str, Any], fact_checks: List[Dict] = None):
+    if fact_checks is not None:
+        ai_feedback = {**ai_feedback, "fact_checks": fact_checks}
+    DB.update(
+        Collections.TURNS,
+        turn["id"],
+        {"ai_feedback": ai_feedback}
+    )
+    UserStats.record_turn_scored(turn["speaker_id"], ai_feedback)
+    print(f"✅ Analyzed turn {turn['id']}")
 
 
 async def _analyze_round_background(room: Dict[str, Any], round_number: int, round_turns: List[Dict], all_turns: List[Dict], debater_count: int):
     """
-    Background task: Analyze all turns in a round in parallel
-    PERFORMANCE FIX: Uses asyncio.gather() for parallel AI analysis
+    Background job: Analyze all turns in a round
+    Batched into one LLM request when AI_BATCH_JUDGING is on, otherwise in parallel.
+    Raises if any turn is left unanalyzed so the job is retried.
     """
-    print(f"🎯 Round {round_number} complete! Analyzing {len(round_turns)} turns in parallel...")
+    print(f"🎯 Round {round_number} complete! Analyzing {len(round_turns)} turns...")
+
+    pending_turns = [t for t in round_turns if t.get("ai_feedback") is None]
+    analyzed_ids = set()
 
-    # PERFORMANCE FIX: Analyze all turns in parallel using asyncio.gather()
-    async def analyze_turn(turn):
-        if turn.get("ai_feedback") is None:
+    # Fact-check the round's claims first so Credibility is judged with evidence
+    fact_checks = await fact_check_turns(room, pending_turns)
+    evidence = {}
+    for turn in pending_turns:
+        turn_context = turn_evidence(room, turn, fact_checks.get(str(turn["id"]), []))
+        if turn_context:
+            evidence[str(turn["id"])] = turn_context
+
+    def save_analysis(turn, ai_feedback):
+        _save_turn_analysis(turn, ai_feedback, fact_checks.get(str(turn["id"]), []))
+        analyzed_ids.add(str(turn["id"]))
+
+    if settings.AI_BATCH_JUDGING and len(pending_turns) > 1:
+        # One structured prompt for the whole round (per-turn fallback inside)
+        try:
+            analyses = await GeminiAI.analyze_debate_round(
+                pending_turns, context=room.get("topic"), evidence=evidence)
+            for turn in pending_turns:
+                if str(turn["id"]) in analyses:
+                    save_analysis(turn, analyses[str(turn["id"])])
+        except Exception as e:
+            print(f"⚠️  Failed to analyze round {round_number}: {e}")
+    else:
+        # PERFORMANCE FIX: Analyze all turns in parallel using asyncio.gather()
+        async def analyze_turn(turn):
             try:
                 ai_feedback = await GeminiAI.analyze_debate_turn(
                     turn_content=turn["content"],
-                    context=room.get("topic")
-                )
-                DB.update(
-                    Collections.TURNS,
-                    turn["id"],
-                    {"ai_feedback": ai_feedback}
+                    context=room.get("topic"),
+                    evidence=evidence.get(str(turn["id"]))
                 )
-                print(f"✅ Analyzed turn {turn['id']}")
+                save_analysis(turn, ai_feedback)
             except Exception as e:
                 print(f"⚠️  Failed to analyze turn {turn['id']}: {e}")
 
-    # Analyze all turns in parallel
-    await asyncio.gather(*[analyze_turn(turn) for turn in round_turns])
+        await asyncio.gather(*[analyze_turn(turn) for turn in pending_turns])
+
+    unanalyzed = [t for t in pending_turns if str(t["id"]) not in analyzed_ids]
+    if unanalyzed:
+        raise RuntimeError(
+            f"{len(unanalyzed)} turn(s) in round {round_number} were not analyzed")
     print(f"✅ Round {round_number} analysis complete!")
-    
-    # If this is a training room with AI, generate AI's response for next turn
-    if room.get("is_training"):
-        participants = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
-        ai_participant = next((p for p in participants if p.get("is_ai")), None)
-        
-        if ai_participant:
-            # Check if it's AI's turn
-            current_round_turns = [t for t in all_turns if t["round_number"] == round_number]
-            human_participant = next((p for p in participants if not p.get("is_ai")), None)
-            
-            # If human just went and round is not complete, AI should respond
-            if human_participant and len(current_round_turns) < debater_count:
-                await _generate_ai_turn(room, ai_participant, round_number, len(current_round_turns) + 1, all_turns)
 
     # Check if ALL rounds are now complete and auto-end the debate
     total_rounds = room.get("rounds", 3)
@@ -268,6 +362,7 @@ async def _analyze_round_background(room: Dict[str, Any], round_number: int, rou
     if len(all_turns) >= expected_total_turns and room.get("status") == "ongoing":
         print(f"🏁 All {total_rounds} rounds complete ({len(all_turns)}/{expected_total_turns} turns)! Auto-ending debate...")
         DB.update(Collections.ROOMS, room["id"], {"status": "completed"})
+        UserStats.record_completed(room["id"])
         
         # Invalidate all caches for this room (auto-ended)
         room_cache.delete(f"debate_status_{room['id']}")
@@ -276,18 +371,214 @@ async def _analyze_round_background(room: Dict[str, Any], round_number: int, rou
         
         print("✅ Debate automatically ended")
 
-        # Generate comprehensive AI results
+        # Generate comprehensive AI results (separate job so it retries on its own)
+        job_queue.enqueue(
+            "generate_results",
+            {"room_id": room["id"]},
+            key=f"generate_results:{room['id']}",
+            room_id=room["id"]
+        )
+
+
+@job_queue.handler("analyze_round")
+async def run_analyze_round_job(payload: Dict[str, Any]):
+    """Job: judge a completed round, then queue the results if it was the last"""
+    room = DB.get(Collections.ROOMS, str(payload["room_id"]))
+    if not room:
+        return {"skipped": "room not found"}
+    round_number = payload["round_number"]
+
+    participants = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
+    debater_count = len([p for p in participants if p.get("role") == "debater"]) or 2
+    all_turns = DB.find(Collections.TURNS, {"room_id": room["id"]})
+    round_turns = [t for t in all_turns if t["round_number"] == round_number]
+
+    await _analyze_round_background(room, round_number, round_turns, all_turns, debater_count)
+    return {"round_number": round_number, "turns": len(round_turns)}
+
+
+@job_queue.handler("ai_turn")
+async def run_ai_turn_job(payload: Dict[str, Any]):
+    """
+    Job: judge the human's turn and publish the AI opponent's reply
+    Judging runs in parallel with waiting on the speculative draft, which is
+    used only if the debate context still matches what it was drafted from.
+    """
+    room = DB.get(Collections.ROOMS, str(payload["room_id"]))
+    ai_participant = DB.get(Collections.PARTICIPANTS, str(payload["participant_id"]))
+    round_number, turn_number = payload["round_number"], payload["turn_number"]
+    draft_key = f"{payload['room_id']}:{round_number}:{turn_number}"
+    if not room or not ai_participant:
+        await ai_drafts.cancel(draft_key)
+        return {"skipped": "room or participant not found"}
+
+    all_turns = _ordered_turns(DB.find(Collections.TURNS, {"room_id": room["id"]}))
+    if any(t["speaker_id"] == ai_participant["id"] and t["round_number"] == round_number
+           for t in all_turns):
+        await ai_drafts.cancel(draft_key)
+        await check_and_analyze_round(room, round_number)
+        return {"skipped": "turn already submitted"}
+
+    async def judge_human_turns():
+        pending_turns = [t for t in all_turns
+                         if t["round_number"] == round_number and t.get("ai_feedback") is None]
+        fact_checks = await fact_check_turns(room, pending_turns)
+        for turn in pending_turns:
+            checks = fact_checks.get(str(turn["id"]), [])
+            ai_feedback = await GeminiAI.analyze_debate_turn(
+                turn_content=turn["content"],
+                context=room.get("topic"),
+                priority=Priority.INTERACTIVE,
+                evidence=turn_evidence(room, turn, checks)
+            )
+            _save_turn_analysis(turn, ai_feedback, checks)
+
+    fingerprint = _ai_turn_fingerprint(room, round_number, turn_number, all_turns)
+    _, draft = await asyncio.gather(
+        judge_human_turns(), ai_drafts.take(draft_key, fingerprint))
+
+    await _generate_ai_turn(room, ai_participant, round_number, turn_number, all_turns, draft=draft)
+    print(f"🤖 AI reply {'from draft' if draft else 'regenerated'} for round {round_number}")
+
+    # The AI's turn may complete the round
+    await check_and_analyze_round(DB.get(Collections.ROOMS, str(room["id"])) or room, round_number)
+    return {"round_number": round_number, "used_draft": bool(draft)}
+
+
+@job_queue.handler("generate_results")
+async def run_generate_results_job(payload: Dict[str, Any]):
+    """Job: write the final results once per room"""
+    existing = DB.find_one(Collections.RESULTS, {"room_id": payload["room_id"]})
+    if existing:
+        return {"skipped": "results already exist"}
+    result = await generate_debate_results(payload["room_id"])
+    print("✅ AI results generated successfully")
+    return {"winner_id": result.get("winner_id")}
+
+
+TRANSCRIPTION_PLACEHOLDERS = ["[Audio transcription unavailable]", "[Audio transcription failed - please try again]"]
+
+
+async def transcribe_segment(segment: Dict[str, Any]) -> Optional[str]:
+    """
+    Normalize and transcribe one live-stream segment in place
+    A failed transcription leaves empty text (None means not yet attempted).
+    Returns the replaced original recording, to discard_original() once the
+    segment is saved (None when there is none).
+    """
+    original = None
+    if segment.get("audio_duration") is None:
+        normalized = await normalize_audio(segment["audio_url"], remove_original=False)
+        if normalized:
+            original = segment["audio_url"]
+            segment.update({
+                "audio_url": normalized["path"],
+                "audio_duration": normalized["duration_seconds"],
+                "mime_type": normalized["mime_type"]
+            })
+    text = await GeminiAI.transcribe_audio(segment["audio_url"], mime_type=segment.get("mime_type"))
+    segment["text"] = "" if not text or text in TRANSCRIPTION_PLACEHOLDERS else text
+    return original
+
+
+async def _transcribe_streamed_turn(turn: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Finish the segments a live stream left untranscribed, save the turn and
+    only then drop the recordings the segments no longer point to
+    """
+    segments = turn.get("audio_segments") or []
+    originals = []
+    for segment in segments:
+        if segment.get("text") is None:
+            originals.append(await transcribe_segment(segment))
+
+    spoken = " ".join(s["text"] for s in segments if s.get("text")).strip()
+    text = (turn.get("content") or "").strip()
+    if spoken:
+        content = f"{text}\n\n[Transcription]: {spoken}" if text else spoken
+    else:
+        content = text or TRANSCRIPTION_PLACEHOLDERS[1]
+    turn = DB.update(Collections.TURNS, str(turn["id"]), {
+        "content": content,
+        "audio_url": segments[0]["audio_url"] if segments else None,
+        "audio_segments": segments,
+        "streaming": False,
+        "status": "transcribed" if spoken else "transcription_failed"
+    })
+    for original in originals:
+        if original:
+            discard_original(original)
+    return turn
+
+
+@job_queue.handler("transcribe_turn")
+async def run_transcribe_turn_job(payload: Dict[str, Any]):
+    """
+    Job: transcribe an audio turn, publish it and run the round check
+    Live-streamed turns (`audio_segments`) are queued when the stream ends,
+    and again by a delayed watchdog in case the stream's process died.
+    """
+    turn = DB.get(Collections.TURNS, str(payload["turn_id"]))
+    if not turn:
+        return {"skipped": "turn not found"}
+
+    pending = turn.get("status") == "transcription_pending"
+    if pending and turn.get("audio_segments") is not None:
+        turn = await _transcribe_streamed_turn(turn)
+    elif pending:
+        # Compact mono Opus first: smaller to store and faster to transcribe
+        mime_type = None
+        if turn.get("audio_url") and turn.get("audio_duration") is None:
+            original = turn["audio_url"]
+            normalized = await normalize_audio(original, remove_original=False)
+            if normalized:
+                # Saved before the original goes, so a retry never points at a deleted file
+                turn = DB.update(Collections.TURNS, str(turn["id"]), {
+                    "audio_url": normalized["path"],
+                    "audio_duration": normalized["duration_seconds"],
+                    "audio_size": normalized["size"]
+                })
+                discard_original(original)
+                mime_type = normalized["mime_type"]
+
+        transcription = await GeminiAI.transcribe_audio(turn["audio_url"], mime_type=mime_type)
+        failed = not transcription or transcription in TRANSCRIPTION_PLACEHOLDERS
+
+        # Use transcription as content (or combine with provided text)
+        text = (turn.get("content") or "").strip()
+        final_content = text if text else transcription
+        if text and not failed:
+            final_content = f"{text}\n\n[Transcription]: {transcription}"
+
+        turn = DB.update(Collections.TURNS, str(turn["id"]), {
+            "content": final_content,
+            "status": "transcription_failed" if failed else "transcribed"
+        })
+
+    if pending:
+        room_cache.delete(f"debate_status_{turn['room_id']}")
+        room_cache.delete(f"transcript_{turn['room_id']}")
+
         try:
-            await generate_debate_results(room["id"])
-            print("✅ AI results generated successfully")
-        except Exception as e:
-            print(f"⚠️  Failed to generate results: {e}")
+            await broadcast_to_room(turn["room_id"], "turn_updated", {
+                "turn": turn,
+                "speaker_id": turn["speaker_id"],
+                "timestamp": turn.get("updated_at")
+            })
+        except Exception as ws_error:
+            print(f"⚠️  Socket.IO broadcast failed: {ws_error}")
+
+    room = DB.get(Collections.ROOMS, str(turn["room_id"]))
+    if room:
+        await check_and_analyze_round(room, turn["round_number"])
+    return {"turn_id": turn["id"], "status": turn.get("status")}
 
 
 async def check_and_analyze_round(room: Dict[str, Any], round_number: int):
     """
-    Check if round is complete and trigger FIRE-AND-FORGET batch AI analysis
+    Check if round is complete and queue a durable batch AI analysis job
     PERFORMANCE FIX: Does NOT block submission response
+    Waits while any turn in the round is still being transcribed.
     """
     # Get all participants who are debaters
     participants = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
@@ -300,25 +591,57 @@ async def check_and_analyze_round(room: Dict[str, Any], round_number: int):
     all_turns = DB.find(Collections.TURNS, {"room_id": room["id"]})
     round_turns = [t for t in all_turns if t["round_number"] == round_number]
 
+    # The transcription job re-runs this check once the turn has content
+    if any(t.get("status") == "transcription_pending" for t in round_turns):
+        return
+
     # Check if round is complete
     if len(round_turns) >= debater_count:
-        # PERFORMANCE FIX: Fire-and-forget AI analysis (don't await)
-        import asyncio
-        asyncio.create_task(_analyze_round_background(
-            room, round_number, round_turns, all_turns, debater_count
-        ))
+        # Persisted job (survives restarts); the key makes re-triggers a no-op
+        job_queue.enqueue(
+            "analyze_round",
+            {"room_id": room["id"], "round_number": round_number},
+            key=f"analyze_round:{room['id']}:{round_number}",
+            room_id=room["id"]
+        )
         # Return immediately without waiting for AI analysis
+    elif room.get("is_training"):
+        _queue_ai_reply(room, participants, round_number, all_turns)
 
 
-@router.post("/{room_id}/submit-turn", response_model=TurnResponse)
-async def submit_turn(
-    room_id: str,
-    turn_data: TurnSubmit,
-    current_user: Dict[str, Any] = Depends(get_current_user)
-):
+def _queue_ai_reply(room: Dict[str, Any], participants: List[Dict], round_number: int, all_turns: List[Dict]):
     """
-    Submit a debate turn (text argument)
-    AI analysis happens in batch after round completion
+    Training rooms: after a human turn, start drafting the AI opponent's
+    reply immediately and queue the job that judges the turn and publishes it
+    """
+    ai_participant = next((p for p in participants if p.get("is_ai")), None)
+    all_turns = _ordered_turns(all_turns)
+    if not ai_participant or not all_turns or all_turns[-1]["speaker_id"] == ai_participant["id"]:
+        return
+    round_turns = [t for t in all_turns if t["round_number"] == round_number]
+    if any(t["speaker_id"] == ai_participant["id"] for t in round_turns):
+        return
+
+    turn_number = len(round_turns) + 1
+    prompt = _ai_turn_prompt(room, all_turns)
+    ai_drafts.start(
+        f"{room['id']}:{round_number}:{turn_number}",
+        _ai_turn_fingerprint(room, round_number, turn_number, all_turns),
+        lambda: GeminiAI.generate_debate_argument(prompt)
+    )
+    job_queue.enqueue(
+        "ai_turn",
+        {"room_id": room["id"], "participant_id": ai_participant["id"],
+         "round_number": round_number, "turn_number": turn_number},
+        key=f"ai_turn:{room['id']}:{round_number}:{turn_number}",
+        room_id=room["id"]
+    )
+
+
+def _open_room_for_submission(room_id: str, round_number: int, current_user: Dict[str, Any]):
+    """
+    Load the room and the submitting participant, starting an upcoming debate
+    Raises HTTPException if the room is not accepting this submission.
     """
     room = DB.get(Collections.ROOMS, room_id)
     if not room:
@@ -339,7 +662,7 @@ async def submit_turn(
     
     # VALIDATION: Reject submissions with invalid round numbers
     total_rounds = room.get("rounds", 3)
-    if turn_data.round_number > total_rounds:
+    if round_number > total_rounds:
         raise HTTPException(
             status_code=400, 
             detail=f"Invalid round number. Debate has only {total_rounds} rounds."
@@ -353,24 +676,28 @@ async def submit_turn(
         raise HTTPException(
             status_code=403, detail="Not a participant in this debate")
 
-    # PERFORMANCE FIX: Only fetch last turn for enforcement (not all turns)
+    return room, participant
+
+
+def _validate_turn_slot(room: Dict[str, Any], participant: Dict[str, Any], round_number: int, debater_count: int):
+    """
+    Enforce round capacity and turn order against the current turns
+    Call inside the room lock right before inserting.
+    """
     all_turns = DB.find(Collections.TURNS, {"room_id": room["id"]}, limit=100)
-    
-    # CRITICAL VALIDATION: Reject submissions when round already has enough turns
-    participants_list = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
-    debater_count = len([p for p in participants_list if p.get("role") == "debater"])
-    round_turns = [t for t in all_turns if t.get("round_number") == turn_data.round_number]
-    
+    round_turns = [t for t in all_turns if t.get("round_number") == round_number]
+
+    # Check round capacity
     if len(round_turns) >= debater_count:
         raise HTTPException(
             status_code=400,
-            detail=f"Round {turn_data.round_number} already has {debater_count} turns. Wait for next round."
+            detail=f"Round {round_number} already has {debater_count} turns. Wait for next round."
         )
+
+    # Consecutive turn enforcement (critical for fairness)
     if all_turns:
-        # Sort by timestamp to get the most recent turn (only need one)
         last_turn = max(all_turns, key=lambda x: x.get("timestamp", ""))
 
-        # Check if the same participant submitted the last turn
         if last_turn["speaker_id"] == participant["id"]:
             raise HTTPException(
                 status_code=400,
@@ -379,49 +706,47 @@ async def submit_turn(
 
         # For team debates, check if same team submitted the last turn
         if room.get("format") == "team" and participant.get("team"):
-            last_speaker = DB.get(Collections.PARTICIPANTS,
-                                  last_turn["speaker_id"])
+            last_speaker = DB.get(Collections.PARTICIPANTS, last_turn["speaker_id"])
             if last_speaker and last_speaker.get("team") == participant.get("team"):
                 raise HTTPException(
                     status_code=400,
                     detail="Your team cannot submit consecutive turns. Please wait for the other team to respond."
                 )
 
+
+def _room_lock(room_id: str) -> asyncio.Lock:
+    if room_id not in _room_locks:
+        _room_locks[room_id] = asyncio.Lock()
+    return _room_locks[room_id]
+
+
+def _debater_count(room: Dict[str, Any]) -> int:
+    participants_list = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
+    return len([p for p in participants_list if p.get("role") == "debater"])
+
+
+@router.post("/{room_id}/submit-turn", response_model=TurnResponse)
+async def submit_turn(
+    room_id: str,
+    turn_data: TurnSubmit,
+    current_user: Dict[str, Any] = Depends(get_current_user)
+):
+    """
+    Submit a debate turn (text argument)
+    AI analysis happens in batch after round completion
+    """
+    room, participant = _open_room_for_submission(room_id, turn_data.round_number, current_user)
+    debater_count = _debater_count(room)
+
+    # Fail fast before taking the lock
+    _validate_turn_slot(room, participant, turn_data.round_number, debater_count)
+
     from datetime import datetime
 
     # CRITICAL: Acquire room lock to prevent concurrent submission races
-    if room["id"] not in _room_locks:
-        _room_locks[room["id"]] = asyncio.Lock()
-    
-    async with _room_locks[room["id"]]:
+    async with _room_lock(room["id"]):
         # Re-validate ALL constraints immediately before insert (inside lock for atomicity)
-        all_turns_final = DB.find(Collections.TURNS, {"room_id": room["id"]}, limit=100)
-        round_turns_final = [t for t in all_turns_final if t.get("round_number") == turn_data.round_number]
-        
-        # Check round capacity
-        if len(round_turns_final) >= debater_count:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Round {turn_data.round_number} already has {debater_count} turns. Wait for next round."
-            )
-        
-        # Re-check consecutive turn enforcement (critical for fairness)
-        if all_turns_final:
-            last_turn_locked = max(all_turns_final, key=lambda x: x.get("timestamp", ""))
-            
-            if last_turn_locked["speaker_id"] == participant["id"]:
-                raise HTTPException(
-                    status_code=400,
-                    detail="You cannot submit consecutive turns. Please wait for another participant to respond."
-                )
-            
-            if room.get("format") == "team" and participant.get("team"):
-                last_speaker_locked = DB.get(Collections.PARTICIPANTS, last_turn_locked["speaker_id"])
-                if last_speaker_locked and last_speaker_locked.get("team") == participant.get("team"):
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Your team cannot submit consecutive turns. Please wait for the other team to respond."
-                    )
+        _validate_turn_slot(room, participant, turn_data.round_number, debater_count)
         
         new_turn = {
             "room_id": room["id"],
@@ -435,6 +760,7 @@ async def submit_turn(
         }
 
         turn = DB.insert(Collections.TURNS, new_turn)
+        UserStats.record_turn(participant["id"])
 
     # Invalidate caches for this room (new data available)
     room_cache.delete(f"debate_status_{room_id}")
@@ -468,150 +794,99 @@ async def submit_audio(
 ):
     """
     Submit a debate turn with audio (and optional text)
+    The turn is accepted immediately with status `transcription_pending`;
+    a background job transcribes it and broadcasts `turn_updated`.
     """
-    room = DB.get(Collections.ROOMS, room_id)
-    if not room:
-        raise HTTPException(status_code=404, detail="Room not found")
-
-    if room["status"] == DebateStatus.UPCOMING.value:
-        DB.update(Collections.ROOMS, room_id, {
-                  "status": DebateStatus.ONGOING.value})
-        room["status"] = DebateStatus.ONGOING.value
-        
-        # Invalidate caches when debate starts
-        room_cache.delete(f"debate_status_{room_id}")
-        room_cache.delete(f"room_code_{room.get('room_code', '').upper()}")
-
-    if room["status"] != DebateStatus.ONGOING.value:
-        raise HTTPException(
-            status_code=400, detail="Debate has ended or was cancelled")
-    
-    # VALIDATION: Reject submissions with invalid round numbers
-    total_rounds = room.get("rounds", 3)
-    if round_number > total_rounds:
-        raise HTTPException(
-            status_code=400, 
-            detail=f"Invalid round number. Debate has only {total_rounds} rounds."
-        )
+    room, participant = _open_room_for_submission(room_id, round_number, current_user)
+    debater_count = _debater_count(room)
 
-    participant = DB.find_one(
-        Collections.PARTICIPANTS,
-        {"user_id": current_user["id"], "room_id": room["id"]}
-    )
-    if not participant:
-        raise HTTPException(
-            status_code=403, detail="Not a participant in this debate")
-
-    # Save audio file FIRST (before any validation that could race)
-    import os
-    os.makedirs("uploads/audio", exist_ok=True)
-    audio_path = f"uploads/audio/{room_id}_{participant['id']}_{turn_number}.webm"
-
-    # Read and save audio file (LONG OPERATION)
-    audio_content = await audio.read()
-    with open(audio_path, "wb") as f:
-        f.write(audio_content)
+    # Fail fast before reading the upload
+    _validate_turn_slot(room, participant, round_number, debater_count)
 
-    # Transcribe audio using Gemini AI (LONG OPERATION)
-    transcription = await GeminiAI.transcribe_audio(audio_path)
-
-    # Use transcription as content (or combine with provided text)
-    final_content = content.strip() if content.strip() else transcription
-    if content.strip() and transcription and transcription not in ["[Audio transcription unavailable]", "[Audio transcription failed - please try again]"]:
-        final_content = f"{content.strip()}\n\n[Transcription]: {transcription}"
-
-    # CRITICAL: Validate IMMEDIATELY BEFORE INSERT to close race window
-    # Re-fetch turns to get latest state after long audio operations
-    all_turns = DB.find(Collections.TURNS, {"room_id": room["id"]}, limit=100)
-    participants_list = DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]})
-    debater_count = len([p for p in participants_list if p.get("role") == "debater"])
-    round_turns = [t for t in all_turns if t.get("round_number") == round_number]
-    
-    # Check round capacity
-    if len(round_turns) >= debater_count:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Round {round_number} already has {debater_count} turns. Wait for next round."
-        )
-    
-    # Check consecutive turn enforcement
-    if all_turns:
-        last_turn = max(all_turns, key=lambda x: x.get("timestamp", ""))
-        
-        if last_turn["speaker_id"] == participant["id"]:
-            raise HTTPException(
-                status_code=400,
-                detail="You cannot submit consecutive turns. Please wait for another participant to respond."
-            )
-        
-        if room.get("format") == "team" and participant.get("team"):
-            last_speaker = DB.get(Collections.PARTICIPANTS, last_turn["speaker_id"])
-            if last_speaker and last_speaker.get("team") == participant.get("team"):
-                raise HTTPException(
-                    status_code=400,
-                    detail="Your team cannot submit consecutive turns. Please wait for the other team to respond."
-                )
+    # Stream the audio to disk (size limit enforced while reading); the
+    # name is unique so a rejected request never touches an accepted turn's file
+    audio_path = f"uploads/audio/{room_id}_{participant['id']}_{turn_number}_{secrets.token_hex(4)}.webm"
+    audio_size, audio_sha256 = await save_upload(audio, audio_path)
 
     from datetime import datetime
 
     # CRITICAL: Acquire room lock to prevent concurrent submission races
-    if room["id"] not in _room_locks:
-        _room_locks[room["id"]] = asyncio.Lock()
-    
-    async with _room_locks[room["id"]]:
+    async with _room_lock(room["id"]):
         # Re-validate ALL constraints immediately before insert (inside lock for atomicity)
-        all_turns_final = DB.find(Collections.TURNS, {"room_id": room["id"]}, limit=100)
-        round_turns_final = [t for t in all_turns_final if t.get("round_number") == round_number]
-        
-        # Check round capacity
-        if len(round_turns_final) >= debater_count:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Round {round_number} already has {debater_count} turns. Wait for next round."
-            )
-        
-        # Re-check consecutive turn enforcement (critical for fairness)
-        if all_turns_final:
-            last_turn_locked = max(all_turns_final, key=lambda x: x.get("timestamp", ""))
-            
-            if last_turn_locked["speaker_id"] == participant["id"]:
-                raise HTTPException(
-                    status_code=400,
-                    detail="You cannot submit consecutive turns. Please wait for another participant to respond."
-                )
-            
-            if room.get("format") == "team" and participant.get("team"):
-                last_speaker_locked = DB.get(Collections.PARTICIPANTS, last_turn_locked["speaker_id"])
-                if last_speaker_locked and last_speaker_locked.get("team") == participant.get("team"):
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Your team cannot submit consecutive turns. Please wait for the other team to respond."
-                    )
-        
-        # Create turn with audio and transcription
+        try:
+            _validate_turn_slot(room, participant, round_number, debater_count)
+        except HTTPException:
+            if os.path.exists(audio_path):
+                os.remove(audio_path)
+            raise
+
+        # Reserve the slot now; the transcription job fills in the content
         new_turn = {
             "room_id": room["id"],
             "speaker_id": participant["id"],
-            "content": final_content,
+            "content": content.strip(),
             "audio_url": audio_path,
+            "audio_size": audio_size,
+            "audio_sha256": audio_sha256,
             "round_number": round_number,
             "turn_number": turn_number,
             "ai_feedback": None,  # Will be analyzed in batch after round completion
+            "status": "transcription_pending",
             "timestamp": datetime.utcnow().isoformat()
         }
 
         turn = DB.insert(Collections.TURNS, new_turn)
+        UserStats.record_turn(participant["id"])
+
+    job_queue.enqueue(
+        "transcribe_turn",
+        {"turn_id": turn["id"]},
+        key=f"transcribe_turn:{turn['id']}",
+        room_id=room["id"]
+    )
 
     # Invalidate caches for this room (new data available)
     room_cache.delete(f"debate_status_{room_id}")
     room_cache.delete(f"transcript_{room_id}")
 
-    # Check if round is complete and trigger batch analysis
-    await check_and_analyze_round(room, round_number)
+    try:
+        await broadcast_to_room(room["id"], "new_turn", {
+            "turn": turn,
+            "speaker_id": participant["id"],
+            "speaker_name": current_user.get("username", "Anonymous"),
+            "timestamp": turn.get("timestamp")
+        })
+    except Exception as ws_error:
+        print(f"⚠️  Socket.IO broadcast failed: {ws_error}")
 
+    # Round analysis is triggered by the transcription job
     return turn
 
 
+@router.api_route("/turns/{turn_id}/audio", methods=["GET", "HEAD"])
+async def get_turn_audio(turn_id: str, request: Request, segment: Optional[int] = None):
+    """
+    Stream a turn's recording (or one live-stream segment) with Range
+    support, so players can seek without downloading the whole file
+    """
+    turn = DB.get(Collections.TURNS, turn_id)
+    if not turn:
+        raise HTTPException(status_code=404, detail="Turn not found")
+
+    path = turn.get("audio_url")
+    if segment is not None:
+        segments = turn.get("audio_segments") or []
+        if not 0 <= segment < len(segments):
+            raise HTTPException(status_code=404, detail="Audio segment not found")
+        path = segments[segment]["audio_url"]
+    if not path:
+        raise HTTPException(status_code=404, detail="Turn has no audio")
+
+    # Recordings are audio even when the container guesses as video (.webm)
+    media_type = (mimetypes.guess_type(path)[0] or "audio/webm").replace("video/", "audio/")
+    return serve_file(request, path, media_type)
+
+
 @router.get("/{room_id}/transcript", response_model=List[TurnResponse])
 async def get_transcript(room_id: str):
     """
@@ -659,6 +934,7 @@ async def end_debate(
 
     DB.update(Collections.ROOMS, room_id, {
               "status": DebateStatus.COMPLETED.value})
+    UserStats.record_completed(room_id)
 
     # Invalidate all caches for this room (status changed to completed)
     room_cache.delete(f"debate_status_{room_id}")
@@ -700,10 +976,38 @@ async def end_debate(
     }
 
     DB.insert(Collections.RESULTS, result)
+    Leaderboard.record_result(
+        room["id"], result["winner_id"],
+        [p for p in participants if p["role"] == "debater"])
+    UserStats.record_result(room["id"], result["winner_id"])
 
     return {"message": "Debate ended", "result": result}
 
 
+@router.get("/{room_id}/jobs")
+async def get_debate_jobs(room_id: str):
+    """
+    Get background job status for a room (round analysis, AI turns, results)
+    """
+    jobs = job_queue.list_for_room(room_id)
+    return {
+        "room_id": room_id,
+        "jobs": [
+            {
+                "id": job["id"],
+                "type": job.get("type"),
+                "status": job.get("status"),
+                "attempts": job.get("attempts", 0),
+                "max_attempts": job.get("max_attempts"),
+                "last_error": job.get("last_error"),
+                "created_at": job.get("created_at"),
+                "updated_at": job.get("updated_at")
+            }
+            for job in jobs
+        ]
+    }
+
+
 @router.get("/{room_id}/status")
 async def get_debate_status(room_id: str):
     """
@@ -727,12 +1031,7 @@ async def get_debate_status(room_id: str):
     user_ids = list(set(p["user_id"] for p in participants))
     user_map = {}
     for user_id in user_ids:
-        cache_key_user = f"user_{user_id}"
-        user = user_cache.get(cache_key_user)
-        if user is None:
-            user = DB.get(Collections.USERS, user_id)
-            if user:
-                user_cache.set(cache_key_user, user)
+        user = get_user(user_id)
         if user:
             user_map[user_id] = user
 
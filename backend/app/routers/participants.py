@@ -4,6 +4,8 @@ from app.schemas import ParticipantJoin, ParticipantResponse
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.cache import room_cache
+from app.lookups import get_room_by_code
+from app.user_stats import UserStats
 
 router = APIRouter(prefix="/api/participants", tags=["Participants"])
 
@@ -16,7 +18,7 @@ async def join_room(
     """
     Join a debate room as a participant
     """
-    room = DB.find_one(Collections.ROOMS, {"room_code": join_data.room_code})
+    room = get_room_by_code(join_data.room_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
@@ -38,6 +40,7 @@ async def join_room(
     }
 
     participant = DB.insert(Collections.PARTICIPANTS, new_participant)
+    UserStats.record_joined(participant)
 
     # Invalidate debate status cache so join is immediately visible
     room_cache.delete(f"debate_status_{room['id']}")
@@ -97,6 +100,7 @@ async def leave_room(
 
     room_id = participant["room_id"]
     DB.delete(Collections.PARTICIPANTS, participant_id)
+    UserStats.record_joined(participant, delta=-1)
 
     # Invalidate debate status cache so leave is immediately visible
     room_cache.delete(f"debate_status_{room_id}")
@@ -6,7 +6,16 @@ from app.schemas import RoomCreate, RoomUpdate, RoomResponse
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.models import DebateStatus
-from app.cache import user_cache, room_cache
+from app.cache import room_cache
+from app.user_stats import UserStats
+from app.search_index import notify_room_changed
+from app.lookups import (
+    get_room as lookup_room,
+    get_room_by_code as lookup_room_by_code,
+    get_user,
+    register_room,
+    room_code_may_exist,
+)
 
 router = APIRouter(prefix="/api/rooms", tags=["Rooms"])
 
@@ -15,6 +24,9 @@ def generate_room_code() -> str:
     """Generate a unique 6-character room code"""
     while True:
         code = secrets.token_hex(3).upper()
+        # Bloom filter miss means the code is definitely free (no scan)
+        if not room_code_may_exist(code):
+            return code
         existing = DB.find_one(Collections.ROOMS, {"room_code": code})
         if not existing:
             return code
@@ -23,14 +35,7 @@ def generate_room_code() -> str:
 def enrich_room_with_host(room: Dict[str, Any]) -> Dict[str, Any]:
     """Add host_name to room data by looking up the host user (cached)"""
     if room and "host_id" in room:
-        cache_key = f"user_{room['host_id']}"
-        host = user_cache.get(cache_key)
-
-        if host is None:
-            host = DB.get(Collections.USERS, room["host_id"])
-            if host:
-                user_cache.set(cache_key, host)
-
+        host = get_user(room["host_id"])
         room["host_name"] = host.get(
             "username", "Anonymous") if host else "Anonymous"
     return room
@@ -64,7 +69,9 @@ async def create_room(
     }
 
     room = DB.insert(Collections.ROOMS, new_room)
-    
+    register_room(room)
+    notify_room_changed(room["id"])
+
     # If this is a training room, create an AI opponent participant
     if is_training:
         ai_participant = {
@@ -112,8 +119,8 @@ async def get_room_by_code(room_code: str):
     if cached_room:
         return cached_room
 
-    # Fetch from database
-    room = DB.find_one(Collections.ROOMS, {"room_code": code_upper})
+    # Fetch from database (known-missing codes never reach storage)
+    room = lookup_room_by_code(code_upper)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
@@ -130,7 +137,7 @@ async def get_room(room_id: str):
     """
     Get details of a specific room
     """
-    room = DB.get(Collections.ROOMS, room_id)
+    room = lookup_room(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return enrich_room_with_host(room)
@@ -168,6 +175,7 @@ async def update_room(
     # Invalidate caches when room is updated
     room_cache.delete(f"debate_status_{room_id}")
     room_cache.delete(f"room_code_{room.get('room_code', '').upper()}")
+    notify_room_changed(room_id)
     
     return updated_room
 
@@ -188,7 +196,9 @@ async def delete_room(
         raise HTTPException(
             status_code=403, detail="Only the host can delete the room")
 
+    UserStats.record_room_deleted(room)
     DB.delete(Collections.ROOMS, room_id)
+    notify_room_changed(room_id)
     
     # Invalidate all caches when room is deleted
     room_cache.delete(f"debate_status_{room_id}")
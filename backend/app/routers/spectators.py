@@ -4,6 +4,7 @@ from app.schemas import SpectatorJoin, SpectatorReward, SpectatorStats, Particip
 from app.replit_auth import get_current_user, get_current_user_optional
 from app.replit_db import DB, Collections
 from app.cache import room_cache
+from app.lookups import get_room_by_code
 
 router = APIRouter(prefix="/api/spectators", tags=["Spectators"])
 
@@ -17,7 +18,7 @@ async def join_as_spectator(
     Join a debate room as a spectator
     """
 
-    room = DB.find_one(Collections.ROOMS, {"room_code": join_data.room_code})
+    room = get_room_by_code(join_data.room_code)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
 
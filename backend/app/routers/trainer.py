@@ -4,6 +4,7 @@ from app.schemas import TrainerAnalyze, TrainerProgress, ChallengeStart, Challen
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.gemini_ai import GeminiAI
+from app.leaderboard import Leaderboard
 import secrets
 
 router = APIRouter(prefix="/api/trainer", tags=["AI Trainer"])
@@ -196,7 +197,8 @@ async def submit_challenge(
     """
     analysis = await GeminiAI.analyze_debate_turn(
         turn_content=data.response,
-        context=f"Training exercise: {data.challenge_id}"
+        context=f"Training exercise: {data.challenge_id}",
+        task="trainer_challenge"
     )
 
     xp_earned = int(analysis.get("logic", 0) +
@@ -212,9 +214,11 @@ async def submit_challenge(
 
         user = DB.get(Collections.USERS, str(current_user["id"]))
         if user:
+            new_xp = user.get("xp", 0) + xp_earned
             DB.update(Collections.USERS, str(current_user["id"]), {
-                "xp": user.get("xp", 0) + xp_earned
+                "xp": new_xp
             })
+            Leaderboard.record_xp(current_user["id"], new_xp)
 
     return {
         "challenge_id": data.challenge_id,
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
+from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Request
 from typing import Dict, Any, List
-import aiofiles
+import mimetypes
 import os
 from app.schemas import UploadResponse
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.config import settings
+from app.audio_processing import normalize_audio, NORMALIZED_MIME_TYPE
+from app.file_storage import save_upload, store_upload, store_file, reuse_blob, release_blob, temp_upload_path
+from app.job_queue import job_queue
+from app.reference_index import remove_reference_doc
+from app.file_serving import serve_file
 
 router = APIRouter(prefix="/api/uploads", tags=["Uploads"])
 
@@ -30,20 +35,18 @@ async def upload_pdf(
 
     if file.size and file.size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
         raise HTTPException(
-            status_code=400, detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB")
+            status_code=413, detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB")
 
-    file_path = f"{UPLOAD_DIR}/pdfs/{room_id}_{file.filename}"
-
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+    # Content-addressed: the same document shared by many rooms is stored once
+    blob = await store_upload(file)
 
     uploaded_file = {
         "room_id": room_id,
         "file_name": file.filename,
-        "file_path": file_path,
+        "file_path": blob["path"],
         "file_type": "pdf",
-        "file_size": len(content)
+        "file_size": blob["size"],
+        "sha256": blob["id"]
     }
 
     file_record = DB.insert(Collections.UPLOADED_FILES, uploaded_file)
@@ -56,6 +59,14 @@ async def upload_pdf(
                 {"file_id": file_record["id"], "type": "pdf", "name": file.filename})
             DB.update(Collections.ROOMS, room_id, {"resources": resources})
 
+        # Extract and chunk the text so judging can cite relevant passages
+        job_queue.enqueue(
+            "index_pdf",
+            {"file_id": file_record["id"]},
+            key=f"index_pdf:{file_record['id']}",
+            room_id=room_id
+        )
+
     return file_record
 
 
@@ -77,21 +88,41 @@ async def upload_audio(
 
     if file.size and file.size > settings.MAX_FILE_SIZE_MB * 1024 * 1024:
         raise HTTPException(
-            status_code=400, detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB")
-
-    file_path = f"{UPLOAD_DIR}/audio/{room_id}_{file.filename}"
-
-    async with aiofiles.open(file_path, 'wb') as f:
-        content = await file.read()
-        await f.write(content)
+            status_code=413, detail=f"File too large. Max size: {settings.MAX_FILE_SIZE_MB}MB")
+
+    local_path = temp_upload_path()
+    original_size, original_sha256 = await save_upload(file, local_path)
+
+    # Same upload as before: reuse its stored (normalized) blob
+    blob = reuse_blob(original_sha256)
+    if blob:
+        os.remove(local_path)
+    else:
+        # Store compact mono Opus instead of the raw upload when ffmpeg is available,
+        # keyed by the uploaded bytes since Opus output differs run to run
+        normalized = await normalize_audio(local_path)
+        if normalized:
+            if os.path.exists(local_path):
+                os.remove(local_path)  # Only the normalized copy is stored
+            blob = await store_file(
+                normalized["path"], original_sha256,
+                original_size=original_size, duration_seconds=normalized["duration_seconds"])
+        else:
+            blob = await store_file(local_path, original_sha256)
 
     uploaded_file = {
         "room_id": room_id,
         "file_name": file.filename,
-        "file_path": file_path,
+        "file_path": blob["path"],
         "file_type": "audio",
-        "file_size": len(content)
+        "file_size": blob["size"],
+        "sha256": blob["id"]
     }
+    if blob.get("original_size") is not None:  # Stored normalized
+        uploaded_file.update({
+            "original_size": blob["original_size"],
+            "duration_seconds": blob.get("duration_seconds")
+        })
 
     file_record = DB.insert(Collections.UPLOADED_FILES, uploaded_file)
 
@@ -141,6 +172,23 @@ async def get_room_uploads(room_id: str):
     return files
 
 
+@router.api_route("/file/{file_id}", methods=["GET", "HEAD"])
+async def get_file_content(file_id: str, request: Request):
+    """
+    Download an uploaded file (Range requests and revalidation supported)
+    """
+    file_record = DB.get(Collections.UPLOADED_FILES, file_id)
+    if not file_record or file_record["file_type"] == "url":
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # Blobs have no extension; normalized audio is Opus whatever it was uploaded as
+    if file_record["file_type"] == "audio" and "original_size" in file_record:
+        media_type = NORMALIZED_MIME_TYPE
+    else:
+        media_type = mimetypes.guess_type(file_record["file_name"])[0]
+    return serve_file(request, file_record["file_path"], media_type)
+
+
 @router.delete("/{file_id}")
 async def delete_file(
     file_id: str,
@@ -158,9 +206,13 @@ async def delete_file(
         raise HTTPException(
             status_code=403, detail="Only the host can delete files")
 
-    if file_record["file_type"] != "url" and os.path.exists(file_record["file_path"]):
+    # Shared blob: only removed once no other upload references it
+    released = bool(file_record.get("sha256")) and release_blob(file_record["sha256"])
+    if not released and file_record["file_type"] != "url" and os.path.exists(file_record["file_path"]):
         os.remove(file_record["file_path"])
 
+    if file_record["file_type"] == "pdf":
+        remove_reference_doc(file_id)
     DB.delete(Collections.UPLOADED_FILES, file_id)
 
     return {"message": "File deleted successfully"}
@@ -3,6 +3,7 @@ from typing import Dict, Any, List
 from app.replit_auth import get_current_user
 from app.replit_db import DB, Collections
 from app.models import User
+from app.user_stats import UserStats
 
 router = APIRouter(prefix="/api/user", tags=["User"])
 
@@ -11,87 +12,29 @@ router = APIRouter(prefix="/api/user", tags=["User"])
 async def get_user_stats(current_user: Dict = Depends(get_current_user)):
     """
     Get comprehensive user statistics including debates joined, hosted, win rate, etc.
+    Served from the precomputed per-user stats document.
     """
     user_id = str(current_user.get("id"))
-    
-    # Get all rooms where user participated
-    all_participants = DB.find(Collections.PARTICIPANTS, {"user_id": user_id})
-    
-    # Get all rooms
-    all_rooms = DB.find(Collections.ROOMS, {})
-    rooms_map = {r["id"]: r for r in all_rooms}
-    
-    debates_joined = 0
-    debates_hosted = 0
-    debates_won = 0
-    total_debates = 0
-    total_xp = 0
-    
-    # Calculate stats
-    for participant in all_participants:
-        room_id = participant.get("room_id")
-        room = rooms_map.get(room_id)
-        
-        if not room:
-            continue
-            
-        # Count debates joined
-        if participant.get("role") == "debater":
-            debates_joined += 1
-            
-            # Only count completed debates
-            if room.get("status") == "completed":
-                total_debates += 1
-                
-                # Check if user won
-                results = DB.find_one(Collections.RESULTS, {"room_id": room_id})
-                if results and results.get("winner_id") == participant.get("id"):
-                    debates_won += 1
-                
-                # Calculate XP from scores
-                if participant.get("score"):
-                    score_avg = (
-                        participant["score"].get("logic", 0) +
-                        participant["score"].get("credibility", 0) +
-                        participant["score"].get("rhetoric", 0)
-                    ) / 3
-                    total_xp += int(score_avg * 10)  # Convert score to XP
-        
-        # Count debates hosted
-        if room.get("host_id") == user_id:
-            debates_hosted += 1
-    
+    stats = UserStats.get(user_id)
+
+    debates_joined = stats.get("debates_joined", 0)
+    debates_hosted = stats.get("debates_hosted", 0)
+    debates_won = stats.get("debates_won", 0)
+    total_debates = stats.get("total_debates", 0)
+    total_xp = stats.get("xp", 0)
+    scored_turns = stats.get("scored_turns", 0)
+
     # Calculate win rate
     win_rate = round((debates_won / total_debates * 100), 1) if total_debates > 0 else 0
-    
+
     # Calculate level from XP (100 XP per level)
     level = max(1, total_xp // 100)
     xp_progress = total_xp % 100
-    
-    # Get average scores across all completed debates
-    all_turns = []
-    for participant in all_participants:
-        if participant.get("role") == "debater":
-            turns = DB.find(Collections.TURNS, {"speaker_id": participant["id"]})
-            all_turns.extend(turns)
-    
-    total_logic = 0
-    total_credibility = 0
-    total_rhetoric = 0
-    scored_turns = 0
-    
-    for turn in all_turns:
-        feedback = turn.get("ai_feedback", {})
-        if feedback:
-            total_logic += feedback.get("logic", 0)
-            total_credibility += feedback.get("credibility", 0)
-            total_rhetoric += feedback.get("rhetoric", 0)
-            scored_turns += 1
-    
-    avg_logic = round(total_logic / scored_turns) if scored_turns > 0 else 0
-    avg_credibility = round(total_credibility / scored_turns) if scored_turns > 0 else 0
-    avg_rhetoric = round(total_rhetoric / scored_turns) if scored_turns > 0 else 0
-    
+
+    avg_logic = round(stats.get("logic_total", 0) / scored_turns) if scored_turns > 0 else 0
+    avg_credibility = round(stats.get("credibility_total", 0) / scored_turns) if scored_turns > 0 else 0
+    avg_rhetoric = round(stats.get("rhetoric_total", 0) / scored_turns) if scored_turns > 0 else 0
+
     # Calculate badges earned
     badges_earned = []
     if scored_turns >= 50:
@@ -110,7 +53,7 @@ async def get_user_stats(current_user: Dict = Depends(get_current_user)):
         badges_earned.append("credibility_expert")
     if debates_won >= 10:
         badges_earned.append("quick_thinker")
-    
+
     return {
         "user_id": user_id,
         "username": current_user.get("username") or current_user.get("name"),
@@ -127,7 +70,7 @@ async def get_user_stats(current_user: Dict = Depends(get_current_user)):
             "rhetoric": avg_rhetoric
         },
         "badges_earned": badges_earned,
-        "total_turns": len(all_turns)
+        "total_turns": stats.get("total_turns", 0)
     }
 
 
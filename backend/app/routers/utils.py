@@ -4,6 +4,8 @@ from datetime import datetime
 from app.schemas import HealthResponse, LeaderboardEntry, FeedbackSubmit
 from app.replit_db import DB, Collections
 from app.config import settings
+from app.leaderboard import Leaderboard
+from app.search_index import search_rooms
 
 router = APIRouter(prefix="/api/utils", tags=["Utilities"])
 
@@ -53,72 +55,21 @@ async def submit_feedback(feedback: FeedbackSubmit):
 @router.get("/leaderboard", response_model=List[LeaderboardEntry])
 async def get_leaderboard(limit: int = 10):
     """
-    Get global leaderboard
+    Get global leaderboard (materialized, updated on results and XP changes)
     """
-    users = DB.find(Collections.USERS, limit=1000)
-
-    leaderboard = []
-    for user in users:
-        participations = DB.find(
-            Collections.PARTICIPANTS,
-            {"user_id": user["id"], "role": "debater"}
-        )
-
-        results = DB.find(Collections.RESULTS, limit=1000)
-
-        wins = 0
-        total_score = 0
-        count = 0
-
-        for result in results:
-            if result.get("winner_id") and str(result["winner_id"]) in [str(p["id"]) for p in participations]:
-                wins += 1
-
-            for participant in participations:
-                score = participant.get("score", {})
-                if score:
-                    weighted = (
-                        score.get("logic", 0) * 0.4 +
-                        score.get("credibility", 0) * 0.35 +
-                        score.get("rhetoric", 0) * 0.25
-                    )
-                    total_score += weighted
-                    count += 1
-
-        avg_score = (total_score / count) if count > 0 else 0
-
-        leaderboard.append({
-            "user_id": user["id"],
-            "username": user.get("username", "Unknown"),
-            "xp": user.get("xp", 0),
-            "badges": user.get("badges", []),
-            "debates_won": wins,
-            "avg_score": round(avg_score, 2)
-        })
-
-    leaderboard.sort(key=lambda x: x["xp"], reverse=True)
-
-    return leaderboard[:limit]
+    return Leaderboard.top(min(limit, settings.LEADERBOARD_SIZE))
 
 
 @router.get("/search-topics")
-async def search_topics(query: str = "", limit: int = 10):
+async def search_topics(query: str = "", limit: int = 10, offset: int = 0):
     """
-    Search debate topics
+    Search debate topics (ranked, prefix-aware, paginated)
     """
-    rooms = DB.find(Collections.ROOMS, limit=1000)
-
-    if query:
-        filtered_rooms = [
-            r for r in rooms
-            if query.lower() in r.get("topic", "").lower() or
-            query.lower() in r.get("description", "").lower()
-        ]
-    else:
-        filtered_rooms = rooms
+    limit = max(1, min(limit, 100))
+    rooms, total = search_rooms(query, limit=limit, offset=max(0, offset))
 
     topics = []
-    for room in filtered_rooms[:limit]:
+    for room in rooms:
         topics.append({
             "room_id": room["id"],
             "topic": room.get("topic"),
@@ -127,4 +78,4 @@ async def search_topics(query: str = "", limit: int = 10):
             "scheduled_time": room.get("scheduled_time")
         })
 
-    return {"topics": topics, "total": len(filtered_rooms)}
+    return {"topics": topics, "total": total, "offset": offset, "limit": limit}
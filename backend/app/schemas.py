@@ -134,6 +134,8 @@ class TurnResponse(BaseModel):
     round_number: int
     turn_number: int
     ai_feedback: Optional[Dict[str, Any]] = None
+    status: Optional[str] = None  # transcription_pending / transcribed / transcription_failed (audio turns)
+    audio_segments: Optional[List[Dict[str, Any]]] = None  # Live-streamed audio turns
     timestamp: datetime
 
     class Config:
@@ -191,6 +193,38 @@ class AIFinalScore(BaseModel):
     room_id: int
 
 
+# Structured-output schemas: passed to Gemini as response_schema and used to
+# validate what comes back
+
+class TurnAnalysis(BaseModel):
+    logic: float = Field(ge=0, le=10)
+    credibility: float = Field(ge=0, le=10)
+    rhetoric: float = Field(ge=0, le=10)
+    feedback: str
+    strengths: List[str] = []
+    weaknesses: List[str] = []
+
+
+class RoundTurnAnalysis(TurnAnalysis):
+    turn_id: str
+
+
+class RoundAnalysis(BaseModel):
+    turns: List[RoundTurnAnalysis]
+
+
+class ParticipantVerdict(BaseModel):
+    participant_id: str
+    feedback: str
+
+
+class FinalVerdict(BaseModel):
+    winner_id: Optional[str] = None
+    summary: str
+    feedback: List[ParticipantVerdict] = []
+    key_moments: List[str] = []
+
+
 # ==================== Trainer Schemas ====================
 
 class TrainerAnalyze(BaseModel):
@@ -233,6 +267,7 @@ class UploadResponse(BaseModel):
     file_path: str
     file_type: str
     file_size: Optional[int]
+    duration_seconds: Optional[float] = None  # Normalized audio only
     created_at: datetime
 
     class Config:
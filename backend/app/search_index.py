@@ -0,0 +1,213 @@
+"""
+In-process inverted index over room topics and descriptions
+
+Supports ranked (BM25) search with prefix matching and pagination.
+Every worker keeps its own index; room create/update/delete publish a
+`room_index_{id}` invalidation through room_cache so all workers
+re-index that room from storage. When the invalidation log reports a gap
+(or the shared log is lost) the index is dropped and rebuilt from storage
+on the next search.
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from app.replit_db import DB, Collections
+from app.cache import room_cache
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Topic matches count more than description matches
+TOPIC_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Prefixes shorter than this only match whole tokens
+MIN_PREFIX_LENGTH = 2
+# Max vocabulary terms a single prefix expands to
+PREFIX_EXPANSION_LIMIT = 100
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase alphanumeric tokens"""
+    return TOKEN_RE.findall((text or "").lower())
+
+
+class TopicIndex:
+    """Token inverted index with a sorted vocabulary for prefix lookups"""
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = {}
+        self.vocabulary: List[str] = []
+        self.doc_terms: Dict[str, Dict[str, float]] = {}
+        self.doc_lengths: Dict[str, float] = {}
+        self.total_length = 0.0
+        self.ready = False
+        # Bumped by clear() so a build racing with it is not marked ready
+        self.generation = 0
+        self._lock = threading.RLock()
+
+    def clear(self):
+        """Drop everything; ensure_index() rebuilds from storage"""
+        with self._lock:
+            self.postings = {}
+            self.vocabulary = []
+            self.doc_terms = {}
+            self.doc_lengths = {}
+            self.total_length = 0.0
+            self.ready = False
+            self.generation += 1
+
+    def add_room(self, room: Dict[str, Any]):
+        """Index (or re-index) one room"""
+        room_id = str(room["id"])
+        terms: Dict[str, float] = {}
+        for token in tokenize(room.get("topic")):
+            terms[token] = terms.get(token, 0) + TOPIC_WEIGHT
+        for token in tokenize(room.get("description")):
+            terms[token] = terms.get(token, 0) + DESCRIPTION_WEIGHT
+
+        with self._lock:
+            self.remove_room(room_id)
+            for term, tf in terms.items():
+                posting = self.postings.get(term)
+                if posting is None:
+                    posting = self.postings[term] = {}
+                    bisect.insort(self.vocabulary, term)
+                posting[room_id] = tf
+            length = sum(terms.values())
+            self.doc_terms[room_id] = terms
+            self.doc_lengths[room_id] = length
+            self.total_length += length
+
+    def remove_room(self, room_id: str):
+        with self._lock:
+            terms = self.doc_terms.pop(str(room_id), None)
+            if terms is None:
+                return
+            self.total_length -= self.doc_lengths.pop(str(room_id), 0)
+            for term in terms:
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(str(room_id), None)
+                if not posting:
+                    del self.postings[term]
+                    index = bisect.bisect_left(self.vocabulary, term)
+                    if index < len(self.vocabulary) and self.vocabulary[index] == term:
+                        self.vocabulary.pop(index)
+
+    def _expand(self, token: str) -> List[str]:
+        """Terms matching a query token exactly or by prefix"""
+        if len(token) < MIN_PREFIX_LENGTH:
+            return [token] if token in self.postings else []
+        start = bisect.bisect_left(self.vocabulary, token)
+        matches = []
+        for term in self.vocabulary[start:start + PREFIX_EXPANSION_LIMIT]:
+            if not term.startswith(token):
+                break
+            matches.append(term)
+        return matches
+
+    def search(self, query: str, limit: int = 10, offset: int = 0) -> Tuple[List[str], int]:
+        """
+        Ranked search; every query token must match (exactly or as a prefix).
+        Returns (room_ids for the requested page, total matches).
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            if not tokens:
+                ordered = list(reversed(self.doc_terms))
+                return ordered[offset:offset + limit], len(ordered)
+
+            doc_count = len(self.doc_terms)
+            avg_length = (self.total_length / doc_count) if doc_count else 1.0
+            scores: Optional[Dict[str, float]] = None
+
+            for token in tokens:
+                token_scores: Dict[str, float] = {}
+                for term in self._expand(token):
+                    posting = self.postings[term]
+                    idf = math.log(1 + (doc_count - len(posting) + 0.5) / (len(posting) + 0.5))
+                    for room_id, tf in posting.items():
+                        if scores is not None and room_id not in scores:
+                            continue
+                        norm = K1 * (1 - B + B * self.doc_lengths[room_id] / avg_length)
+                        score = idf * tf * (K1 + 1) / (tf + norm)
+                        # Exact token matches outrank prefix completions
+                        if term != token:
+                            score *= 0.8
+                        if score > token_scores.get(room_id, 0):
+                            token_scores[room_id] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {rid: scores[rid] + s for rid, s in token_scores.items()}
+                if not scores:
+                    return [], 0
+
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])
+            return [room_id for room_id, _ in top[offset:]], len(scores)
+
+
+topic_index = TopicIndex()
+_build_lock = threading.Lock()
+
+
+def _on_room_invalidated(key: Optional[str]):
+    """Re-index a room after any worker changed it"""
+    if key is None:
+        # Log gap: room changes may have been missed
+        topic_index.clear()
+        return
+    if not key.startswith("room_index_") or not topic_index.ready:
+        return
+    room_id = key[len("room_index_"):]
+    room = DB.get(Collections.ROOMS, room_id)
+    if room:
+        topic_index.add_room(room)
+    else:
+        topic_index.remove_room(room_id)
+
+
+room_cache.add_listener(_on_room_invalidated)
+
+
+def ensure_index():
+    """Build the index from storage once per process"""
+    if topic_index.ready:
+        return
+    with _build_lock:
+        if topic_index.ready:
+            return
+        # Subscribe before scanning so concurrent changes are replayed
+        room_cache.sync(force=True)
+        generation = topic_index.generation
+        for room in DB.find(Collections.ROOMS, limit=10_000_000):
+            topic_index.add_room(room)
+        with topic_index._lock:
+            topic_index.ready = topic_index.generation == generation
+
+
+def notify_room_changed(room_id: Any):
+    """Call after a room is created, updated or deleted"""
+    room_cache.delete(f"room_index_{room_id}")
+
+
+def search_rooms(query: str, limit: int = 10, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+    """Search rooms and load the current documents for one page of results"""
+    # Sync first: a log gap found here clears the index before it is used
+    room_cache.sync()
+    ensure_index()
+    room_ids, total = topic_index.search(query, limit=limit, offset=offset)
+    rooms = [DB.get(Collections.ROOMS, room_id) for room_id in room_ids]
+    return [room for room in rooms if room], total
+
+
+__all__ = ["TopicIndex", "topic_index", "tokenize", "search_rooms",
+           "notify_room_changed", "ensure_index"]
@@ -1,14 +1,31 @@
 import socketio
+from typing import Awaitable, Callable, List
 from app.replit_db import DB, Collections
+from app.config import settings
+
+# Share emits across processes (API + job workers) when a message queue is configured
+client_manager = None
+if settings.SOCKETIO_MESSAGE_QUEUE:
+    client_manager = socketio.AsyncRedisManager(settings.SOCKETIO_MESSAGE_QUEUE)
 
 # Create Socket.IO server
 sio = socketio.AsyncServer(
     async_mode='asgi',
+    client_manager=client_manager,
     cors_allowed_origins='*',
     logger=True,
     engineio_logger=False
 )
 
+# Cleanup callbacks run when a client disconnects (e.g. open audio streams)
+_disconnect_handlers: List[Callable[[str], Awaitable[None]]] = []
+
+
+def on_disconnect(func: Callable[[str], Awaitable[None]]):
+    """Register a coroutine called with the sid of each disconnecting client"""
+    _disconnect_handlers.append(func)
+    return func
+
 @sio.event
 async def connect(sid, environ):
     """Handle client connection"""
@@ -18,6 +35,11 @@ async def connect(sid, environ):
 async def disconnect(sid):
     """Handle client disconnection"""
     print(f"❌ Socket.IO client disconnected: {sid}")
+    for handler in _disconnect_handlers:
+        try:
+            await handler(sid)
+        except Exception as e:
+            print(f"⚠️  Disconnect handler failed: {e}")
 
 @sio.event
 async def join_room(sid, data):
@@ -36,7 +58,8 @@ async def leave_room(sid, data):
         await sio.leave_room(sid, f"room_{room_id}")
         print(f"👋 Client {sid} left room {room_id}")
 
-async def broadcast_to_room(room_id: str, event: str, data: dict):
-    """Broadcast event to all clients in a room"""
+async def broadcast_to_room(room_id: str, event: str, data: dict, log: bool = True):
+    """Broadcast event to all clients in a room (log=False for high-frequency events)"""
     await sio.emit(event, data, room=f"room_{room_id}")
-    print(f"📢 Broadcast '{event}' to room {room_id}")
+    if log:
+        print(f"📢 Broadcast '{event}' to room {room_id}")
@@ -0,0 +1,192 @@
+"""
+Precomputed per-user statistics
+
+One `user_stats` document per user holds the counters behind
+/api/user/stats. It is updated incrementally when users join or leave
+rooms, turns are submitted and scored, debates complete, results are
+generated and rooms are deleted, so the endpoint is a single document
+read. Users without a document get one built from the source collections
+on first read. Definitions:
+
+- debates_joined: debater participations in existing rooms
+- debates_hosted: participations in rooms the user hosts
+- total_debates: debater participations in completed rooms
+- debates_won / xp: from the result and final score of completed rooms
+"""
+from typing import Dict, Any, Optional
+from app.replit_db import DB, Collections
+
+COUNTERS = [
+    "debates_joined", "debates_hosted", "debates_won", "total_debates", "xp",
+    "logic_total", "credibility_total", "rhetoric_total", "scored_turns", "total_turns"
+]
+
+
+def score_xp(score: Optional[Dict[str, Any]]) -> int:
+    """XP earned for one completed debate (average LCR score x 10)"""
+    if not score:
+        return 0
+    score_avg = (
+        score.get("logic", 0) +
+        score.get("credibility", 0) +
+        score.get("rhetoric", 0)
+    ) / 3
+    return int(score_avg * 10)
+
+
+class UserStats:
+    """Incrementally maintained per-user statistics"""
+
+    @staticmethod
+    def _bump(user_id: Any, deltas: Dict[str, float]):
+        """Add deltas to a user's counters; no-op until the document is built"""
+        if user_id is None:
+            return
+        # Atomic so concurrent workers do not lose increments; a missing
+        # document is built from source data on first read
+        DB.modify(Collections.USER_STATS, str(user_id), lambda stats: {
+            key: stats.get(key, 0) + delta for key, delta in deltas.items()
+        })
+
+    @staticmethod
+    def _debater(participant_id: Any) -> Optional[Dict[str, Any]]:
+        participant = DB.get(Collections.PARTICIPANTS, str(participant_id))
+        if not participant or participant.get("role") != "debater" or participant.get("is_ai"):
+            return None
+        return participant
+
+    @staticmethod
+    def _is_human_debater(participant: Dict[str, Any]) -> bool:
+        return participant.get("role") == "debater" and not participant.get("is_ai")
+
+    @staticmethod
+    def record_joined(participant: Dict[str, Any], delta: int = 1):
+        """Called when a participant joins (delta=1) or leaves (delta=-1) a room"""
+        deltas = {}
+        if UserStats._is_human_debater(participant):
+            deltas["debates_joined"] = delta
+        room = DB.get(Collections.ROOMS, str(participant.get("room_id")))
+        if room and str(room.get("host_id")) == str(participant.get("user_id")):
+            deltas["debates_hosted"] = delta
+        if deltas:
+            UserStats._bump(participant.get("user_id"), deltas)
+
+    @staticmethod
+    def record_completed(room_id: Any):
+        """Called when a room's status becomes completed (counted once per room)"""
+        room = DB.modify(Collections.ROOMS, str(room_id), lambda room: (
+            None if room.get("user_stats_completed") else {"user_stats_completed": True}))
+        if not room:
+            return
+        for participant in DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]}, limit=10_000_000):
+            if UserStats._is_human_debater(participant):
+                UserStats._bump(participant.get("user_id"), {"total_debates": 1})
+
+    @staticmethod
+    def record_room_deleted(room: Dict[str, Any]):
+        """Remove a deleted room's contributions (call before its participants go)"""
+        for participant in DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]}, limit=10_000_000):
+            deltas = {}
+            if str(room.get("host_id")) == str(participant.get("user_id")):
+                deltas["debates_hosted"] = -1
+            if UserStats._is_human_debater(participant):
+                deltas["debates_joined"] = -1
+                if room.get("user_stats_completed"):
+                    deltas["total_debates"] = -1
+                if room.get("user_stats_counted"):
+                    result = DB.find_one(Collections.RESULTS, {"room_id": room["id"]}) or {}
+                    won = result.get("winner_id") is not None and str(result["winner_id"]) == str(participant["id"])
+                    deltas["debates_won"] = -1 if won else 0
+                    deltas["xp"] = -score_xp(participant.get("score"))
+            if deltas:
+                UserStats._bump(participant.get("user_id"), deltas)
+
+    @staticmethod
+    def record_turn(speaker_id: Any):
+        """Called when a turn is inserted"""
+        participant = UserStats._debater(speaker_id)
+        if participant:
+            UserStats._bump(participant["user_id"], {"total_turns": 1})
+
+    @staticmethod
+    def record_turn_scored(
+        speaker_id: Any,
+        new_feedback: Dict[str, Any],
+        old_feedback: Optional[Dict[str, Any]] = None
+    ):
+        """Called when a turn's ai_feedback is written (replacing old_feedback if any)"""
+        participant = UserStats._debater(speaker_id)
+        if not participant:
+            return
+        deltas = {"scored_turns": 0}
+        for previous, sign in ((old_feedback, -1), (new_feedback, 1)):
+            if previous:
+                deltas["scored_turns"] += sign
+                for key in ("logic", "credibility", "rhetoric"):
+                    deltas[f"{key}_total"] = deltas.get(f"{key}_total", 0) + sign * previous.get(key, 0)
+        UserStats._bump(participant["user_id"], deltas)
+
+    @staticmethod
+    def record_result(room_id: Any, winner_id: Any):
+        """Called when a result document is written (counted once per room)"""
+        room = DB.modify(Collections.ROOMS, str(room_id), lambda room: (
+            None if room.get("user_stats_counted") else {"user_stats_counted": True}))
+        if not room:
+            return
+
+        for participant in DB.find(Collections.PARTICIPANTS, {"room_id": room["id"]}, limit=10_000_000):
+            if not UserStats._is_human_debater(participant):
+                continue
+            UserStats._bump(participant.get("user_id"), {
+                "debates_won": 1 if winner_id is not None and str(winner_id) == str(participant["id"]) else 0,
+                "xp": score_xp(participant.get("score"))
+            })
+
+    @staticmethod
+    def rebuild(user_id: str) -> Dict[str, Any]:
+        """Compute a user's statistics from participants, rooms, results and turns"""
+        stats = {key: 0 for key in COUNTERS}
+        participations = DB.find(Collections.PARTICIPANTS, {"user_id": user_id}, limit=10_000_000)
+
+        for participant in participations:
+            room = DB.get(Collections.ROOMS, str(participant.get("room_id")))
+            if not room:
+                continue
+            if str(room.get("host_id")) == str(user_id):
+                stats["debates_hosted"] += 1
+            if participant.get("role") != "debater":
+                continue
+            stats["debates_joined"] += 1
+
+            if room.get("status") == "completed":
+                stats["total_debates"] += 1
+                result = DB.find_one(Collections.RESULTS, {"room_id": room["id"]})
+                if result and str(result.get("winner_id")) == str(participant.get("id")):
+                    stats["debates_won"] += 1
+                stats["xp"] += score_xp(participant.get("score"))
+
+            for turn in DB.find(Collections.TURNS, {"speaker_id": participant["id"]}):
+                stats["total_turns"] += 1
+                feedback = turn.get("ai_feedback") or {}
+                if feedback:
+                    stats["logic_total"] += feedback.get("logic", 0)
+                    stats["credibility_total"] += feedback.get("credibility", 0)
+                    stats["rhetoric_total"] += feedback.get("rhetoric", 0)
+                    stats["scored_turns"] += 1
+
+        stats["id"] = str(user_id)
+        stats["user_id"] = str(user_id)
+        if DB.get(Collections.USER_STATS, str(user_id)):
+            return DB.update(Collections.USER_STATS, str(user_id), stats)
+        return DB.insert(Collections.USER_STATS, stats)
+
+    @staticmethod
+    def get(user_id: str) -> Dict[str, Any]:
+        """Read a user's statistics document, building it on first access"""
+        stats = DB.get(Collections.USER_STATS, str(user_id))
+        if stats is None:
+            stats = UserStats.rebuild(str(user_id))
+        return stats
+
+
+__all__ = ["UserStats", "score_xp"]
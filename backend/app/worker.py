@@ -0,0 +1,35 @@
+"""
+Standalone background job worker
+
+    python -m app.worker
+
+Runs the durable job queue outside the API process. Set
+JOB_WORKERS_IN_API=false on the API so only this process claims jobs, and
+point both at the same Replit DB (the in-memory fallback is per-process).
+Set SOCKETIO_MESSAGE_QUEUE on both so events emitted here reach clients
+connected to the API.
+"""
+import asyncio
+from app.job_queue import job_queue
+from app.http_client import start_http_client, close_http_client
+from app.process_pool import shutdown_process_pool
+from app.routers import debate  # noqa: F401 - registers job handlers
+
+
+async def main():
+    print("👷 Oratio job worker starting...")
+    start_http_client()
+    job_queue.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_queue.stop()
+        await close_http_client()
+        shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("👋 Job worker stopped")
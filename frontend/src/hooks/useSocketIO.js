@@ -4,6 +4,10 @@ import socketService from '../services/socketio';
 export function useSocketIO(roomId) {
   const [isConnected, setIsConnected] = useState(false);
   const [newTurn, setNewTurn] = useState(null);
+  // AI opponent turn being streamed: { stream_id, speaker_id, round_number, turn_number, text }
+  const [aiDraft, setAiDraft] = useState(null);
+  // Partial transcripts of live audio turns: { [turn_id]: { [segment_index]: text } }
+  const [liveTranscripts, setLiveTranscripts] = useState({});
 
   useEffect(() => {
     if (!roomId) return;
@@ -26,15 +30,58 @@ export function useSocketIO(roomId) {
       setIsConnected(false);
     };
 
+    // Speaker of the AI turn currently being streamed
+    let aiDraftSpeaker = null;
+
     // Listen for new turns
     const handleNewTurn = (data) => {
       console.log('📨 New turn received:', data);
       setNewTurn(data);
+      // The streamed draft is replaced by the persisted turn
+      if (String(data?.speaker_id) === String(aiDraftSpeaker)) {
+        aiDraftSpeaker = null;
+        setAiDraft(null);
+      }
+    };
+
+    // An existing turn changed (e.g. audio transcription finished)
+    const handleTurnUpdated = (data) => {
+      setNewTurn(data);
+      const turnId = data?.turn?.id;
+      if (turnId !== undefined && data.turn.status !== 'transcription_pending') {
+        setLiveTranscripts(({ [turnId]: _done, ...rest }) => rest);
+      }
+    };
+
+    // Segments may arrive out of order; they are joined by index when shown
+    const handleTranscriptPartial = (data) => {
+      setLiveTranscripts((current) => ({
+        ...current,
+        [data.turn_id]: { ...current[data.turn_id], [data.segment_index]: data.text },
+      }));
+    };
+
+    // Accumulate streamed AI opponent text (index 0 starts or restarts a stream)
+    const handleAiTurnDelta = (data) => {
+      aiDraftSpeaker = data.speaker_id;
+      setAiDraft((draft) => {
+        const base = (data.index === 0 || draft?.stream_id !== data.stream_id) ? '' : draft.text;
+        return {
+          stream_id: data.stream_id,
+          speaker_id: data.speaker_id,
+          round_number: data.round_number,
+          turn_number: data.turn_number,
+          text: base + data.delta,
+        };
+      });
     };
 
     socketService.on('connect', handleConnect);
     socketService.on('disconnect', handleDisconnect);
     socketService.on('new_turn', handleNewTurn);
+    socketService.on('turn_updated', handleTurnUpdated);
+    socketService.on('transcript_partial', handleTranscriptPartial);
+    socketService.on('ai_turn_delta', handleAiTurnDelta);
     socketService.on('joined', (data) => {
       console.log('✅ Joined room:', data.room_id);
     });
@@ -44,9 +91,12 @@ export function useSocketIO(roomId) {
       socketService.off('connect', handleConnect);
       socketService.off('disconnect', handleDisconnect);
       socketService.off('new_turn', handleNewTurn);
+      socketService.off('turn_updated', handleTurnUpdated);
+      socketService.off('transcript_partial', handleTranscriptPartial);
+      socketService.off('ai_turn_delta', handleAiTurnDelta);
       socketService.leaveRoom(roomId);
     };
   }, [roomId]);
 
-  return { isConnected, newTurn };
+  return { isConnected, newTurn, aiDraft, liveTranscripts };
 }
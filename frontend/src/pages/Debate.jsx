@@ -3,9 +3,27 @@ import { useParams, useNavigate } from 'react-router-dom';
 import { motion } from 'framer-motion';
 import { Send, X, AlertCircle, CheckCircle, Clock, Mic, Square, Play, Pause, ThumbsUp, Flame, Heart, Brain } from 'lucide-react';
 import api from '../services/api';
+import socketService from '../services/socketio';
 import { useAuth } from '../context/AuthContext';
 import { useSocketIO } from '../hooks/useSocketIO';
 
+// Live audio turns restart the recorder this often so every segment is a
+// self-contained file the server can transcribe while the speaker goes on
+const LIVE_SEGMENT_MS = 8000;
+const LIVE_CHUNK_MS = 1000;
+
+// Resolve with the payload of `doneEvent`, reject on `audio_stream_error`
+const waitForStreamEvent = (doneEvent) => new Promise((resolve, reject) => {
+  const cleanup = () => {
+    socketService.off(doneEvent, onDone);
+    socketService.off('audio_stream_error', onError);
+  };
+  const onDone = (data) => { cleanup(); resolve(data); };
+  const onError = (data) => { cleanup(); reject(new Error(data?.detail || 'Audio stream failed')); };
+  socketService.on(doneEvent, onDone);
+  socketService.on('audio_stream_error', onError);
+});
+
 function Debate() {
   const { roomCode } = useParams();
   const navigate = useNavigate();
@@ -30,13 +48,14 @@ function Debate() {
   const [reactionSent, setReactionSent] = useState(false);
   const mediaRecorderRef = useRef(null);
   const audioChunksRef = useRef([]);
+  const liveStreamRef = useRef(null);
   const audioPlaybackRef = useRef(null);
   const timerIntervalRef = useRef(null);
   const lastTurnKeyRef = useRef(null);
   const transcriptEndRef = useRef(null);
   
   // Socket.IO for real-time updates
-  const { isConnected, newTurn } = useSocketIO(room?.id);
+  const { isConnected, newTurn, aiDraft, liveTranscripts } = useSocketIO(room?.id);
 
   const handleSpectatorReaction = async (participantId, reactionType) => {
     if (!room || isParticipant) return;
@@ -196,9 +215,118 @@ function Debate() {
     }
   };
 
+  // Why a turn cannot be submitted right now, or null
+  const submissionBlocker = () => {
+    if (!isParticipant) {
+      return 'You must join as a participant before submitting arguments';
+    }
+
+    // Check if all seats are filled before allowing submissions
+    const maxParticipants = room?.type === 'team' ? 4 : 2;
+    const currentDebaters = participants.filter(p => p.role === 'debater').length;
+    if (currentDebaters < maxParticipants) {
+      return `Waiting for all participants to join. ${currentDebaters}/${maxParticipants} seats filled.`;
+    }
+
+    // CRITICAL: Block submissions if final round is already complete
+    const totalRounds = room?.rounds || 3;
+    const debaterCount = participants.filter(p => p.role === 'debater').length || 2;
+    const turnsInFinalRound = turns.filter(t => t.round_number === totalRounds).length;
+
+    if (currentRound >= totalRounds && turnsInFinalRound >= debaterCount) {
+      return 'All rounds complete. Debate has ended.';
+    }
+    return null;
+  };
+
+  // Stream the recording over Socket.IO as it happens (audio_stream_* events)
+  const startLiveRecording = async (stream) => {
+    const mimeType = MediaRecorder.isTypeSupported('audio/webm') ? 'audio/webm' : '';
+    const started = waitForStreamEvent('audio_stream_started');
+    socketService.emit('audio_stream_start', {
+      token: api.getToken(),
+      room_id: room.id,
+      round_number: currentRound,
+      turn_number: currentTurn,
+      content: argument.trim(),
+      mime_type: mimeType || 'audio/webm',
+    });
+    await started;
+
+    const live = { stream, recorder: null, stopping: false, sendQueue: Promise.resolve() };
+    liveStreamRef.current = live;
+
+    // Chunks are sent strictly in order, each as binary
+    const send = (blob, segmentEnd = false) => {
+      live.sendQueue = live.sendQueue.then(async () => {
+        const data = blob ? await blob.arrayBuffer() : new ArrayBuffer(0);
+        socketService.emit('audio_chunk', { data, segment_end: segmentEnd });
+      });
+    };
+
+    const startSegment = () => {
+      const recorder = new MediaRecorder(stream, mimeType ? { mimeType } : undefined);
+      live.recorder = recorder;
+      recorder.ondataavailable = (event) => {
+        if (event.data.size > 0) send(event.data);
+      };
+      recorder.onstop = () => {
+        send(null, true);
+        if (live.stopping) {
+          live.sendQueue.then(() => socketService.emit('audio_stream_end', {}));
+        } else {
+          startSegment();
+        }
+      };
+      recorder.start(LIVE_CHUNK_MS);
+    };
+
+    startSegment();
+    live.rotation = setInterval(() => live.recorder?.stop(), LIVE_SEGMENT_MS);
+  };
+
+  const stopLiveRecording = async () => {
+    const live = liveStreamRef.current;
+    liveStreamRef.current = null;
+    clearInterval(live.rotation);
+    live.stopping = true;
+
+    setIsSubmitting(true);
+    setError('');
+    try {
+      const done = waitForStreamEvent('audio_stream_done');
+      live.recorder.stop();
+      const { turn } = await done;
+      applySubmittedTurn(turn);
+    } catch (err) {
+      setError(err.message || 'Failed to submit audio');
+    } finally {
+      live.stream.getTracks().forEach(track => track.stop());
+      setIsSubmitting(false);
+    }
+  };
+
   const startRecording = async () => {
     try {
       const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+
+      if (isConnected) {
+        const blocker = submissionBlocker();
+        if (blocker) {
+          stream.getTracks().forEach(track => track.stop());
+          setError(blocker);
+          return;
+        }
+        try {
+          await startLiveRecording(stream);
+          setIsRecording(true);
+        } catch (err) {
+          stream.getTracks().forEach(track => track.stop());
+          setError(err.message || 'Failed to start audio stream');
+        }
+        return;
+      }
+
       const mediaRecorder = new MediaRecorder(stream);
       mediaRecorderRef.current = mediaRecorder;
       audioChunksRef.current = [];
@@ -224,6 +352,11 @@ function Debate() {
   };
 
   const stopRecording = () => {
+    if (liveStreamRef.current && isRecording) {
+      setIsRecording(false);
+      stopLiveRecording();
+      return;
+    }
     if (mediaRecorderRef.current && isRecording) {
       mediaRecorderRef.current.stop();
       setIsRecording(false);
@@ -249,6 +382,54 @@ function Debate() {
     }
   };
 
+  // Show a just-submitted turn and advance the round/turn counters
+  const applySubmittedTurn = (newTurn) => {
+    // PERFORMANCE FIX: Optimistically update UI immediately instead of refetching everything
+    newTurn.ai_feedback = newTurn.ai_feedback || null;
+    // A live audio turn may already be listed from its new_turn broadcast
+    const updatedTurns = [...turns.filter(t => t.id !== newTurn.id), newTurn];
+    setTurns(updatedTurns);
+    setArgument('');
+
+    // Update turn/round state for next submission
+    const debaterCount = participants.filter(p => p.role === 'debater').length || 2;
+    const turnsInCurrentRound = updatedTurns.filter(
+      t => t.round_number === currentRound
+    ).length;
+    
+    if (turnsInCurrentRound >= debaterCount) {
+      // Round complete - check if this was the final round
+      const totalRounds = room?.rounds || 3;
+      
+      if (currentRound >= totalRounds) {
+        // Final round complete - debate will auto-end, don't advance state
+        setIsAnalyzing(true);
+        setTimeout(() => setIsAnalyzing(false), 10000);
+      } else {
+        // Advance to next round (clamp to max rounds)
+        setCurrentRound(Math.min(currentRound + 1, totalRounds));
+        setCurrentTurn(1);
+        
+        // AI analysis happens in background
+        setIsAnalyzing(true);
+        setTimeout(() => setIsAnalyzing(false), 10000);
+      }
+    } else {
+      // Round in progress - advance to next turn
+      setCurrentTurn(currentTurn + 1);
+    }
+    
+    // Lightweight sync after submit to keep state fresh (only status, no full refetch)
+    setTimeout(async () => {
+      try {
+        const debateStatus = await api.get(`/api/debate/${room.id}/status`, true);
+        setParticipants(debateStatus.participants || []);
+      } catch (err) {
+        // Silent fail - regular polling will catch up
+      }
+    }, 1000);
+  };
+
   const handleSubmitTurn = async () => {
     // Allow either text or audio
     if (!argument.trim() && !audioBlob) {
@@ -256,26 +437,9 @@ function Debate() {
       return;
     }
 
-    if (!isParticipant) {
-      setError('You must join as a participant before submitting arguments');
-      return;
-    }
-
-    // Check if all seats are filled before allowing submissions
-    const maxParticipants = room?.type === 'team' ? 4 : 2;
-    const currentDebaters = participants.filter(p => p.role === 'debater').length;
-    if (currentDebaters < maxParticipants) {
-      setError(`Waiting for all participants to join. ${currentDebaters}/${maxParticipants} seats filled.`);
-      return;
-    }
-
-    // CRITICAL: Block submissions if final round is already complete
-    const totalRounds = room?.rounds || 3;
-    const debaterCount = participants.filter(p => p.role === 'debater').length || 2;
-    const turnsInFinalRound = turns.filter(t => t.round_number === totalRounds).length;
-    
-    if (currentRound >= totalRounds && turnsInFinalRound >= debaterCount) {
-      setError('All rounds complete. Debate has ended.');
+    const blocker = submissionBlocker();
+    if (blocker) {
+      setError(blocker);
       return;
     }
 
@@ -319,48 +483,7 @@ function Debate() {
         );
       }
 
-      // PERFORMANCE FIX: Optimistically update UI immediately instead of refetching everything
-      newTurn.ai_feedback = newTurn.ai_feedback || null;
-      setTurns([...turns, newTurn]);
-      setArgument('');
-
-      // Update turn/round state for next submission
-      const debaterCount = participants.filter(p => p.role === 'debater').length || 2;
-      const turnsInCurrentRound = [...turns, newTurn].filter(
-        t => t.round_number === currentRound
-      ).length;
-      
-      if (turnsInCurrentRound >= debaterCount) {
-        // Round complete - check if this was the final round
-        const totalRounds = room?.rounds || 3;
-        
-        if (currentRound >= totalRounds) {
-          // Final round complete - debate will auto-end, don't advance state
-          setIsAnalyzing(true);
-          setTimeout(() => setIsAnalyzing(false), 10000);
-        } else {
-          // Advance to next round (clamp to max rounds)
-          setCurrentRound(Math.min(currentRound + 1, totalRounds));
-          setCurrentTurn(1);
-          
-          // AI analysis happens in background
-          setIsAnalyzing(true);
-          setTimeout(() => setIsAnalyzing(false), 10000);
-        }
-      } else {
-        // Round in progress - advance to next turn
-        setCurrentTurn(currentTurn + 1);
-      }
-      
-      // Lightweight sync after submit to keep state fresh (only status, no full refetch)
-      setTimeout(async () => {
-        try {
-          const debateStatus = await api.get(`/api/debate/${room.id}/status`, true);
-          setParticipants(debateStatus.participants || []);
-        } catch (err) {
-          // Silent fail - regular polling will catch up
-        }
-      }, 1000);
+      applySubmittedTurn(newTurn);
     } catch (err) {
       setError(err.message || 'Failed to submit turn');
     } finally {
@@ -554,7 +677,22 @@ function Debate() {
                               Round {turn.round_number}, Turn {turn.turn_number}
                             </span>
                           </div>
-                          <p className="text-text-secondary text-sm mb-3">{turn.content}</p>
+                          {turn.content && (
+                            <p className="text-text-secondary text-sm mb-3">{turn.content}</p>
+                          )}
+                          {turn.status === 'transcription_pending' && (
+                            <>
+                              {liveTranscripts[turn.id] && (
+                                <p className="text-text-secondary text-sm mb-2">
+                                  {Object.keys(liveTranscripts[turn.id])
+                                    .sort((a, b) => a - b)
+                                    .map((index) => liveTranscripts[turn.id][index])
+                                    .join(' ')}
+                                </p>
+                              )}
+                              <p className="text-text-secondary text-xs italic mb-3 animate-pulse">🎙️ Transcribing audio...</p>
+                            </>
+                          )}
                           
                           {turn.ai_feedback && (
                             <div className="space-y-2">
@@ -582,6 +720,24 @@ function Debate() {
                     </div>
                   })
                 )}
+                {aiDraft && (
+                  <div className="bg-accent-rust/10 border border-accent-rust/30 rounded-xl p-4">
+                    <div className="flex items-start gap-3">
+                      <div className="w-10 h-10 rounded-lg flex items-center justify-center text-white font-bold text-sm flex-shrink-0 bg-gradient-to-br from-accent-rust to-accent-saffron">
+                        AI
+                      </div>
+                      <div className="flex-1">
+                        <div className="flex items-center gap-2 mb-2 flex-wrap">
+                          <span className="font-semibold text-text-primary">AI Opponent</span>
+                          <span className="text-text-muted text-sm ml-auto">
+                            Round {aiDraft.round_number}, Turn {aiDraft.turn_number}
+                          </span>
+                        </div>
+                        <p className="text-text-secondary text-sm">{aiDraft.text}<span className="animate-pulse">▍</span></p>
+                      </div>
+                    </div>
+                  </div>
+                )}
                 <div ref={transcriptEndRef} />
               </div>
             </div>
@@ -146,7 +146,7 @@ function Results() {
     
     const playAudio = () => {
       if (turn.audio_url) {
-        const audio = new Audio(turn.audio_url);
+        const audio = new Audio(api.getTurnAudioUrl(turn.id));
         audio.play();
         setIsPlaying(true);
         audio.onended = () => setIsPlaying(false);
@@ -285,6 +285,11 @@ class ApiService {
   async getRoomByCode(roomCode) {
     return await this.get(`/api/rooms/code/${roomCode}`, true);
   }
+
+  // Streamed with Range support so <audio> can seek without downloading everything
+  getTurnAudioUrl(turnId) {
+    return `${API_BASE_URL}/api/debate/turns/${turnId}/audio`;
+  }
 }
 
 export default new ApiService();